@@ -0,0 +1,103 @@
+"""
+Concurrent stock-lookup throughput, as from a fleet of handheld scanners.
+
+Each of ``--concurrency`` clients keeps its own keep-alive session and fires
+lookups back to back, cycling through the given item codes, until
+``--requests`` have been made in total. Reports requests per second plus the
+latency percentiles from ``http_latency``, so the same endpoint can be
+compared behind gunicorn (WSGI) and an ASGI server:
+
+    python -m benchmarks.concurrent_lookups "http://127.0.0.1:8000/api/inventory/items/{code}/" \
+        --codes-file codes.txt --token $API_TOKEN --concurrency 50 --label asgi --output lookups.json
+"""
+import argparse
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.http_latency import summarise
+
+
+def client(url_template, codes, count, headers):
+    session = requests.Session()
+    session.headers.update(headers)
+    samples, errors = [], 0
+    for code in itertools.islice(itertools.cycle(codes), count):
+        started = time.perf_counter()
+        response = session.get(url_template.format(code=code))
+        samples.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+    return samples, errors
+
+
+def run(url_template, codes, total, concurrency, token=None):
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    share, extra = divmod(total, concurrency)
+    counts = [share + (1 if n < extra else 0) for n in range(concurrency)]
+    # Start each client on a different code so they do not all hit the same rows.
+    offsets = [codes[n % len(codes):] + codes[:n % len(codes)] for n in range(concurrency)]
+
+    barrier = threading.Barrier(concurrency + 1)
+
+    def start(offset, count):
+        barrier.wait()
+        return client(url_template, offset, count, headers)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(start, offset, count) for offset, count in zip(offsets, counts)]
+        barrier.wait()
+        started = time.perf_counter()
+        results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - started
+
+    samples = [sample for client_samples, _ in results for sample in client_samples]
+    errors = sum(client_errors for _, client_errors in results)
+    return samples, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('url', help="URL with a {code} placeholder for the item code.")
+    codes = parser.add_mutually_exclusive_group(required=True)
+    codes.add_argument('--codes', nargs='+')
+    codes.add_argument('--codes-file', help="One item code per line.")
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--token')
+    parser.add_argument('--label', default='run')
+    parser.add_argument('--output', help="Append the summary to this JSON file.")
+    args = parser.parse_args()
+
+    if args.codes_file:
+        with open(args.codes_file) as handle:
+            item_codes = [line.strip() for line in handle if line.strip()]
+    else:
+        item_codes = args.codes
+
+    samples, errors, elapsed = run(args.url, item_codes, args.requests, args.concurrency, args.token)
+    summary = {
+        **summarise(args.label, samples, errors),
+        'concurrency': args.concurrency,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(len(samples) / elapsed, 1),
+    }
+    print(json.dumps(summary, indent=2))
+
+    if args.output:
+        try:
+            with open(args.output) as handle:
+                results = json.load(handle)
+        except FileNotFoundError:
+            results = []
+        results.append(summary)
+        with open(args.output, 'w') as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Sequential per-request latency against a running procuro server.
+
+Used to compare connection settings (see docs/performance.md): start gunicorn
+with one configuration, run this, restart with the next, and compare the JSON.
+
+    python benchmarks/http_latency.py http://127.0.0.1:8000/api/items/?limit=1 \
+        --token $API_TOKEN --requests 500 --label conn-max-age-0 --output results.json
+"""
+import argparse
+import json
+import statistics
+import time
+
+import requests
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarise(label, samples_ms, errors):
+    return {
+        'label': label,
+        'requests': len(samples_ms),
+        'errors': errors,
+        'mean_ms': round(statistics.fmean(samples_ms), 3),
+        'p50_ms': round(percentile(samples_ms, 50), 3),
+        'p95_ms': round(percentile(samples_ms, 95), 3),
+        'p99_ms': round(percentile(samples_ms, 99), 3),
+        'max_ms': round(max(samples_ms), 3),
+    }
+
+
+def run(url, count, warmup, token=None):
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    # A fresh connection per request, like independent clients hitting gunicorn.
+    for _ in range(warmup):
+        requests.get(url, headers=headers)
+
+    samples, errors = [], 0
+    for _ in range(count):
+        started = time.perf_counter()
+        response = requests.get(url, headers=headers)
+        samples.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+    return samples, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('url')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--token')
+    parser.add_argument('--label', default='run')
+    parser.add_argument('--output', help="Append the summary to this JSON file.")
+    args = parser.parse_args()
+
+    samples, errors = run(args.url, args.requests, args.warmup, args.token)
+    summary = summarise(args.label, samples, errors)
+    print(json.dumps(summary, indent=2))
+
+    if args.output:
+        try:
+            with open(args.output) as handle:
+                results = json.load(handle)
+        except FileNotFoundError:
+            results = []
+        results.append(summary)
+        with open(args.output, 'w') as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == '__main__':
+    main()
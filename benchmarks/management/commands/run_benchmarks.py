@@ -0,0 +1,29 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from benchmarks import suite
+
+
+class Command(BaseCommand):
+    help = "Time admin changelists, API views, imports and report queries; write the results as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--only', nargs='+', help="Run only cases whose name contains one of these strings.")
+        parser.add_argument('--output', help="Write the JSON results to this file.")
+        parser.add_argument('--compare', help="A previous results file to compare medians against.")
+
+    def handle(self, *args, **options):
+        results = suite.run(repeat=options['repeat'], only=options['only'], log=self.stdout.write)
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options['compare']:
+            with open(options['compare']) as fh:
+                baseline = json.load(fh)
+            for name, before, after, ratio in suite.compare(baseline, results):
+                self.stdout.write(f"{name}: {before} -> {after} ms ({ratio:.2f}x)")
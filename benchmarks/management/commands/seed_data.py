@@ -0,0 +1,27 @@
+from dataclasses import fields
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.seeding import SeedPlan, seed
+
+
+class Command(BaseCommand):
+    help = "Bulk-insert synthetic suppliers, items, storage and inventory for load testing."
+
+    def add_arguments(self, parser):
+        defaults = SeedPlan()
+        for field in fields(SeedPlan):
+            parser.add_argument(
+                f"--{field.name.replace('_', '-')}", type=int, default=getattr(defaults, field.name),
+                help=f"Default {getattr(defaults, field.name)}." + (
+                    " Sub-locations, areas and sub-areas are per parent." if field.name in ('sublocations', 'areas', 'subareas') else ''
+                ),
+            )
+
+    def handle(self, *args, **options):
+        plan = SeedPlan(**{field.name: options[field.name] for field in fields(SeedPlan)})
+        try:
+            seed(plan, log=self.stdout.write)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS("Seeding complete."))
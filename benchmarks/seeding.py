@@ -0,0 +1,143 @@
+"""
+Synthetic data for load testing: suppliers, categories, items, a four-level
+storage tree and Inventory rows, all written with ``bulk_create`` in batches
+so millions of rows can be seeded without holding them in memory.
+
+Bulk inserts skip model ``save()`` and signals, so the derived data they would
+maintain (storage paths/closure, stock rollups, cached lookups) is rebuilt once
+at the end instead.
+"""
+import random
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import transaction
+
+from config.cache import reference_cache, CATEGORIES, STORAGE, SUPPLIERS
+from inventory.models import Inventory
+from items.models import Item, Category
+from reporting import rollups
+from storage import hierarchy
+from storage.models import Location, SubLocation, Area, SubArea
+from suppliers.models import Supplier, PaymentMethod
+
+SUPPLIER_PREFIX = "Seed Supplier"
+
+ADJECTIVES = ("Steel", "Brass", "Nylon", "Heavy", "Compact", "Galvanised", "Insulated", "Flexible", "Sealed", "Coated")
+NOUNS = ("Bolt", "Bracket", "Hinge", "Valve", "Cable", "Fuse", "Gasket", "Bearing", "Clamp", "Switch", "Filter", "Pump")
+SIZES = ("M4", "M6", "M8", "M10", "10mm", "25mm", "1/2in", "3/4in", "Small", "Large")
+
+
+@dataclass
+class SeedPlan:
+    suppliers: int = 50
+    categories: int = 20
+    items: int = 10_000
+    locations: int = 3
+    sublocations: int = 4
+    areas: int = 10
+    subareas: int = 25
+    inventory: int = 100_000
+    batch_size: int = 5_000
+    seed: int = 42
+
+    @property
+    def total_subareas(self):
+        return self.locations * self.sublocations * self.areas * self.subareas
+
+
+def batched(objects, size):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def seed(plan, log=print):
+    if Supplier.objects.filter(supplier_name__startswith=SUPPLIER_PREFIX).exists():
+        raise ValueError("Seed data is already present in this database.")
+    if plan.inventory > plan.items * plan.total_subareas:
+        raise ValueError("More inventory rows requested than item/sub-area pairs exist.")
+
+    rng = random.Random(plan.seed)
+    methods = [choice for choice, _ in PaymentMethod.choices]
+
+    with transaction.atomic():
+        suppliers = Supplier.objects.bulk_create([
+            Supplier(
+                supplier_name=f"{SUPPLIER_PREFIX} {n:05}",
+                email=f"seed-supplier-{n}@example.com",
+                supplier_status=rng.random() > 0.1,
+                payment_method=rng.choice(methods),
+            )
+            for n in range(plan.suppliers)
+        ])
+        categories = Category.objects.bulk_create([
+            Category(name=f"Seed Category {n:04}") for n in range(plan.categories)
+        ])
+        log(f"Seeded {len(suppliers)} suppliers and {len(categories)} categories.")
+
+        item_ids = []
+        items = (
+            Item(
+                item_code=f"S{n:09}",
+                name=f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {rng.choice(SIZES)}",
+                category=rng.choice(categories),
+                supplier=rng.choice(suppliers),
+                price=Decimal(rng.randint(100, 50_000)) / 100,
+                internal_value=Decimal(rng.randint(50, 30_000)) / 100,
+            )
+            for n in range(plan.items)
+        )
+        for batch in batched(items, plan.batch_size):
+            item_ids += [item.pk for item in Item.objects.bulk_create(batch)]
+        log(f"Seeded {len(item_ids)} items.")
+
+        subarea_ids = seed_storage(plan)
+        log(f"Seeded {len(subarea_ids)} sub-areas under {plan.locations} locations.")
+
+        # Pair n -> (item n % I, sub-area n // I), unique for n < I * S.
+        rows = (
+            Inventory(
+                item_id=item_ids[n % len(item_ids)],
+                location_id=subarea_ids[n // len(item_ids)],
+                quantity=rng.randint(0, 500),
+            )
+            for n in range(plan.inventory)
+        )
+        written = 0
+        for batch in batched(rows, plan.batch_size):
+            Inventory.objects.bulk_create(batch)
+            written += len(batch)
+            if written % (plan.batch_size * 20) == 0:
+                log(f"  {written} inventory rows...")
+        log(f"Seeded {written} inventory rows.")
+
+        hierarchy.rebuild()
+        rollups.rebuild()
+
+    for namespace in (CATEGORIES, SUPPLIERS, STORAGE):
+        reference_cache.invalidate(namespace)
+
+
+def seed_storage(plan):
+    locations = Location.objects.bulk_create([
+        Location(name=f"Seed Site {n:03}") for n in range(plan.locations)
+    ])
+    sublocations = SubLocation.objects.bulk_create([
+        SubLocation(name=f"Building {n:02}", location=location)
+        for location in locations for n in range(plan.sublocations)
+    ])
+    areas = Area.objects.bulk_create([
+        Area(name=f"Aisle {n:03}", sub_location=sublocation)
+        for sublocation in sublocations for n in range(plan.areas)
+    ], batch_size=plan.batch_size)
+    subarea_ids = []
+    subareas = (SubArea(name=f"Bin {n:03}", area=area) for area in areas for n in range(plan.subareas))
+    for batch in batched(subareas, plan.batch_size):
+        subarea_ids += [subarea.pk for subarea in SubArea.objects.bulk_create(batch)]
+    return subarea_ids
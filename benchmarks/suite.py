@@ -0,0 +1,192 @@
+"""
+Repeatable timings for the hot paths: admin changelists, the JSON API,
+stock imports and the reporting aggregates, run against whatever data is in
+the configured database (typically produced by ``seed_data``).
+
+Each case is timed ``repeat`` times after one warm-up run; the result records
+min/median/max wall time in milliseconds and the number of queries issued.
+Anything a case writes is rolled back, so the suite can be re-run against the
+same data to compare commits.
+"""
+import io
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+
+import django
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import F, Sum
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from inventory.importers import StockImporter, read_rows
+from inventory.models import Inventory
+from inventory.views import inventory_list
+from items.models import Item, Category
+from items.views import item_search
+from reporting.models import CategoryStock, LocationStock
+from reporting.rollups import SITE_PATH
+from storage.models import Location, SubArea
+from suppliers.models import Supplier
+
+CASES = []
+
+
+def case(func):
+    CASES.append(func)
+    return func
+
+
+class Rollback(Exception):
+    pass
+
+
+def _request(path, **params):
+    request = RequestFactory().get(path, params)
+    request.user = get_user_model()(username='benchmark', is_active=True, is_staff=True, is_superuser=True)
+    return request
+
+
+def _changelist(model, **params):
+    model_admin = admin.site._registry[model]
+    path = f'/admin/{model._meta.app_label}/{model._meta.model_name}/'
+    return lambda: model_admin.changelist_view(_request(path, **params)).render()
+
+
+@case
+def admin_inventory_changelist():
+    return _changelist(Inventory)
+
+
+@case
+def admin_inventory_changelist_by_site():
+    site = Location.objects.order_by('name').first()
+    return _changelist(Inventory, storage_location=site.pk) if site else None
+
+
+@case
+def admin_inventory_changelist_search():
+    item = Item.objects.order_by('item_code').first()
+    return _changelist(Inventory, q=item.name.split()[0]) if item else None
+
+
+@case
+def admin_item_changelist():
+    return _changelist(Item)
+
+
+@case
+def admin_subarea_changelist():
+    return _changelist(SubArea)
+
+
+@case
+def api_inventory_under_site():
+    site = Location.objects.order_by('name').first()
+    if site is None:
+        return None
+    return lambda: inventory_list(_request('/api/inventory/', under=str(site.pk), limit=100))
+
+
+@case
+def api_item_search():
+    item = Item.objects.order_by('item_code').first()
+    if item is None:
+        return None
+    return lambda: item_search(_request('/api/items/search/', q=item.name.split()[1]))
+
+
+@case
+def report_category_value_aggregate():
+    value = Sum(F('quantity') * F('item__internal_value'))
+    return lambda: list(Inventory.objects.values('item__category_id').annotate(total_quantity=Sum('quantity'), total_value=value))
+
+
+@case
+def report_category_value_rollup():
+    return lambda: list(CategoryStock.objects.values('category_id', 'quantity', 'value'))
+
+
+@case
+def report_site_quantity_aggregate():
+    return lambda: list(Inventory.objects.values(SITE_PATH).annotate(total_quantity=Sum('quantity')))
+
+
+@case
+def report_site_quantity_rollup():
+    return lambda: list(LocationStock.objects.values('location_id', 'quantity'))
+
+
+@case
+def import_stock_1000_rows():
+    pairs = list(
+        Inventory.objects.order_by('item__item_code', 'location__full_path')
+        .values_list('item__item_code', 'location__full_path')[:1000]
+    )
+    if not pairs:
+        return None
+    lines = ['item_code,location,quantity'] + [f'{code},"{path}",{n % 97}' for n, (code, path) in enumerate(pairs)]
+    payload = '\n'.join(lines)
+
+    def run():
+        try:
+            with transaction.atomic():
+                StockImporter().run(read_rows(io.StringIO(payload), 'csv'))
+                raise Rollback
+        except Rollback:
+            pass
+    return run
+
+
+def time_case(func, repeat):
+    func()
+    timings = []
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'max_ms': round(max(timings), 3),
+        'queries': len(queries) // repeat,
+    }
+
+
+def run(repeat=5, only=None, log=print):
+    results = {
+        'started_at': datetime.now(timezone.utc).isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+        },
+        'rows': {
+            model.__name__: model.objects.count()
+            for model in (Supplier, Category, Item, SubArea, Inventory)
+        },
+        'cases': {},
+    }
+    for factory in CASES:
+        name = factory.__name__
+        if only and not any(pattern in name for pattern in only):
+            continue
+        func = factory()
+        if func is None:
+            log(f"{name}: skipped (no data)")
+            continue
+        results['cases'][name] = timing = time_case(func, repeat)
+        log(f"{name}: median {timing['median_ms']} ms, {timing['queries']} queries")
+    return results
+
+
+def compare(baseline, current):
+    """Yield ``(case, baseline_ms, current_ms, ratio)`` for cases present in both runs."""
+    for name, timing in current['cases'].items():
+        previous = baseline.get('cases', {}).get(name)
+        if previous and previous['median_ms']:
+            yield name, previous['median_ms'], timing['median_ms'], timing['median_ms'] / previous['median_ms']
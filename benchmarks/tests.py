@@ -0,0 +1,67 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from inventory.models import Inventory
+from items.models import Item
+from reporting.models import CategoryStock
+from storage.models import Location, SubArea, StorageClosure
+
+# <--- Seeding and Benchmark Tests --->
+
+class SeedAndBenchmarkTest(TestCase):
+
+    def seed(self, **options):
+        defaults = dict(suppliers=3, categories=2, items=20, locations=1, sublocations=2, areas=2, subareas=3, inventory=200, batch_size=50)
+        defaults.update(options)
+        call_command('seed_data', *[f'--{key.replace("_", "-")}={value}' for key, value in defaults.items()], stdout=StringIO())
+
+    def test_seed_builds_derived_data(self):
+        self.seed()
+
+        self.assertEqual(Item.objects.count(), 20)
+        seeded = SubArea.objects.filter(full_path__startswith='Seed Site 000 > ')
+        self.assertEqual(seeded.count(), 12)
+        self.assertEqual(Inventory.objects.count(), 200)
+        site = Location.objects.get(name='Seed Site 000')
+        # 1 + 2 + 4 + 12 nodes under the site, each with a row per ancestor including itself.
+        self.assertEqual(StorageClosure.objects.filter(ancestor=site.pk).count(), 19)
+        self.assertEqual(StorageClosure.objects.filter(descendant__in=seeded.values('pk')).count(), 12 * 4)
+        self.assertEqual(
+            sum(CategoryStock.objects.values_list('quantity', flat=True)),
+            sum(Inventory.objects.values_list('quantity', flat=True)),
+        )
+
+    def test_seed_refuses_to_run_twice(self):
+        self.seed()
+        with self.assertRaises(CommandError):
+            self.seed()
+
+    def test_seed_rejects_more_rows_than_pairs(self):
+        with self.assertRaises(CommandError):
+            self.seed(inventory=20 * 12 + 1)
+
+    def test_benchmarks_write_results_without_changing_data(self):
+        self.seed()
+        quantities = dict(Inventory.objects.values_list('pk', 'quantity'))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'results.json')
+            call_command('run_benchmarks', '--repeat=1', f'--output={output}', stdout=StringIO())
+            with open(output) as fh:
+                results = json.load(fh)
+
+            out = StringIO()
+            call_command('run_benchmarks', '--repeat=1', '--only', 'report', f'--compare={output}', stdout=out)
+
+        self.assertEqual(results['rows']['Inventory'], 200)
+        self.assertIn('admin_inventory_changelist', results['cases'])
+        self.assertIn('import_stock_1000_rows', results['cases'])
+        self.assertGreater(results['cases']['admin_inventory_changelist']['queries'], 0)
+        self.assertIn('report_category_value_rollup:', out.getvalue())
+        self.assertEqual(dict(Inventory.objects.values_list('pk', 'quantity')), quantities)
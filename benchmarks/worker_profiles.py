@@ -0,0 +1,117 @@
+"""
+Worker boot time and memory per deployment profile (``PROCURO_PROFILE``).
+
+For each profile a one-worker gunicorn is started and polled until ``--path``
+answers; that is the boot time. ``--requests`` more requests are then made so
+lazily imported code is loaded too, and the worker's resident memory (VmRSS,
+Linux only) is read before it is shut down. Module counts come from a
+separate interpreter that only imports the WSGI application.
+
+    python -m benchmarks.worker_profiles --token $API_TOKEN --output profiles.json
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import requests
+
+PROFILES = ('full', 'admin', 'api')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def rss_kb(pid):
+    with open(f'/proc/{pid}/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return None
+
+
+def worker_pids(master_pid):
+    try:
+        with open(f'/proc/{master_pid}/task/{master_pid}/children') as children:
+            return [int(pid) for pid in children.read().split()]
+    except FileNotFoundError:
+        return []
+
+
+def module_count(env):
+    code = "import sys, config.wsgi; print(len(sys.modules))"
+    return int(subprocess.check_output([sys.executable, '-c', code], env=env).strip())
+
+
+def measure(profile, path, token, count, timeout=60):
+    env = {**os.environ, 'PROCURO_PROFILE': profile, 'DJANGO_SETTINGS_MODULE': 'config.settings'}
+    port = free_port()
+    url = f'http://127.0.0.1:{port}{path}'
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'config.wsgi', '--workers', '1', '--bind', f'127.0.0.1:{port}'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        session = requests.Session()
+        session.headers.update(headers)
+        while True:
+            try:
+                first = session.get(url)
+                break
+            except requests.ConnectionError:
+                if time.perf_counter() - started > timeout:
+                    raise RuntimeError(f"{profile}: no response within {timeout}s")
+                time.sleep(0.02)
+        boot_ms = (time.perf_counter() - started) * 1000
+        for _ in range(count):
+            session.get(url)
+        workers = worker_pids(server.pid)
+        return {
+            'profile': profile,
+            'status': first.status_code,
+            'boot_ms': round(boot_ms, 1),
+            'worker_rss_mb': round(rss_kb(workers[0]) / 1024, 1) if workers else None,
+            'modules': module_count(env),
+        }
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', nargs='+', choices=PROFILES, default=list(PROFILES))
+    parser.add_argument('--path', default='/api/storage/locations/', help="Served by every profile.")
+    parser.add_argument('--token', help="API token; the worker must have it in API_TOKENS.")
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=3, help="Boots per profile; the median is reported.")
+    parser.add_argument('--output', help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    results = []
+    for profile in args.profiles:
+        runs = sorted(
+            (measure(profile, args.path, args.token, args.requests) for _ in range(args.repeat)),
+            key=lambda run: run['boot_ms'],
+        )
+        result = runs[len(runs) // 2]
+        results.append(result)
+        print(json.dumps(result))
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""
+Helpers shared by the JSON API views in each app.
+
+Listing endpoints page with keyset cursors on indexed columns
+(``WHERE key > last_seen ORDER BY key LIMIT n``) rather than OFFSET, so
+the cost of a page does not grow with how deep into the table it is. Fields
+are picked with ``?fields=a,b`` and fetched with ``values()`` over the joined
+columns, so no model instances or per-row lookups are involved.
+
+Requests authenticate with a logged-in session or an
+``Authorization: Bearer <token>`` header matching ``settings.API_TOKENS``.
+``api_view`` also wraps ``async def`` views, resolving the session user with
+``request.auser()`` so nothing blocks the event loop. Write endpoints opt in
+with ``methods=``; session callers of those must pass the CSRF check.
+``tokens=`` names another token setting for endpoints that must not accept
+every integration's token, such as ``/api/stats/`` with ``STATS_TOKENS``.
+"""
+import base64
+import inspect
+import binascii
+import json
+import uuid
+from functools import partial, reduce, wraps
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+from django.http import JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.csrf import csrf_exempt
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+SAFE_METHODS = {'GET', 'HEAD', 'OPTIONS', 'TRACE'}
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def has_valid_token(request, tokens='API_TOKENS'):
+    header = request.headers.get('Authorization', '')
+    if not header.startswith('Bearer '):
+        return False
+    token = header[len('Bearer '):].strip()
+    return any(constant_time_compare(token, allowed) for allowed in getattr(settings, tokens, []))
+
+
+def is_authenticated(request, tokens='API_TOKENS'):
+    user = getattr(request, 'user', None)
+    return has_valid_token(request, tokens) or bool(user and user.is_authenticated)
+
+
+async def is_authenticated_async(request, tokens='API_TOKENS'):
+    if has_valid_token(request, tokens):
+        return True
+    if not hasattr(request, 'auser'):
+        return False
+    user = await request.auser()
+    return user.is_authenticated
+
+
+def csrf_rejection(request, tokens='API_TOKENS'):
+    """
+    The CSRF failure response for an unsafe request made with a session, else
+    None. Bearer-token callers send no cookies, so they are not checked.
+    """
+    if request.method in SAFE_METHODS or has_valid_token(request, tokens):
+        return None
+    check = CsrfViewMiddleware(lambda request: None)
+    check.process_request(request)
+    return check.process_view(request, None, (), {})
+
+
+def api_view(view=None, *, methods=('GET',), tokens='API_TOKENS'):
+    """
+    Wrap a JSON view with authentication, method and ``ApiError`` handling.
+    GET-only by default; ``@api_view(methods=('POST',))`` for write endpoints.
+    """
+    if view is None:
+        return partial(api_view, methods=methods, tokens=tokens)
+
+    if inspect.iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return JsonResponse({'error': "Method not allowed."}, status=405)
+            if not await is_authenticated_async(request, tokens):
+                return JsonResponse({'error': "Authentication required."}, status=401)
+            try:
+                return await view(request, *args, **kwargs)
+            except ApiError as exc:
+                return JsonResponse({'error': str(exc)}, status=exc.status)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in methods:
+            return JsonResponse({'error': "Method not allowed."}, status=405)
+        if not is_authenticated(request, tokens):
+            return JsonResponse({'error': "Authentication required."}, status=401)
+        rejected = csrf_rejection(request, tokens)
+        if rejected is not None:
+            return rejected
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as exc:
+            return JsonResponse({'error': str(exc)}, status=exc.status)
+    # Checked above instead, so token callers need no CSRF cookie.
+    return csrf_exempt(wrapper) if set(methods) - SAFE_METHODS else wrapper
+
+
+def parse_json_body(request):
+    try:
+        body = json.loads(request.body)
+    except ValueError:
+        raise ApiError("Request body must be JSON.")
+    if not isinstance(body, dict):
+        raise ApiError("Request body must be a JSON object.")
+    return body
+
+
+def parse_uuid(value, name):
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        raise ApiError(f"{name} must be a UUID.")
+
+
+def select_fields(request, available, default=None):
+    """Return the public field names requested via ``?fields=``."""
+    requested = request.GET.get('fields')
+    if not requested:
+        return list(default or available)
+    fields = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise ApiError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(available)}.")
+    return fields
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, cls=DjangoJSONEncoder).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def key_field(model, path):
+    """The model field an ORM path such as ``item__item_code`` ends on."""
+    *relations, name = path.split(LOOKUP_SEP)
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+def decode_cursor(cursor, model, keys):
+    """
+    Decode a cursor made by ``encode_cursor`` for the ``keys`` of ``model``.
+    Cursors come back from clients, so each value is checked against its
+    field; a tampered one is an ApiError, not a database error.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise ApiError("Invalid cursor.")
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise ApiError("Invalid cursor.")
+    try:
+        values = [key_field(model, key).to_python(value) for key, value in zip(keys, values)]
+    except ValidationError:
+        raise ApiError("Invalid cursor.")
+    if any(value is None or isinstance(value, (dict, list)) for value in values):
+        raise ApiError("Invalid cursor.")
+    return values
+
+
+def after(keys, values):
+    """Q for rows strictly after ``values`` in ascending ``keys`` order."""
+    clauses = []
+    for position, key in enumerate(keys):
+        equal = {keys[n]: values[n] for n in range(position)}
+        clauses.append(Q(**equal, **{f'{key}__gt': values[position]}))
+    return reduce(or_, clauses)
+
+
+def page_size(request):
+    try:
+        size = int(request.GET.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ApiError("limit must be an integer.")
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def keyset_page(request, queryset, keys, field_map, default_fields=None):
+    """
+    Build the JSON response for one page of ``queryset``.
+
+    ``keys`` are the ORM paths ordering the listing (their combination must be
+    unique and should be indexed); ``field_map`` maps public field names to
+    ORM paths.
+    """
+    fields = select_fields(request, list(field_map), default_fields)
+    limit = page_size(request)
+
+    queryset = queryset.order_by(*keys)
+    cursor = request.GET.get('cursor')
+    if cursor:
+        queryset = queryset.filter(after(keys, decode_cursor(cursor, queryset.model, keys)))
+
+    paths = list(dict.fromkeys([field_map[name] for name in fields] + list(keys)))
+    rows = list(queryset.values(*paths)[:limit + 1])
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][key] for key in keys])
+
+    return JsonResponse({
+        'results': [{name: row[field_map[name]] for name in fields} for row in rows],
+        'next': next_cursor,
+    })
@@ -0,0 +1,113 @@
+"""
+Two-tier cache for small, rarely changing reference data (Categories,
+Suppliers, the storage tree).
+
+Values live in the process-local ``'local'`` cache first and, when
+``CACHE_URL`` points at a shared backend, in ``'default'`` as well. A
+local-memory ``'default'`` is not shared, so it is skipped: it would only be a
+second per-process copy outliving the local timeout. Every key
+embeds a per-namespace version number kept in the shared tier; saving or
+deleting a model in that namespace bumps the version once the transaction
+commits (earlier, a concurrent read could cache pre-commit rows under the new
+version), so stale entries are simply never read again in any worker. Without a shared backend each worker
+only sees its own bumps, so local entries also expire after
+``REFERENCE_CACHE_LOCAL_TIMEOUT`` seconds to bound staleness.
+
+    choices = reference_cache.get_or_set('categories', 'choices', build_choices)
+"""
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+MISSING = object()
+
+CATEGORIES = 'categories'
+SUPPLIERS = 'suppliers'
+STORAGE = 'storage'
+
+
+class ReferenceCache:
+
+    def __init__(self, local_alias='local', shared_alias='default'):
+        self.local_alias = local_alias
+        self.shared_alias = shared_alias
+        self._lock = threading.Lock()
+        self._counters = Counter()
+
+    @property
+    def local(self):
+        return caches[self.local_alias]
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    @property
+    def cross_process(self):
+        """Whether ``shared`` is seen by other workers, rather than being another in-process cache."""
+        return not isinstance(self.shared, (LocMemCache, DummyCache))
+
+    def _count(self, namespace, event):
+        with self._lock:
+            self._counters[(namespace, event)] += 1
+
+    def _version_key(self, namespace):
+        return f'refcache:{namespace}:version'
+
+    def version(self, namespace):
+        version = self.shared.get(self._version_key(namespace))
+        if version is None:
+            self.shared.add(self._version_key(namespace), 1, timeout=None)
+            version = self.shared.get(self._version_key(namespace), 1)
+        return version
+
+    def get_or_set(self, namespace, key, builder):
+        """Return the cached value for ``key``, calling ``builder()`` on a miss."""
+        full_key = f'refcache:{namespace}:{self.version(namespace)}:{key}'
+
+        value = self.local.get(full_key, MISSING)
+        if value is not MISSING:
+            self._count(namespace, 'local_hits')
+            return value
+
+        if self.cross_process:
+            value = self.shared.get(full_key, MISSING)
+            if value is not MISSING:
+                self._count(namespace, 'shared_hits')
+                self.local.set(full_key, value, settings.REFERENCE_CACHE_LOCAL_TIMEOUT)
+                return value
+
+        self._count(namespace, 'misses')
+        value = builder()
+        if self.cross_process:
+            self.shared.set(full_key, value, settings.REFERENCE_CACHE_TIMEOUT)
+        self.local.set(full_key, value, settings.REFERENCE_CACHE_LOCAL_TIMEOUT)
+        return value
+
+    def invalidate(self, namespace):
+        self._count(namespace, 'invalidations')
+        try:
+            self.shared.incr(self._version_key(namespace))
+        except ValueError:
+            self.shared.set(self._version_key(namespace), 2, timeout=None)
+
+    def stats(self):
+        """``{namespace: {'local_hits': n, 'shared_hits': n, 'misses': n, 'invalidations': n}}`` for this process."""
+        with self._lock:
+            counters = dict(self._counters)
+        result = {}
+        for (namespace, event), count in counters.items():
+            result.setdefault(namespace, {'local_hits': 0, 'shared_hits': 0, 'misses': 0, 'invalidations': 0})
+            result[namespace][event] = count
+        return result
+
+    def reset_stats(self):
+        with self._lock:
+            self._counters.clear()
+
+
+reference_cache = ReferenceCache()
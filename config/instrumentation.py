@@ -0,0 +1,178 @@
+"""
+Per-request query instrumentation.
+
+``QueryInstrumentationMiddleware`` wraps every request in a
+``connection.execute_wrapper`` that times each SQL statement. For each request
+it records the query count, total database time, duplicated statements (the
+same SQL text run more than once, which is what an N+1 looks like), and the
+response time. The results are:
+
+* added to ``request_stats``, an in-process per-view histogram served by
+  ``/api/stats/`` (each gunicorn worker keeps its own);
+* sent as a ``Server-Timing`` header when ``SERVER_TIMING`` is on, so the
+  browser's network panel shows them;
+* logged to the ``procuro.slow_requests`` logger when a request exceeds
+  ``SLOW_REQUEST_MS`` or ``SLOW_REQUEST_QUERIES``.
+
+The middleware runs under WSGI and ASGI. Database connections belong to a
+thread, so under ASGI the wrapper is installed through ``sync_to_async``, on
+the thread the request's views and ORM calls run in. While a sync-only
+middleware such as WhiteNoise sits below it, Django runs it in sync mode.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('procuro.slow_requests')
+
+# Upper bounds (ms) of the response-time histogram buckets; the last bucket is open-ended.
+BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class QueryRecorder:
+    """``execute_wrapper`` callable collecting ``(sql, duration_ms)`` for one request."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, (time.perf_counter() - started) * 1000))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def total_ms(self):
+        return sum(duration for _, duration in self.queries)
+
+    def duplicates(self):
+        """``[(sql, times_run), ...]`` for statements run more than once, most repeated first."""
+        return [(sql, count) for sql, count in Counter(sql for sql, _ in self.queries).most_common() if count > 1]
+
+
+class RequestStats:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view, response_ms, queries, db_ms, duplicates):
+        with self._lock:
+            stats = self._views.get(view)
+            if stats is None:
+                stats = self._views[view] = {
+                    'requests': 0, 'response_ms_total': 0.0, 'response_ms_max': 0.0,
+                    'queries_total': 0, 'queries_max': 0, 'db_ms_total': 0.0, 'duplicate_queries_total': 0,
+                    'histogram': [0] * (len(BUCKETS_MS) + 1),
+                }
+            stats['requests'] += 1
+            stats['response_ms_total'] += response_ms
+            stats['response_ms_max'] = max(stats['response_ms_max'], response_ms)
+            stats['queries_total'] += queries
+            stats['queries_max'] = max(stats['queries_max'], queries)
+            stats['db_ms_total'] += db_ms
+            stats['duplicate_queries_total'] += duplicates
+            stats['histogram'][bisect_left(BUCKETS_MS, response_ms)] += 1
+
+    def snapshot(self):
+        """Per-view totals, means and the response-time histogram for this process."""
+        with self._lock:
+            views = {view: {**stats, 'histogram': list(stats['histogram'])} for view, stats in self._views.items()}
+        labels = [f'<={bound}ms' for bound in BUCKETS_MS] + [f'>{BUCKETS_MS[-1]}ms']
+        result = {}
+        for view, stats in sorted(views.items()):
+            requests = stats['requests']
+            result[view] = {
+                'requests': requests,
+                'response_ms_mean': round(stats['response_ms_total'] / requests, 3),
+                'response_ms_max': round(stats['response_ms_max'], 3),
+                'queries_mean': round(stats['queries_total'] / requests, 2),
+                'queries_max': stats['queries_max'],
+                'db_ms_mean': round(stats['db_ms_total'] / requests, 3),
+                'duplicate_queries_mean': round(stats['duplicate_queries_total'] / requests, 2),
+                'histogram': dict(zip(labels, stats['histogram'])),
+            }
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+request_stats = RequestStats()
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    return match.view_name or match._func_path
+
+
+class QueryInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with connections['default'].execute_wrapper(recorder):
+            response = self.get_response(request)
+        return self.finish(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        stack = ExitStack()
+        await sync_to_async(lambda: stack.enter_context(connections['default'].execute_wrapper(recorder)))()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.finish(request, response, recorder, started)
+
+    def finish(self, request, response, recorder, started):
+        response_ms = (time.perf_counter() - started) * 1000
+
+        duplicates = recorder.duplicates()
+        repeated = sum(count - 1 for _, count in duplicates)
+        view = view_name(request)
+        request_stats.record(view, response_ms, recorder.count, recorder.total_ms, repeated)
+
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'db;dur={recorder.total_ms:.1f};desc="{recorder.count} queries, {repeated} repeated", '
+                f'total;dur={response_ms:.1f}'
+            )
+
+        if response_ms >= settings.SLOW_REQUEST_MS or recorder.count >= settings.SLOW_REQUEST_QUERIES:
+            worst = f"; most repeated ({duplicates[0][1]}x): {duplicates[0][0][:300]}" if duplicates else ''
+            logger.warning(
+                "Slow request %s %s (%s): %.0f ms, %d queries in %.0f ms, %d repeated%s",
+                request.method, request.path, view, response_ms, recorder.count, recorder.total_ms, repeated, worst,
+            )
+        return response
@@ -0,0 +1,42 @@
+"""
+``EXPLAIN`` checks behind each app's ``QueryPlanTest``: hot admin, API and
+report queries must stay index-backed. Each test lives with the app that
+declares the index it relies on; mix ``QueryPlanAssertions`` into a
+``TestCase`` and call ``assertIndexed(queryset)``.
+"""
+import re
+import unittest
+
+from django.db import connection, transaction
+
+
+def full_table_scans(queryset):
+    """
+    Tables ``queryset`` reads without using any index.
+
+    PostgreSQL plans are taken with ``enable_seqscan = off`` so a "Seq Scan"
+    means no usable index exists, rather than the planner preferring a scan
+    for a small test table.
+    """
+    if connection.vendor == 'postgresql':
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+        return re.findall(r'Seq Scan on (\w+)', plan)
+
+    if connection.vendor == 'sqlite':
+        scans = []
+        for line in queryset.explain().splitlines():
+            match = re.search(r'\bSCAN (\w+)(.*)', line)
+            if match and 'USING' not in match.group(2) and match.group(1) not in ('CONSTANT', 'SUBQUERY'):
+                scans.append(match.group(1))
+        return scans
+
+    raise unittest.SkipTest(f"No plan parser for {connection.vendor}")
+
+
+class QueryPlanAssertions:
+
+    def assertIndexed(self, queryset):
+        self.assertEqual(full_table_scans(queryset), [], str(queryset.query))
@@ -10,10 +10,13 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import importlib.util
 from pathlib import Path
 import environ
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -54,9 +57,13 @@ INSTALLED_APPS = [
     'storage',
     'suppliers',
     'items',
+    'jobs',
+    'outbox',
+    'benchmarks',
 ]
 
 MIDDLEWARE = [
+    'config.instrumentation.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware', 
@@ -87,6 +94,36 @@ TEMPLATES = [
 WSGI_APPLICATION = 'config.wsgi.application'
 
 
+# ADDED: Deployment profiles (see docs/performance.md). PROCURO_PROFILE picks what a worker loads:
+#   full  - everything; the default, and what tests and management commands (migrate!) use
+#   admin - staff-facing workers: admin, reports and the API, without development tooling
+#   api   - token-authenticated JSON API only: no admin, sessions, messages, templates or static files
+PROCURO_PROFILE = env('PROCURO_PROFILE', default='full')
+PROFILE_EXCLUDED_APPS = {
+    'full': set(),
+    'admin': {'benchmarks'},
+    'api': {
+        'whitenoise.runserver_nostatic', 'django.contrib.admin', 'django.contrib.sessions',
+        'django.contrib.messages', 'django.contrib.staticfiles', 'benchmarks',
+    },
+}
+if PROCURO_PROFILE not in PROFILE_EXCLUDED_APPS:
+    raise ImproperlyConfigured(f"PROCURO_PROFILE must be one of {', '.join(PROFILE_EXCLUDED_APPS)}.")
+
+if PROCURO_PROFILE != 'full':
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in PROFILE_EXCLUDED_APPS[PROCURO_PROFILE]]
+
+if PROCURO_PROFILE == 'api':
+    # Requests authenticate with bearer tokens, so there is no session, user, CSRF or message state.
+    MIDDLEWARE = [
+        'config.instrumentation.QueryInstrumentationMiddleware',
+        'django.middleware.security.SecurityMiddleware',
+        'django.middleware.common.CommonMiddleware',
+    ]
+    TEMPLATES = []
+    ROOT_URLCONF = 'config.urls_api'
+
+
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
@@ -98,6 +135,47 @@ DATABASES = {
     )
 }
 
+# ADDED: Connection reuse (see docs/performance.md). Persistent connections are kept for
+# DB_CONN_MAX_AGE seconds and health-checked before reuse. The default is 60 for WSGI workers
+# (config/wsgi.py sets PROCURO_SERVER) and 0 elsewhere: under ASGI each request may run on a new
+# thread and leave its connection behind. DB_POOL=True switches to Django's native psycopg 3 pool
+# instead (requires the psycopg[binary,pool] package and a PostgreSQL DATABASE_URL).
+DATABASES['default']['CONN_MAX_AGE'] = env.int(
+    'DB_CONN_MAX_AGE', default=60 if env('PROCURO_SERVER', default='') == 'wsgi' else 0
+)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = env.bool('DB_CONN_HEALTH_CHECKS', default=True)
+# Needed behind a transaction-mode pgbouncer, which cannot hold server-side cursors open.
+DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = env.bool('DB_DISABLE_SERVER_SIDE_CURSORS', default=False)
+
+if env.bool('DB_POOL', default=False):
+    if 'postgresql' not in DATABASES['default']['ENGINE']:
+        raise ImproperlyConfigured('DB_POOL requires a PostgreSQL DATABASE_URL.')
+    # requirements.txt ships psycopg2, which has no pool; fail here rather than on the first query.
+    if not (importlib.util.find_spec('psycopg') and importlib.util.find_spec('psycopg_pool')):
+        raise ImproperlyConfigured('DB_POOL requires psycopg 3: pip install "psycopg[binary,pool]".')
+    # The pool owns connection lifetime, so Django must not also persist them.
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': env.int('DB_POOL_MIN_SIZE', default=2),
+        'max_size': env.int('DB_POOL_MAX_SIZE', default=10),
+        'timeout': env.int('DB_POOL_TIMEOUT', default=10),
+    }
+
+
+# ADDED: Caching. 'local' is always per-process memory; 'default' is shared between workers
+# when CACHE_URL is set (e.g. redis://... or dbcache://procuro_cache), otherwise also local memory.
+CACHES = {
+    'default': env.cache_url('CACHE_URL', default='locmemcache://procuro-default'),
+    'local': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'procuro-local',
+    },
+}
+
+# Reference-data cache (config/cache.py) lifetimes, in seconds
+REFERENCE_CACHE_TIMEOUT = env.int('REFERENCE_CACHE_TIMEOUT', default=3600)
+REFERENCE_CACHE_LOCAL_TIMEOUT = env.int('REFERENCE_CACHE_LOCAL_TIMEOUT', default=30)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -142,6 +220,29 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 STRIPE_PUBLISHABLE_KEY = env('STRIPE_PUBLISHABLE_KEY', default='pk_test_DORMANT')
 STRIPE_SECRET_KEY = env('STRIPE_SECRET_KEY', default='sk_test_DORMANT')
 
+# ADDED: Bearer tokens accepted by the JSON API (comma separated), for integrations without a session
+API_TOKENS = env.list('API_TOKENS', default=[])
+# Bearer tokens for /api/stats/ only, e.g. for a monitoring scraper; API_TOKENS are not accepted there
+STATS_TOKENS = env.list('STATS_TOKENS', default=[])
+
+# ADDED: Per-request SQL instrumentation (config/instrumentation.py): the per-view stats behind
+# /api/stats/, optional Server-Timing headers, and a slow-request log on 'procuro.slow_requests'
+REQUEST_INSTRUMENTATION = env.bool('REQUEST_INSTRUMENTATION', default=True)
+SERVER_TIMING = env.bool('SERVER_TIMING', default=DEBUG)
+SLOW_REQUEST_MS = env.int('SLOW_REQUEST_MS', default=1000)
+SLOW_REQUEST_QUERIES = env.int('SLOW_REQUEST_QUERIES', default=50)
+
+# Stock snapshot retention (reporting.snapshots.prune): every snapshot for this
+# many days, then the last one of each month for this many months.
+STOCK_SNAPSHOT_KEEP_DAYS = env.int('STOCK_SNAPSHOT_KEEP_DAYS', default=35)
+STOCK_SNAPSHOT_KEEP_MONTHS = env.int('STOCK_SNAPSHOT_KEEP_MONTHS', default=24)
+
+# Change outbox (outbox.relay): events are only relayed once they are this many seconds
+# old, which must exceed the longest write transaction, and are pruned after
+# OUTBOX_KEEP_DAYS once every consumer has passed them.
+OUTBOX_SETTLE_SECONDS = env.int('OUTBOX_SETTLE_SECONDS', default=10)
+OUTBOX_KEEP_DAYS = env.int('OUTBOX_KEEP_DAYS', default=14)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/6.0/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
\ No newline at end of file
@@ -15,8 +15,15 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path
+from django.urls import include, path
+
+from . import views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/items/', include('items.urls')),
+    path('api/inventory/', include('inventory.urls')),
+    path('api/storage/', include('storage.urls')),
+    path('reports/', include('reporting.urls')),
+    path('api/stats/', views.stats, name='stats'),
 ]
@@ -0,0 +1,14 @@
+"""
+URL configuration for ``PROCURO_PROFILE=api`` workers: the token-authenticated
+JSON API only. Admin pages and staff reports are served by the other profiles.
+"""
+from django.urls import include, path
+
+from . import views
+
+urlpatterns = [
+    path('api/items/', include('items.urls')),
+    path('api/inventory/', include('inventory.urls')),
+    path('api/storage/', include('storage.urls')),
+    path('api/stats/', views.stats, name='stats'),
+]
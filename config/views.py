@@ -0,0 +1,22 @@
+import os
+
+from django.http import JsonResponse
+
+from .api import ApiError, api_view, has_valid_token
+from .cache import reference_cache
+from .instrumentation import request_stats
+
+@api_view(tokens='STATS_TOKENS')
+def stats(request):
+    """
+    Per-view request/query stats and reference-cache counters for the worker
+    process that answers. Staff sessions or ``STATS_TOKENS`` only: the paths and
+    timings are operational detail that ordinary API integrations do not need.
+    """
+    if not has_valid_token(request, 'STATS_TOKENS') and not request.user.is_staff:
+        raise ApiError("Staff access required.", status=403)
+    return JsonResponse({
+        'pid': os.getpid(),
+        'requests': request_stats.snapshot(),
+        'reference_cache': reference_cache.stats(),
+    })
@@ -12,5 +12,7 @@ import os
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# Lets settings.py default to persistent connections, which only WSGI workers can keep.
+os.environ.setdefault('PROCURO_SERVER', 'wsgi')
 
 application = get_wsgi_application()
@@ -1,19 +1,118 @@
-from django.contrib import admin
-from .models import Inventory
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.models import LogEntry, CHANGE
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, F, Q, prefetch_related_objects
+from django.utils import timezone
+from django.http import HttpResponseRedirect
+from django.template.response import TemplateResponse
+from .models import Inventory, StockMovement, MovementType, CountSession, CountLine, CountStatus
+from .movements import post_movements, InsufficientStock
 from items.models import Item, Category
+from items.search import search_items
+from suppliers.models import Supplier
+from storage.admin import StorageLocationFilter
+from storage.models import SubArea
+from storage.widgets import StorageTreeWidget
+from config.cache import reference_cache, CATEGORIES, SUPPLIERS
 
 admin.site.register(Category)
 
+class ReferenceFieldListFilter(admin.RelatedFieldListFilter):
+    """Related-field filter whose choices are served from the reference cache."""
+    namespaces = {Category: CATEGORIES, Supplier: SUPPLIERS}
+
+    def field_choices(self, field, request, model_admin):
+        build = super().field_choices
+        return reference_cache.get_or_set(
+            self.namespaces[field.related_model], 'filter-choices',
+            lambda: list(build(field, request, model_admin)),
+        )
+
 @admin.register(Item)
 class ItemAdmin(admin.ModelAdmin):
     list_display = ('item_code', 'name', 'category', 'supplier', 'price', 'internal_value')
-    list_filter = ('category', 'supplier')
+    list_select_related = ('category', 'supplier')
+    list_filter = (('category', ReferenceFieldListFilter), ('supplier', ReferenceFieldListFilter))
     search_fields = ('item_code', 'name')
+    ordering = ('item_code',)
+
+    def get_search_results(self, request, queryset, search_term):
+        return search_items(queryset, search_term), False
+
+class MoveStockForm(forms.Form):
+    # Browsed a level at a time rather than rendered as one option per SubArea.
+    destination = forms.ModelChoiceField(queryset=SubArea.objects.all(), widget=StorageTreeWidget)
+    reference = forms.CharField(max_length=100, required=False)
+
+class AdjustStockForm(forms.Form):
+    delta = forms.IntegerField(help_text="Added to every selected row; negative to remove stock.")
+    reference = forms.CharField(max_length=100, required=False)
+
+    def clean_delta(self):
+        delta = self.cleaned_data['delta']
+        if delta == 0:
+            raise ValidationError("Enter a non-zero adjustment.")
+        return delta
+
+class QuantityInput(forms.NumberInput):
+    """Number input that also posts back, as ``<name>-seen``, the quantity the page showed."""
+    seen = None
+
+    def render(self, name, value, attrs=None, renderer=None):
+        seen = value if self.seen is None else self.seen
+        hidden = forms.HiddenInput().render(f'{name}-seen', seen, renderer=renderer)
+        return super().render(name, value, attrs, renderer) + hidden
+
+class InventoryForm(forms.ModelForm):
+    """
+    ``initial`` is re-read from the row when the form is posted, so it already
+    includes changes made since the page was rendered. Deltas are taken from
+    the quantity the user was actually shown instead.
+    """
+    class Meta:
+        model = Inventory
+        fields = '__all__'
+        widgets = {'quantity': QuantityInput}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.is_bound and 'quantity' in self.fields:
+            # A form redisplayed with errors keeps the original value.
+            self.fields['quantity'].widget.seen = self.seen_quantity()
+
+    def seen_quantity(self):
+        try:
+            return int(self.data[f"{self.add_prefix('quantity')}-seen"])
+        except (KeyError, TypeError, ValueError):
+            return self.initial.get('quantity', 0)
+
+    def quantity_delta(self):
+        """The quantity typed minus the quantity that was on screen."""
+        return self.cleaned_data['quantity'] - self.seen_quantity()
+
+    def has_changed(self):
+        # A row changed elsewhere to the typed value still needs its difference posted.
+        return super().has_changed() or (
+            'quantity' in getattr(self, 'cleaned_data', {}) and self.quantity_delta() != 0
+        )
 
 class InventoryAdmin(admin.ModelAdmin):
+    """
+    Quantity changes made here, whether typed into the list or applied by an
+    action, are posted as StockMovements in one batch per submit: one upsert
+    of Inventory and one ``bulk_create`` of ledger rows.
+    """
+    form = InventoryForm
     list_display = ('item_name', 'quantity', 'full_location_path')
+    list_editable = ('quantity',)
+    list_select_related = ('item', 'location')
     search_fields = ('item__name', 'item__item_code')
-    list_filter = ('location__area__sub_location__location',)
+    autocomplete_fields = ('item', 'location')
+    list_filter = (StorageLocationFilter,)
+    actions = ('move_stock', 'zero_out', 'adjust_stock')
 
     def item_name(self, obj):
         return obj.item.name
@@ -23,4 +122,280 @@ class InventoryAdmin(admin.ModelAdmin):
         return obj.location.get_full_location_display()
     full_location_path.short_description = 'Exact Location'
 
-admin.site.register(Inventory, InventoryAdmin)
\ No newline at end of file
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        matches = search_items(Item.objects.all(), search_term).values('pk')
+        return queryset.filter(item__in=matches), False
+
+    # List edits: the changelist calls save_model()/log_change() once per edited
+    # row; both are deferred here and flushed as one batch.
+
+    def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('form', self.form)
+        return super().get_changelist_form(request, **kwargs)
+
+    def changelist_view(self, request, extra_context=None):
+        if not (request.method == 'POST' and '_save' in request.POST):
+            return super().changelist_view(request, extra_context)
+
+        request._quantity_edits = []
+        try:
+            with transaction.atomic():
+                response = super().changelist_view(request, extra_context)
+                self.post_quantity_edits(request, request._quantity_edits)
+        except InsufficientStock as exc:
+            self.message_user(request, f"No changes saved: {exc}", messages.ERROR)
+            return HttpResponseRedirect(request.get_full_path())
+        return response
+
+    def save_model(self, request, obj, form, change):
+        edits = getattr(request, '_quantity_edits', None)
+        if edits is None:
+            return self.post_form_quantity(request, obj, form, change)
+        edits.append((obj, form.quantity_delta()))
+
+    # Add/change form: the quantity is posted as a movement as well, so the
+    # ledger covers every change and the point-in-time reports stay right.
+
+    def has_delete_permission(self, request, obj=None):
+        # Deleting a row would drop its stock without a ledger movement; the
+        # "zero out" action posts the ADJUST instead.
+        return False
+
+    def get_readonly_fields(self, request, obj=None):
+        if obj is not None:
+            # Moving stock is a transfer, done with the "move" action.
+            return (*self.readonly_fields, 'item', 'location')
+        return self.readonly_fields
+
+    def changeform_view(self, request, object_id=None, form_url='', extra_context=None):
+        try:
+            with transaction.atomic():
+                return super().changeform_view(request, object_id, form_url, extra_context)
+        except InsufficientStock as exc:
+            self.message_user(request, f"No changes saved: {exc}", messages.ERROR)
+            return HttpResponseRedirect(request.get_full_path())
+
+    def post_form_quantity(self, request, obj, form, change):
+        delta = form.quantity_delta() if change else obj.quantity
+        if delta:
+            post_movements([StockMovement(
+                movement_type=MovementType.ADJUST, item_id=obj.item_id, to_location_id=obj.location_id,
+                quantity=delta, reference="Admin edit",
+            )], user=request.user)
+        elif not change:
+            obj.save()
+        # The movement service may have created the row, under its own id.
+        saved = Inventory.objects.get(item_id=obj.item_id, location_id=obj.location_id)
+        obj.pk, obj.version, obj._state.adding = saved.pk, saved.version, False
+
+    def log_change(self, request, obj, message):
+        if getattr(request, '_quantity_edits', None) is None:
+            return super().log_change(request, obj, message)
+
+    def post_quantity_edits(self, request, edits):
+        """Post list edits as ADJUST movements of the difference from the value the user saw."""
+        movements = [
+            StockMovement(
+                movement_type=MovementType.ADJUST, item_id=obj.item_id, to_location_id=obj.location_id,
+                quantity=delta, reference="Count correction (admin list)",
+            )
+            for obj, delta in edits if delta
+        ]
+        if not movements:
+            return
+        post_movements(movements, user=request.user)
+        changed = [obj for obj, delta in edits if delta]
+        prefetch_related_objects(changed, 'item', 'location')
+        LogEntry.objects.log_actions(
+            user_id=request.user.pk, queryset=changed, action_flag=CHANGE,
+            change_message=[{'changed': {'fields': ['Quantity']}}],
+        )
+
+    # Actions
+
+    def render_action_form(self, request, queryset, form, title, action):
+        return TemplateResponse(request, 'admin/inventory/inventory/stock_action.html', {
+            **self.admin_site.each_context(request),
+            'title': title,
+            'form': form,
+            'action': action,
+            'opts': self.model._meta,
+            'selected_ids': queryset.values_list('pk', flat=True),
+            'preview': queryset.order_by('location__full_path', 'item__item_code').values(
+                'item__item_code', 'item__name', 'location__full_path', 'quantity'
+            )[:20],
+            'count': queryset.count(),
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        })
+
+    def post_action(self, request, movements, done):
+        try:
+            post_movements(movements, user=request.user)
+        except (InsufficientStock, ValidationError) as exc:
+            message = ' '.join(exc.messages) if isinstance(exc, ValidationError) else str(exc)
+            self.message_user(request, f"Nothing changed: {message}", messages.ERROR)
+            return
+        self.message_user(request, done)
+
+    @admin.action(description="Move selected stock to another location")
+    def move_stock(self, request, queryset):
+        form = MoveStockForm(request.POST if 'apply' in request.POST else None)
+        if not form.is_valid():
+            return self.render_action_form(request, queryset, form, "Move stock", 'move_stock')
+
+        destination = form.cleaned_data['destination']
+        rows = queryset.filter(quantity__gt=0).exclude(location=destination).values_list('item_id', 'location_id', 'quantity')
+        movements = [
+            StockMovement(
+                movement_type=MovementType.TRANSFER, item_id=item_id, from_location_id=location_id,
+                to_location=destination, quantity=quantity, reference=form.cleaned_data['reference'],
+            )
+            for item_id, location_id, quantity in rows
+        ]
+        self.post_action(request, movements, f"Moved {len(movements)} row(s) to {destination.full_path}.")
+
+    @admin.action(description="Zero out selected stock")
+    def zero_out(self, request, queryset):
+        rows = queryset.filter(quantity__gt=0).values_list('item_id', 'location_id', 'quantity')
+        movements = [
+            StockMovement(
+                movement_type=MovementType.ADJUST, item_id=item_id, to_location_id=location_id,
+                quantity=-quantity, reference="Zeroed (admin action)",
+            )
+            for item_id, location_id, quantity in rows
+        ]
+        self.post_action(request, movements, f"Zeroed {len(movements)} row(s).")
+
+    @admin.action(description="Adjust selected stock by a quantity")
+    def adjust_stock(self, request, queryset):
+        form = AdjustStockForm(request.POST if 'apply' in request.POST else None)
+        if not form.is_valid():
+            return self.render_action_form(request, queryset, form, "Adjust stock", 'adjust_stock')
+
+        delta = form.cleaned_data['delta']
+        movements = [
+            StockMovement(
+                movement_type=MovementType.ADJUST, item_id=item_id, to_location_id=location_id,
+                quantity=delta, reference=form.cleaned_data['reference'],
+            )
+            for item_id, location_id in queryset.values_list('item_id', 'location_id')
+        ]
+        self.post_action(request, movements, f"Adjusted {len(movements)} row(s) by {delta:+d}.")
+
+admin.site.register(Inventory, InventoryAdmin)
+
+class StockMovementForm(forms.ModelForm):
+    class Meta:
+        model = StockMovement
+        fields = '__all__'
+
+    def clean(self):
+        cleaned_data = super().clean()
+        movement = StockMovement(**{
+            name: cleaned_data.get(name)
+            for name in ('movement_type', 'item', 'from_location', 'to_location', 'quantity')
+        })
+        try:
+            deltas = movement.stock_deltas()
+        except ValidationError:
+            # Reported against the right fields by the model's own clean().
+            return cleaned_data
+
+        for (item_id, location_id), delta in deltas:
+            if delta >= 0:
+                continue
+            available = Inventory.objects.filter(
+                item_id=item_id, location_id=location_id
+            ).values_list('quantity', flat=True).first() or 0
+            if available + delta < 0:
+                raise ValidationError(f"Only {available} on hand at that location.")
+        return cleaned_data
+
+class StockMovementAdmin(admin.ModelAdmin):
+    form = StockMovementForm
+    list_display = ('created_at', 'movement_type', 'item', 'quantity', 'from_location', 'to_location', 'reference', 'created_by')
+    list_select_related = ('item', 'from_location__area', 'to_location__area', 'created_by')
+    list_filter = ('movement_type', 'created_at')
+    search_fields = ('item__item_code', 'item__name', 'reference')
+    autocomplete_fields = ('item', 'from_location', 'to_location')
+
+    def save_model(self, request, obj, form, change):
+        # Movements are immutable; new ones go through the posting service so
+        # Inventory is updated in the same transaction.
+        post_movements([obj], user=request.user)
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+admin.site.register(StockMovement, StockMovementAdmin)
+
+
+class CountSessionAdmin(admin.ModelAdmin):
+    """Sessions are opened here; counts arrive per SubArea through the API."""
+    list_display = ('__str__', 'status', 'locations_counted', 'variance_lines', 'created_by', 'created_at', 'closed_at')
+    list_filter = ('status',)
+    search_fields = ('reference',)
+    actions = ('close_sessions',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('created_by').annotate(
+            locations_counted=Count('lines__location', distinct=True),
+            variance_lines=Count('lines', filter=~Q(lines__expected=F('lines__counted'))),
+        )
+
+    @admin.display(ordering='locations_counted')
+    def locations_counted(self, obj):
+        return obj.locations_counted
+
+    @admin.display(ordering='variance_lines')
+    def variance_lines(self, obj):
+        return obj.variance_lines
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
+
+    @admin.action(description="Close selected count sessions")
+    def close_sessions(self, request, queryset):
+        closed = queryset.filter(status=CountStatus.OPEN).update(status=CountStatus.CLOSED, closed_at=timezone.now())
+        self.message_user(request, f"Closed {closed} session(s).")
+
+admin.site.register(CountSession, CountSessionAdmin)
+
+class VarianceFilter(admin.SimpleListFilter):
+    title = 'variance'
+    parameter_name = 'variance'
+
+    def lookups(self, request, model_admin):
+        return (('yes', 'With variance'), ('no', 'Matched'))
+
+    def queryset(self, request, queryset):
+        if self.value() == 'yes':
+            return queryset.exclude(expected=F('counted'))
+        if self.value() == 'no':
+            return queryset.filter(expected=F('counted'))
+        return queryset
+
+class CountLineAdmin(admin.ModelAdmin):
+    list_display = ('session', 'item', 'location_path', 'expected', 'counted', 'variance', 'counted_by', 'counted_at')
+    list_select_related = ('session', 'item', 'location', 'counted_by')
+    list_filter = (VarianceFilter, 'session')
+    search_fields = ('item__item_code', 'item__name', 'location__full_path')
+
+    @admin.display(description='Location', ordering='location__full_path')
+    def location_path(self, obj):
+        return obj.location.full_path
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+admin.site.register(CountLine, CountLineAdmin)
@@ -0,0 +1,61 @@
+"""
+Cycle counts.
+
+A scanner submits everything it counted in one SubArea at once. Items held
+there but missing from the submission count as zero. The SubArea's Inventory
+rows are read and locked with one query. A CountLine is written for every item
+in one ``bulk_create``, and the differences are posted as one batch of ADJUST
+movements. The cost of a submission does not depend on how many lines it has.
+"""
+from django.db import IntegrityError, transaction
+
+from .models import CountLine, CountStatus, Inventory, MovementType, StockMovement
+from .movements import post_movements
+
+
+ALREADY_COUNTED = "This location has already been counted in this session."
+
+
+class CountError(Exception):
+    pass
+
+
+def submit_count(session, location_id, counts, user=None):
+    """
+    Reconcile ``{item_id: counted}`` against the stock in ``location_id`` and
+    return the CountLines written. Raises ``CountError`` if the session is
+    closed or the SubArea has already been counted in it.
+    """
+    with transaction.atomic():
+        if session.status != CountStatus.OPEN:
+            raise CountError("This count session is closed.")
+        # Locked first, so a repeated submission waits here and then sees the lines.
+        on_hand = dict(
+            Inventory.objects.select_for_update().filter(location_id=location_id)
+            .values_list('item_id', 'quantity')
+        )
+        if CountLine.objects.filter(session=session, location_id=location_id).exists():
+            raise CountError(ALREADY_COUNTED)
+
+        lines = [
+            CountLine(
+                session=session, location_id=location_id, item_id=item_id,
+                expected=on_hand.get(item_id, 0), counted=counts.get(item_id, 0), counted_by=user,
+            )
+            for item_id in sorted(on_hand.keys() | counts.keys())
+        ]
+        try:
+            with transaction.atomic():
+                CountLine.objects.bulk_create(lines)
+        except IntegrityError:
+            raise CountError(ALREADY_COUNTED)
+
+        reference = f"Count {session}"[:StockMovement._meta.get_field('reference').max_length]
+        post_movements([
+            StockMovement(
+                movement_type=MovementType.ADJUST, item_id=line.item_id,
+                to_location_id=location_id, quantity=line.variance, reference=reference,
+            )
+            for line in lines if line.variance
+        ], user=user)
+    return lines
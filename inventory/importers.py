@@ -0,0 +1,168 @@
+"""
+Streaming stock-count import.
+
+Rows are read one at a time from a CSV or JSON-lines stream, resolved to ids
+through lookup maps built once up front, and applied in batches: each batch
+is posted as one set of ADJUST movements taking every row to its counted
+quantity, so Inventory is upserted and the ledger written in bulk. Only the
+current batch is held in memory, never the whole file.
+
+Each row needs ``item_code``, ``location`` (a SubArea full path such as
+``Warehouse A > Zone 1 > Rack 1 > Shelf 1``) and ``quantity``, a whole
+number; ``6.0`` is accepted, ``5.7`` is rejected rather than truncated.
+"""
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from config.cache import reference_cache, STORAGE
+from items.models import Item
+from storage.models import SubArea
+from .models import MovementType, StockMovement
+from .movements import post_movements, read_stock
+
+MAX_REJECT_SAMPLES = 100
+IMPORT_REFERENCE = "Stock import"
+
+
+@dataclass
+class ImportResult:
+    rows_read: int = 0
+    upserted: int = 0
+    rejected: int = 0
+    reject_samples: list = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows_read / self.elapsed if self.elapsed else 0.0
+
+
+def read_rows(stream, fmt):
+    """Yield ``(line_number, row)`` pairs; ``row`` is None for unparseable lines."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_number, row if isinstance(row, dict) else None
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def text(row, name):
+    """``row[name]`` as stripped text; JSON lines may carry numbers where CSV has strings."""
+    value = row.get(name)
+    return '' if value is None else str(value).strip()
+
+
+def parse_quantity(row):
+    """``row['quantity']`` as an int, rejecting fractions rather than truncating them."""
+    try:
+        quantity = Decimal(text(row, 'quantity'))
+    except InvalidOperation:
+        quantity = None
+    if quantity is None or not quantity.is_finite() or quantity != quantity.to_integral_value():
+        raise ValueError(f"Invalid quantity {row.get('quantity')!r}")
+    return int(quantity)
+
+
+class StockImporter:
+    """Upserts stock counts; later lines for the same item/location win."""
+
+    def __init__(self, batch_size=1000, on_reject=None, on_flush=None):
+        self.batch_size = batch_size
+        self.on_reject = on_reject
+        # Called with the running ImportResult after each committed batch.
+        self.on_flush = on_flush
+        self.item_ids = dict(Item.objects.values_list('item_code', 'id'))
+        self.location_ids = reference_cache.get_or_set(
+            STORAGE, 'subarea-ids-by-path', lambda: dict(SubArea.objects.values_list('full_path', 'id'))
+        )
+
+    def run(self, rows):
+        result = ImportResult()
+        started = time.monotonic()
+        batch = {}
+
+        for line_number, row in rows:
+            result.rows_read += 1
+            try:
+                key, quantity = self.resolve(row)
+            except ValueError as exc:
+                self.reject(result, line_number, str(exc))
+                continue
+
+            batch[key] = quantity
+            if len(batch) >= self.batch_size:
+                self.flush_batch(result, batch)
+                batch = {}
+
+        if batch:
+            self.flush_batch(result, batch)
+
+        result.elapsed = time.monotonic() - started
+        return result
+
+    def resolve(self, row):
+        if row is None:
+            raise ValueError("Unreadable line")
+
+        item_code = text(row, 'item_code')
+        item_id = self.item_ids.get(item_code)
+        if item_id is None:
+            raise ValueError(f"Unknown item_code {item_code!r}")
+
+        path = text(row, 'location')
+        location_id = self.location_ids.get(path)
+        if location_id is None:
+            raise ValueError(f"Unknown location {path!r}")
+
+        quantity = parse_quantity(row)
+        if quantity < 0:
+            raise ValueError(f"Negative quantity {quantity}")
+
+        return (item_id, location_id), quantity
+
+    def reject(self, result, line_number, reason):
+        result.rejected += 1
+        if len(result.reject_samples) < MAX_REJECT_SAMPLES:
+            result.reject_samples.append((line_number, reason))
+        if self.on_reject:
+            self.on_reject(line_number, reason)
+
+    def flush_batch(self, result, batch):
+        result.upserted += self.flush(batch)
+        if self.on_flush:
+            self.on_flush(result)
+
+    def flush(self, batch):
+        """Post the batch's differences; returns the number of movements posted."""
+        keys = sorted(batch)
+        with transaction.atomic():
+            # Just this batch's rows, locked in the order post_movements locks them,
+            # so the differences posted are exact.
+            current = {key: row.quantity for key, row in read_stock(keys, lock=True).items()}
+            # Counts are posted as ADJUST movements of the difference, so the ledger
+            # (and the point-in-time reports replaying it) sees every imported change.
+            movements = post_movements([
+                StockMovement(
+                    movement_type=MovementType.ADJUST, item_id=item_id, to_location_id=location_id,
+                    quantity=batch[item_id, location_id] - current.get((item_id, location_id), 0),
+                    reference=IMPORT_REFERENCE,
+                )
+                for item_id, location_id in keys
+                if batch[item_id, location_id] != current.get((item_id, location_id), 0)
+            ])
+        return len(movements)
@@ -0,0 +1,54 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.importers import StockImporter, read_rows
+from jobs.registry import enqueue
+
+
+class Command(BaseCommand):
+    help = "Stream stock counts from a CSV or JSON-lines file into Inventory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--rejects', help="Write rejected lines to this file as 'line<TAB>reason'.")
+        parser.add_argument('--background', action='store_true', help="Queue the import for a run_jobs worker instead.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if fmt not in ('csv', 'jsonl'):
+            raise CommandError(f"Cannot infer format from {path!r}; pass --format.")
+
+        if options['background']:
+            if options['rejects']:
+                raise CommandError("--rejects is not available for background imports; see the job result.")
+            job = enqueue('inventory.import_stock', {
+                'path': os.path.abspath(path), 'format': fmt, 'batch_size': options['batch_size'],
+            })
+            self.stdout.write(self.style.SUCCESS(f"Queued import as job {job.pk}."))
+            return
+
+        rejects_file = open(options['rejects'], 'w') if options['rejects'] else None
+
+        def on_reject(line_number, reason):
+            if rejects_file:
+                rejects_file.write(f"{line_number}\t{reason}\n")
+
+        try:
+            importer = StockImporter(batch_size=options['batch_size'], on_reject=on_reject)
+            with open(path, newline='', encoding='utf-8-sig') as stream:
+                result = importer.run(read_rows(stream, fmt))
+        finally:
+            if rejects_file:
+                rejects_file.close()
+
+        for line_number, reason in result.reject_samples[:10]:
+            self.stderr.write(f"  line {line_number}: {reason}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Read {result.rows_read} lines, upserted {result.upserted} rows, "
+            f"rejected {result.rejected} in {result.elapsed:.2f}s "
+            f"({result.rows_per_second:.0f} rows/s)."
+        ))
@@ -0,0 +1,36 @@
+# Generated by Django 6.0 on 2026-10-17 18:44
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_alter_inventory_options'),
+        ('items', '0001_initial'),
+        ('storage', '0004_storage_hierarchy_paths'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('movement_type', models.CharField(choices=[('RECEIVE', 'Receive'), ('ISSUE', 'Issue'), ('TRANSFER', 'Transfer'), ('ADJUST', 'Adjust')], max_length=10)),
+                ('quantity', models.IntegerField()),
+                ('reference', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('created_by', models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('from_location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='storage.subarea')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='items.item')),
+                ('to_location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='storage.subarea')),
+            ],
+            options={
+                'ordering': ('-created_at',),
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-17 18:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_stockmovement'),
+        ('items', '0003_hot_filter_indexes'),
+        ('storage', '0004_storage_hierarchy_paths'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['location', 'item'], name='inventory_location_item'),
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['last_updated'], name='inventory_last_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(condition=models.Q(('quantity__gt', 0)), fields=['item'], name='inventory_in_stock_item'),
+        ),
+        migrations.AddIndex(
+            model_name='stockmovement',
+            index=models.Index(fields=['item', 'created_at'], name='stockmovement_item_created'),
+        ),
+    ]
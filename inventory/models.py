@@ -1,4 +1,6 @@
+from django.conf import settings
 from django.db import models
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 import uuid
 
@@ -14,11 +16,154 @@ class Inventory(models.Model):
 
     quantity = models.PositiveIntegerField(default=0)
     last_updated = models.DateTimeField(auto_now=True)
+    # Bumped by every write, so optimistic writers (inventory.movements.compare_and_set)
+    # can tell whether a row they read without a lock has changed since.
+    version = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         unique_together = ('item', 'location')
         verbose_name_plural = "Inventories"
         verbose_name = "Inventory"
+        indexes = [
+            # Stock held in a bin / under a Location (closure subquery on location).
+            models.Index(fields=['location', 'item'], name='inventory_location_item'),
+            # Incremental syncs and "recently counted" listings.
+            models.Index(fields=['last_updated'], name='inventory_last_updated'),
+            # Reports and reorder runs only care about rows with stock on hand.
+            models.Index(fields=['item'], condition=models.Q(quantity__gt=0), name='inventory_in_stock_item'),
+        ]
 
     def __str__(self):
-        return f"{self.item.name} at {self.location.name}"
\ No newline at end of file
+        return f"{self.item.name} at {self.location.name}"
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+        # Incremented in the database, as this instance's copy may already be stale.
+        self.version = models.F('version') + 1
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'version'}
+        super().save(*args, **kwargs)
+        self.refresh_from_db(fields=['version'])
+
+class MovementType(models.TextChoices):
+    RECEIVE = 'RECEIVE', 'Receive'
+    ISSUE = 'ISSUE', 'Issue'
+    TRANSFER = 'TRANSFER', 'Transfer'
+    ADJUST = 'ADJUST', 'Adjust'
+
+class StockMovement(models.Model):
+    """
+    Append-only ledger of stock changes. Movements are posted through
+    ``inventory.movements.post_movements`` which applies them to Inventory.
+
+    RECEIVE adds to ``to_location``, ISSUE takes from ``from_location``,
+    TRANSFER does both, and ADJUST applies a signed ``quantity`` to ``to_location``.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    movement_type = models.CharField(max_length=10, choices=MovementType.choices)
+    item = models.ForeignKey('items.Item', on_delete=models.PROTECT)
+    from_location = models.ForeignKey(
+        'storage.SubArea', on_delete=models.PROTECT, null=True, blank=True, related_name='+'
+    )
+    to_location = models.ForeignKey(
+        'storage.SubArea', on_delete=models.PROTECT, null=True, blank=True, related_name='+'
+    )
+    quantity = models.IntegerField()
+    reference = models.CharField(max_length=100, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, editable=False
+    )
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ('-created_at',)
+        indexes = [
+            models.Index(fields=['item', 'created_at'], name='stockmovement_item_created'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_movement_type_display()} {self.quantity} x {self.item_id}"
+
+    def clean(self):
+        self.stock_deltas()
+
+    def stock_deltas(self):
+        """Return ``[((item_id, subarea_id), delta), ...]`` for this movement."""
+        needs_from = self.movement_type in (MovementType.ISSUE, MovementType.TRANSFER)
+        needs_to = self.movement_type != MovementType.ISSUE
+
+        if needs_from and self.from_location_id is None:
+            raise ValidationError({'from_location': "This movement type needs a source location."})
+        if not needs_from and self.from_location_id is not None:
+            raise ValidationError({'from_location': "Only issues and transfers take a source location."})
+        if needs_to and self.to_location_id is None:
+            raise ValidationError({'to_location': "This movement type needs a destination location."})
+        if not needs_to and self.to_location_id is not None:
+            raise ValidationError({'to_location': "Issues take no destination location."})
+        if self.movement_type == MovementType.ADJUST:
+            if self.quantity == 0:
+                raise ValidationError({'quantity': "Adjustments must change the quantity."})
+        elif self.quantity is None or self.quantity <= 0:
+            raise ValidationError({'quantity': "Quantity must be positive."})
+        if self.movement_type == MovementType.TRANSFER and self.from_location_id == self.to_location_id:
+            raise ValidationError({'to_location': "Transfers need two different locations."})
+
+        deltas = []
+        if needs_from:
+            deltas.append(((self.item_id, self.from_location_id), -self.quantity))
+        if needs_to:
+            deltas.append(((self.item_id, self.to_location_id), self.quantity))
+        return deltas
+
+class CountStatus(models.TextChoices):
+    OPEN = 'OPEN', 'Open'
+    CLOSED = 'CLOSED', 'Closed'
+
+class CountSession(models.Model):
+    """
+    A stock-take. Each SubArea is counted once per session, as one scanner
+    submission that ``inventory.counting.submit_count`` reconciles in bulk.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    reference = models.CharField(max_length=100, blank=True)
+    status = models.CharField(max_length=10, choices=CountStatus.choices, default=CountStatus.OPEN)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    closed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        ordering = ('-created_at',)
+
+    def __str__(self):
+        return self.reference or f"Count {self.created_at:%Y-%m-%d}"
+
+class CountLine(models.Model):
+    """What was on hand and what was counted for one item in one SubArea."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    session = models.ForeignKey(CountSession, on_delete=models.CASCADE, related_name='lines')
+    location = models.ForeignKey('storage.SubArea', on_delete=models.PROTECT, related_name='+')
+    item = models.ForeignKey('items.Item', on_delete=models.PROTECT, related_name='+')
+    expected = models.PositiveIntegerField()
+    counted = models.PositiveIntegerField()
+    counted_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+'
+    )
+    counted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('session', 'location', 'item')
+        indexes = [
+            # Variance listings for a session.
+            models.Index(fields=['session'], condition=~models.Q(expected=models.F('counted')), name='countline_variances'),
+        ]
+
+    def __str__(self):
+        return f"{self.item_id} at {self.location_id}: {self.counted} (expected {self.expected})"
+
+    @property
+    def variance(self):
+        return self.counted - self.expected
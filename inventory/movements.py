@@ -0,0 +1,181 @@
+"""
+Posting stock movements against Inventory.
+
+All movements in a batch are netted per ``(item, location)`` first, then the
+affected Inventory rows are locked with ``SELECT ... FOR UPDATE`` in a fixed
+(item, location) order, written back with one upsert and the ledger rows
+written with one ``bulk_create``, all inside a single transaction.
+
+Locking in a global order means concurrent batches from different workers
+queue behind each other instead of deadlocking, and netting keeps each batch
+to one lock per touched row no matter how many movements hit it.
+
+Batches posted with ``optimistic=True`` (transfer orders) take no locks while
+they work out the new quantities. Every writer bumps ``Inventory.version``;
+an optimistic batch writes its rows back only where the version is still the
+one it read, and raises ``StaleInventory`` (rolling back) otherwise.
+``retry_on_conflict`` runs such a batch again from the start.
+"""
+import random
+import time
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from .models import Inventory, StockMovement
+from .signals import StockChange, send_stock_changed
+
+LOCK_CHUNK_SIZE = 500
+OPTIMISTIC_ATTEMPTS = 5
+RETRY_BACKOFF = 0.01
+
+
+class InsufficientStock(Exception):
+    def __init__(self, item_id, location_id, available, requested):
+        self.item_id = item_id
+        self.location_id = location_id
+        self.available = available
+        self.requested = requested
+        super().__init__(
+            f"Only {available} of item {item_id} at {location_id}, cannot remove {requested}."
+        )
+
+
+class StaleInventory(Exception):
+    """An Inventory row was written by someone else between being read and written back."""
+
+
+def _chunks(rows):
+    for start in range(0, len(rows), LOCK_CHUNK_SIZE):
+        yield rows[start:start + LOCK_CHUNK_SIZE]
+
+
+def _create_missing(keys, deltas):
+    Inventory.objects.bulk_create(
+        [Inventory(item_id=item_id, location_id=location_id) for item_id, location_id in keys
+         if deltas[(item_id, location_id)] > 0],
+        ignore_conflicts=True,
+    )
+
+
+def read_stock(keys, lock=False):
+    """``{(item_id, location_id): Inventory}`` for the existing rows among ``keys``."""
+    rows = {}
+    for chunk in _chunks(keys):
+        condition = reduce(or_, (Q(item_id=item_id, location_id=location_id) for item_id, location_id in chunk))
+        queryset = Inventory.objects.filter(condition)
+        if lock:
+            queryset = queryset.select_for_update().order_by('item_id', 'location_id')
+        for row in queryset:
+            rows[(row.item_id, row.location_id)] = row
+    return rows
+
+
+def _net(keys, deltas, rows):
+    """Set the new quantity on each row; returns them in ``keys`` order."""
+    now = timezone.now()
+    for key in keys:
+        row = rows.get(key)
+        available = row.quantity if row else 0
+        if available + deltas[key] < 0:
+            raise InsufficientStock(key[0], key[1], available, -deltas[key])
+        row.quantity = available + deltas[key]
+        row.last_updated = now
+    return [rows[key] for key in keys]
+
+
+def compare_and_set(rows):
+    """
+    Write back the quantities of rows read without a lock, one UPDATE per
+    chunk that only matches rows still at the version read. Raises
+    ``StaleInventory`` if any row has moved on; nothing is written then.
+    """
+    with transaction.atomic():
+        for chunk in _chunks(rows):
+            written = Inventory.objects.filter(
+                reduce(or_, (Q(pk=row.pk, version=row.version) for row in chunk))
+            ).update(
+                quantity=Case(*(When(pk=row.pk, then=Value(row.quantity)) for row in chunk)),
+                version=F('version') + 1,
+                last_updated=chunk[0].last_updated,
+            )
+            if written != len(chunk):
+                raise StaleInventory(f"{len(chunk) - written} stock row(s) changed while being updated.")
+    for row in rows:
+        row.version += 1
+
+
+def retry_on_conflict(func, attempts=OPTIMISTIC_ATTEMPTS):
+    """
+    Call ``func`` until it gets through without ``StaleInventory``, sleeping a
+    short, jittered, growing delay between attempts. ``func`` must do all of
+    its work in its own transaction so a failed attempt leaves nothing behind.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return func()
+        except StaleInventory:
+            if attempt == attempts:
+                raise
+            time.sleep(random.uniform(0, RETRY_BACKOFF * 2 ** attempt))
+
+
+def apply_stock_deltas(deltas, optimistic=False):
+    """
+    Apply ``{(item_id, location_id): delta}`` to Inventory atomically.
+
+    Rows are created on demand for positive deltas. Raises ``InsufficientStock``
+    (rolling the whole batch back) if any row would go negative, and with
+    ``optimistic`` raises ``StaleInventory`` if a row changed under it.
+    Returns the updated Inventory rows.
+    """
+    keys = sorted(key for key, delta in deltas.items() if delta)
+    if not keys:
+        return []
+
+    with transaction.atomic():
+        _create_missing(keys, deltas)
+        updated = _net(keys, deltas, read_stock(keys, lock=not optimistic))
+        if optimistic:
+            compare_and_set(updated)
+        else:
+            for row in updated:
+                row.version += 1
+            # The rows are locked and their new values final, so write them back as
+            # an upsert: far cheaper to build than bulk_update's per-row CASE.
+            Inventory.objects.bulk_create(
+                updated, update_conflicts=True, unique_fields=['item', 'location'],
+                update_fields=['quantity', 'last_updated', 'version'], batch_size=LOCK_CHUNK_SIZE,
+            )
+        send_stock_changed(Inventory, [
+            StockChange(row.item_id, row.location_id, deltas[key], row.quantity)
+            for key, row in zip(keys, updated)
+        ])
+    return updated
+
+
+def post_movements(movements, user=None, optimistic=False):
+    """
+    Validate, apply and record a batch of unsaved ``StockMovement`` instances
+    in one transaction. Either every movement is posted or none is.
+    """
+    deltas = defaultdict(int)
+    for movement in movements:
+        if user is not None and movement.created_by_id is None:
+            movement.created_by = user
+        for key, delta in movement.stock_deltas():
+            deltas[key] += delta
+
+    with transaction.atomic():
+        apply_stock_deltas(deltas, optimistic=optimistic)
+        StockMovement.objects.bulk_create(movements)
+    return movements
+
+
+def post_movement(user=None, **fields):
+    """Post a single movement, e.g. ``post_movement(movement_type=..., item=..., ...)``."""
+    return post_movements([StockMovement(**fields)], user=user)[0]
@@ -0,0 +1,57 @@
+"""
+``stock_changed`` is sent once per write batch with a list of ``StockChange``
+tuples, whichever path wrote the rows (model save/delete, the movement
+service, bulk imports). Listeners such as the reporting rollups should use it
+rather than ``post_save``, which bulk writes never fire.
+
+Receivers run inside the writer's transaction.
+"""
+from collections import namedtuple
+
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import Signal, receiver
+
+from .models import Inventory
+
+# ``quantity`` is the row's quantity after the change (0 once a row is gone).
+StockChange = namedtuple('StockChange', 'item_id location_id delta quantity')
+
+stock_changed = Signal()
+
+
+def send_stock_changed(sender, changes):
+    changes = [change for change in changes if change.delta]
+    if changes:
+        stock_changed.send(sender=sender, changes=changes)
+
+
+@receiver(pre_save, sender=Inventory)
+def remember_previous_stock(sender, instance, raw=False, **kwargs):
+    instance._previous_stock = None
+    if not raw and not instance._state.adding:
+        instance._previous_stock = Inventory.objects.filter(pk=instance.pk).values_list(
+            'item_id', 'location_id', 'quantity'
+        ).first()
+
+
+@receiver(post_save, sender=Inventory)
+def inventory_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_stock', None)
+    key = (instance.item_id, instance.location_id)
+    if previous is None:
+        changes = [StockChange(*key, instance.quantity, instance.quantity)]
+    elif previous[:2] == key:
+        changes = [StockChange(*key, instance.quantity - previous[2], instance.quantity)]
+    else:
+        changes = [
+            StockChange(previous[0], previous[1], -previous[2], 0),
+            StockChange(*key, instance.quantity, instance.quantity),
+        ]
+    send_stock_changed(sender, changes)
+
+
+@receiver(post_delete, sender=Inventory)
+def inventory_deleted(sender, instance, **kwargs):
+    send_stock_changed(sender, [StockChange(instance.item_id, instance.location_id, -instance.quantity, 0)])
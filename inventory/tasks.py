@@ -0,0 +1,25 @@
+import io
+import os
+
+from jobs.registry import task
+from .importers import StockImporter, read_rows
+
+
+@task('inventory.import_stock', max_attempts=1)
+def import_stock(job, path, format, batch_size=1000):
+    """Import a stock-count file already saved on shared storage; progress is by bytes read."""
+    size = os.path.getsize(path) or 1
+    with open(path, 'rb') as raw:
+        stream = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+
+        def on_flush(result):
+            job.report_progress(100 * raw.tell() / size, f"{result.rows_read} lines read")
+
+        result = StockImporter(batch_size=batch_size, on_flush=on_flush).run(read_rows(stream, format))
+    return {
+        'rows_read': result.rows_read,
+        'upserted': result.upserted,
+        'rejected': result.rejected,
+        'reject_samples': result.reject_samples[:20],
+        'elapsed': round(result.elapsed, 3),
+    }
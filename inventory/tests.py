@@ -1,13 +1,36 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.core.management import call_command
 from django.core.exceptions import ValidationError
+from django.contrib.admin import helpers
+from django.contrib.admin.models import LogEntry
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
 
 # Cross-app imports
+from config.api import encode_cursor
+from config.instrumentation import QueryRecorder, request_stats
+from config.query_plans import QueryPlanAssertions
 from items.models import Item, Category
 from suppliers.models import Supplier
-from storage.models import Location, SubLocation, Area, SubArea
+from storage.models import Location, SubLocation, Area, SubArea, StorageClosure, StorageLevel
 
 # Local app import
-from .models import Inventory
+from .models import Inventory, StockMovement, MovementType, CountSession, CountLine, CountStatus
+from .movements import (
+    post_movement, post_movements, InsufficientStock, StaleInventory, read_stock, compare_and_set, retry_on_conflict,
+)
+from .importers import StockImporter, read_rows
 
 class InventoryModelTest(TestCase):
 
@@ -50,4 +73,662 @@ class InventoryModelTest(TestCase):
     def test_cascade_delete_item(self):
         """Test that deleting the Item also removes its Inventory records."""
         self.item.delete()
-        self.assertEqual(Inventory.objects.count(), 0)
\ No newline at end of file
+        self.assertEqual(Inventory.objects.count(), 0)
+
+class ChangelistFixtures:
+    """A logged-in superuser and a Depot > Zone 1 > Rack 1 area that ``add_rows`` stocks."""
+
+    def setUp(self):
+        super().setUp()
+        self.admin_user = User.objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(self.admin_user)
+        self.location = Location.objects.create(name="Depot")
+        self.subloc = SubLocation.objects.create(name="Zone 1", location=self.location)
+        self.area = Area.objects.create(name="Rack 1", sub_location=self.subloc)
+
+    def add_rows(self, start, count):
+        # Run the on-commit cache invalidations, as a committed write would.
+        with self.captureOnCommitCallbacks(execute=True):
+            for n in range(start, start + count):
+                category = Category.objects.create(name=f"Category {n}")
+                supplier = Supplier.objects.create(supplier_name=f"Supplier {n}")
+                item = Item.objects.create(
+                    item_code=f"Q-{n}", name=f"Item {n}", category=category,
+                    supplier=supplier, price=2.00, internal_value=1.00
+                )
+                subarea = SubArea.objects.create(name=f"Shelf {n}", area=self.area)
+                Inventory.objects.create(item=item, location=subarea, quantity=n)
+
+
+class InventoryAdminQueryCountTest(ChangelistFixtures, TestCase):
+    """The changelists must issue the same number of queries however many rows they show."""
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def assertConstantQueries(self, url):
+        self.add_rows(0, 3)
+        small_page = self.count_queries(url)
+        self.add_rows(3, 20)
+        self.assertEqual(self.count_queries(url), small_page)
+
+    def test_inventory_changelist(self):
+        self.assertConstantQueries(reverse('admin:inventory_inventory_changelist'))
+
+    def test_inventory_changelist_filtered_by_location(self):
+        url = reverse('admin:inventory_inventory_changelist')
+        self.assertConstantQueries(f"{url}?storage_location={self.location.pk}")
+
+    def test_item_changelist(self):
+        self.assertConstantQueries(reverse('admin:items_item_changelist'))
+
+
+class InventoryAdminBulkEditTest(TestCase):
+    """List edits and actions post movements in one batch, whatever the number of rows."""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(self.admin_user)
+        category = Category.objects.create(name="Fixings")
+        supplier = Supplier.objects.create(supplier_name="Bolt Co")
+        area = Area.objects.create(
+            name="Rack 1", sub_location=SubLocation.objects.create(name="Zone 1", location=Location.objects.create(name="Depot")),
+        )
+        self.bins = [SubArea.objects.create(name=f"Bin {n}", area=area) for n in range(2)]
+        self.rows = [
+            Inventory.objects.create(
+                item=Item.objects.create(
+                    item_code=f"B-{n}", name=f"Bolt {n}", category=category, supplier=supplier, price=1, internal_value=1,
+                ),
+                location=self.bins[0], quantity=10,
+            )
+            for n in range(5)
+        ]
+        self.url = reverse('admin:inventory_inventory_changelist')
+
+    def list_edit(self, quantities, seen=None):
+        rows = Inventory.objects.order_by('item__name').select_related('item')
+        seen = seen or {}
+        data = {
+            'form-TOTAL_FORMS': len(rows), 'form-INITIAL_FORMS': len(rows), '_save': 'Save',
+        }
+        for n, row in enumerate(rows):
+            data[f'form-{n}-id'] = row.pk
+            data[f'form-{n}-quantity'] = quantities.get(row.item.item_code, row.quantity)
+            data[f'form-{n}-quantity-seen'] = seen.get(row.item.item_code, row.quantity)
+        return self.client.post(f"{self.url}?o=1", data)
+
+    def quantities(self):
+        return dict(Inventory.objects.values_list('item__item_code', 'quantity'))
+
+    def test_list_edits_become_adjustments(self):
+        # Warm the content-type and filter-choice caches so both batches start equal.
+        ContentType.objects.get_for_model(Inventory)
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as two:
+            response = self.list_edit({'B-0': 7, 'B-1': 8})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.quantities(), {'B-0': 7, 'B-1': 8, 'B-2': 10, 'B-3': 10, 'B-4': 10})
+        self.assertEqual(
+            sorted(StockMovement.objects.values_list('movement_type', 'quantity')),
+            [(MovementType.ADJUST, -3), (MovementType.ADJUST, -2)],
+        )
+        self.assertEqual(LogEntry.objects.count(), 2)
+
+        with CaptureQueriesContext(connection) as five:
+            self.list_edit({'B-0': 1, 'B-1': 1, 'B-2': 1, 'B-3': 1, 'B-4': 1})
+        self.assertEqual(len(five), len(two))
+
+    def test_list_edit_increase_and_validation(self):
+        self.list_edit({'B-0': 15})
+        self.assertEqual(StockMovement.objects.get().quantity, 5)
+
+        response = self.list_edit({'B-1': -1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.quantities()['B-1'], 10)
+
+    def test_changes_made_after_the_page_was_shown_are_kept(self):
+        self.assertContains(self.client.get(f"{self.url}?o=1"), 'name="form-0-quantity-seen" value="10"')
+        # The page showed 10 everywhere; meanwhile B-0 and B-1 were picked down to 6.
+        Inventory.objects.filter(pk__in=[self.rows[0].pk, self.rows[1].pk]).update(quantity=6)
+        self.list_edit({'B-0': 8, 'B-1': 6}, seen={'B-0': 10, 'B-1': 10})
+        self.assertEqual(self.quantities()['B-0'], 4)
+        self.assertEqual(self.quantities()['B-1'], 2)
+        self.assertEqual(sorted(StockMovement.objects.values_list('quantity', flat=True)), [-4, -2])
+
+        row = self.rows[2]
+        change = reverse('admin:inventory_inventory_change', args=[row.pk])
+        self.assertContains(self.client.get(change), 'name="quantity-seen" value="10"')
+        Inventory.objects.filter(pk=row.pk).update(quantity=15)
+        self.client.post(change, {'quantity': 12, 'quantity-seen': 10})
+        self.assertEqual(self.quantities()['B-2'], 17)
+
+    def test_change_and_add_forms_post_movements(self):
+        row = self.rows[0]
+        response = self.client.post(reverse('admin:inventory_inventory_change', args=[row.pk]), {'quantity': 4})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.quantities()['B-0'], 4)
+
+        response = self.client.post(reverse('admin:inventory_inventory_add'), {
+            'item': row.item_id, 'location': self.bins[1].pk, 'quantity': 6,
+        })
+        self.assertEqual(response.status_code, 302)
+        added = Inventory.objects.get(item=row.item, location=self.bins[1])
+        self.assertEqual(added.quantity, 6)
+        self.assertEqual(LogEntry.objects.get(action_flag=1).object_id, str(added.pk))
+        self.assertEqual(
+            sorted(StockMovement.objects.values_list('movement_type', 'quantity', 'reference')),
+            [(MovementType.ADJUST, -6, "Admin edit"), (MovementType.ADJUST, 6, "Admin edit")],
+        )
+
+    def run_action(self, action, rows, **form):
+        data = {'action': action, helpers.ACTION_CHECKBOX_NAME: [row.pk for row in rows], **form}
+        if form:
+            data['apply'] = '1'
+        return self.client.post(self.url, data)
+
+    def test_move_action(self):
+        response = self.run_action('move_stock', self.rows[:2])
+        self.assertContains(response, "Move stock")
+        # The destination is browsed lazily, not rendered as an option per SubArea.
+        self.assertContains(response, 'data-tree-url="%s"' % reverse('storage:tree'))
+        self.assertNotContains(response, "Bin 1")
+
+        self.run_action('move_stock', self.rows[:2], destination=self.bins[1].pk, reference="Re-slot")
+        self.assertEqual(Inventory.objects.filter(location=self.bins[1]).count(), 2)
+        self.assertEqual(Inventory.objects.filter(location=self.bins[0], quantity=0).count(), 2)
+        self.assertEqual(StockMovement.objects.filter(movement_type=MovementType.TRANSFER, reference="Re-slot").count(), 2)
+
+    def test_zero_out_and_adjust_actions(self):
+        self.run_action('zero_out', self.rows[:3])
+        self.assertEqual(Inventory.objects.filter(quantity=0).count(), 3)
+
+        self.run_action('adjust_stock', self.rows, delta=-5)
+        self.assertEqual(Inventory.objects.filter(quantity=0).count(), 3)
+        self.assertFalse(StockMovement.objects.filter(quantity=-5).exists())
+
+        self.run_action('adjust_stock', self.rows[3:], delta=-5, reference="Damaged")
+        self.assertEqual(self.quantities()['B-4'], 5)
+        self.assertEqual(StockMovement.objects.filter(reference="Damaged").count(), 2)
+
+    def test_rows_cannot_be_deleted_outside_the_ledger(self):
+        row = self.rows[0]
+        self.assertEqual(self.client.post(reverse('admin:inventory_inventory_delete', args=[row.pk]), {'post': 'yes'}).status_code, 403)
+        self.run_action('delete_selected', [row], post='yes')
+        self.assertTrue(Inventory.objects.filter(pk=row.pk).exists())
+        self.assertNotContains(self.client.get(self.url), 'value="delete_selected"')
+
+class RequestInstrumentationTest(ChangelistFixtures, TestCase):
+    """Middleware stats, Server-Timing and the slow-request log, exercised on the changelist."""
+
+    def setUp(self):
+        super().setUp()
+        self.add_rows(0, 3)
+        request_stats.reset()
+        self.url = reverse('admin:inventory_inventory_changelist')
+
+    @override_settings(SERVER_TIMING=True)
+    def test_server_timing_and_per_view_stats(self):
+        response = self.client.get(self.url)
+
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries, \d+ repeated", total;dur=[\d.]+$')
+        stats = request_stats.snapshot()['admin:inventory_inventory_changelist']
+        self.assertEqual(stats['requests'], 1)
+        self.assertGreater(stats['queries_max'], 0)
+        self.assertEqual(sum(stats['histogram'].values()), 1)
+
+    async def test_requests_served_over_asgi_are_instrumented(self):
+        # WhiteNoise is sync-only and would make Django run the middleware in a thread.
+        middleware = [name for name in settings.MIDDLEWARE if not name.startswith('whitenoise.')]
+        await self.async_client.aforce_login(self.admin_user)
+        with self.settings(SERVER_TIMING=True, MIDDLEWARE=middleware):
+            response = await self.async_client.get(self.url)
+
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="[1-9]\d* queries')
+        stats = request_stats.snapshot()['admin:inventory_inventory_changelist']
+        self.assertGreater(stats['queries_max'], 0)
+
+    def test_duplicate_queries_are_detected(self):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            names = [row.item.name for row in Inventory.objects.all()]
+
+        self.assertEqual(len(names), 3)
+        [(sql, times)] = recorder.duplicates()
+        self.assertEqual(times, 3)
+        self.assertIn('items_item', sql)
+
+    @override_settings(SLOW_REQUEST_QUERIES=1)
+    def test_slow_requests_are_logged(self):
+        with self.assertLogs('procuro.slow_requests', 'WARNING') as logs:
+            self.client.get(self.url)
+        self.assertIn("admin:inventory_inventory_changelist", logs.output[0])
+
+    def test_stats_endpoint_is_staff_only(self):
+        self.client.get(self.url)
+        body = self.client.get(reverse('stats')).json()
+        self.assertIn('admin:inventory_inventory_changelist', body['requests'])
+        self.assertIn('reference_cache', body)
+
+        self.client.force_login(User.objects.create_user("picker", password="password"))
+        self.assertEqual(self.client.get(reverse('stats')).status_code, 403)
+
+    @override_settings(API_TOKENS=['sync-token'], STATS_TOKENS=['monitor-token'])
+    def test_stats_endpoint_needs_a_stats_token(self):
+        self.client.logout()
+        for token, status in (('sync-token', 401), ('monitor-token', 200)):
+            response = self.client.get(reverse('stats'), HTTP_AUTHORIZATION=f"Bearer {token}")
+            self.assertEqual(response.status_code, status, token)
+
+
+class StockImportTest(TestCase):
+
+    def setUp(self):
+        category = Category.objects.create(name="Electronics")
+        supplier = Supplier.objects.create(supplier_name="Global Tech")
+        self.item = Item.objects.create(
+            item_code="IMP-1", name="Scanner", category=category,
+            supplier=supplier, price=10.00, internal_value=5.00
+        )
+        self.other_item = Item.objects.create(
+            item_code="IMP-2", name="Cable", category=category,
+            supplier=supplier, price=1.00, internal_value=0.50
+        )
+        # Committed, so the importer's cached path lookup sees the new bin.
+        with self.captureOnCommitCallbacks(execute=True):
+            location = Location.objects.create(name="Warehouse A")
+            subloc = SubLocation.objects.create(name="Zone 1", location=location)
+            area = Area.objects.create(name="Rack 1", sub_location=subloc)
+            self.subarea = SubArea.objects.create(name="Shelf 1", area=area)
+        self.path = "Warehouse A > Zone 1 > Rack 1 > Shelf 1"
+
+    def test_csv_import_upserts_and_rejects(self):
+        Inventory.objects.create(item=self.item, location=self.subarea, quantity=3)
+        stream = io.StringIO(
+            "item_code,location,quantity\n"
+            f"IMP-1,{self.path},40\n"
+            f"IMP-2,{self.path},7\n"
+            f"NOPE,{self.path},1\n"
+            f"IMP-2,Nowhere,1\n"
+            f"IMP-2,{self.path},-4\n"
+        )
+        result = StockImporter(batch_size=1).run(read_rows(stream, 'csv'))
+
+        self.assertEqual(result.rows_read, 5)
+        self.assertEqual(result.upserted, 2)
+        self.assertEqual(result.rejected, 3)
+        self.assertEqual([line for line, _ in result.reject_samples], [4, 5, 6])
+        self.assertEqual(Inventory.objects.get(item=self.item).quantity, 40)
+        self.assertEqual(Inventory.objects.get(item=self.other_item).quantity, 7)
+        # Recorded in the ledger as the difference from what was on hand.
+        self.assertEqual(
+            sorted(StockMovement.objects.values_list('movement_type', 'quantity')),
+            [(MovementType.ADJUST, 7), (MovementType.ADJUST, 37)],
+        )
+
+    def test_unchanged_counts_post_nothing(self):
+        Inventory.objects.create(item=self.item, location=self.subarea, quantity=3)
+        stream = io.StringIO(f"item_code,location,quantity\nIMP-1,{self.path},3\nIMP-2,{self.path},0\n")
+        result = StockImporter().run(read_rows(stream, 'csv'))
+
+        self.assertEqual((result.rows_read, result.upserted), (2, 0))
+        self.assertFalse(StockMovement.objects.exists())
+
+    def test_jsonl_duplicate_lines_keep_last_value(self):
+        stream = io.StringIO(
+            json.dumps({"item_code": "IMP-1", "location": self.path, "quantity": 5}) + "\n"
+            "not json\n"
+            + json.dumps({"item_code": "IMP-1", "location": self.path, "quantity": 9}) + "\n"
+        )
+        result = StockImporter().run(read_rows(stream, 'jsonl'))
+
+        self.assertEqual(result.rejected, 1)
+        self.assertEqual(Inventory.objects.get(item=self.item).quantity, 9)
+
+    def test_values_are_coerced_and_fractions_rejected(self):
+        numbered = Item.objects.create(
+            item_code="12345", name="Fuse", category=self.item.category,
+            supplier=self.item.supplier, price=1.00, internal_value=0.50
+        )
+        stream = io.StringIO("\n".join(json.dumps(row) for row in [
+            {"item_code": 12345, "location": self.path, "quantity": 4},
+            {"item_code": "IMP-1", "location": self.path, "quantity": "6.0"},
+            {"item_code": "IMP-2", "location": self.path, "quantity": 5.7},
+            {"item_code": "IMP-2", "location": 7, "quantity": 1},
+            {"item_code": "IMP-2", "location": self.path, "quantity": "NaN"},
+        ]) + "\n")
+        result = StockImporter().run(read_rows(stream, 'jsonl'))
+
+        self.assertEqual(result.upserted, 2)
+        self.assertEqual(
+            [reason for _, reason in result.reject_samples],
+            ["Invalid quantity 5.7", "Unknown location '7'", "Invalid quantity 'NaN'"],
+        )
+        self.assertEqual(Inventory.objects.get(item=numbered).quantity, 4)
+        self.assertEqual(Inventory.objects.get(item=self.item).quantity, 6)
+
+    def test_import_stock_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write(f"item_code,location,quantity\nIMP-1,{self.path},12\n")
+        self.addCleanup(os.remove, handle.name)
+
+        out = io.StringIO()
+        call_command('import_stock', handle.name, stdout=out)
+
+        self.assertIn("upserted 1 rows", out.getvalue())
+        self.assertEqual(Inventory.objects.get(item=self.item).quantity, 12)
+
+
+class StockMovementTest(TestCase):
+
+    def setUp(self):
+        category = Category.objects.create(name="Electronics")
+        supplier = Supplier.objects.create(supplier_name="Global Tech")
+        self.item = Item.objects.create(
+            item_code="MOV-1", name="Router", category=category,
+            supplier=supplier, price=10.00, internal_value=5.00
+        )
+        location = Location.objects.create(name="Warehouse A")
+        subloc = SubLocation.objects.create(name="Zone 1", location=location)
+        area = Area.objects.create(name="Rack 1", sub_location=subloc)
+        self.shelf_1 = SubArea.objects.create(name="Shelf 1", area=area)
+        self.shelf_2 = SubArea.objects.create(name="Shelf 2", area=area)
+
+    def quantity_at(self, subarea):
+        return Inventory.objects.get(item=self.item, location=subarea).quantity
+
+    def test_receive_creates_inventory_row(self):
+        post_movement(movement_type=MovementType.RECEIVE, item=self.item, to_location=self.shelf_1, quantity=20)
+        self.assertEqual(self.quantity_at(self.shelf_1), 20)
+        self.assertEqual(StockMovement.objects.count(), 1)
+
+    def test_transfer_and_adjust(self):
+        post_movement(movement_type=MovementType.RECEIVE, item=self.item, to_location=self.shelf_1, quantity=20)
+        post_movement(
+            movement_type=MovementType.TRANSFER, item=self.item,
+            from_location=self.shelf_1, to_location=self.shelf_2, quantity=8
+        )
+        post_movement(movement_type=MovementType.ADJUST, item=self.item, to_location=self.shelf_2, quantity=-3)
+        self.assertEqual(self.quantity_at(self.shelf_1), 12)
+        self.assertEqual(self.quantity_at(self.shelf_2), 5)
+
+    def test_insufficient_stock_rolls_back_whole_batch(self):
+        post_movement(movement_type=MovementType.RECEIVE, item=self.item, to_location=self.shelf_1, quantity=5)
+        with self.assertRaises(InsufficientStock):
+            post_movements([
+                StockMovement(movement_type=MovementType.RECEIVE, item=self.item, to_location=self.shelf_2, quantity=4),
+                StockMovement(movement_type=MovementType.ISSUE, item=self.item, from_location=self.shelf_1, quantity=6),
+            ])
+        self.assertEqual(self.quantity_at(self.shelf_1), 5)
+        self.assertFalse(Inventory.objects.filter(location=self.shelf_2, quantity__gt=0).exists())
+        self.assertEqual(StockMovement.objects.count(), 1)
+
+    def test_batch_is_netted_per_row(self):
+        movements = [
+            StockMovement(movement_type=MovementType.RECEIVE, item=self.item, to_location=self.shelf_1, quantity=1)
+            for _ in range(50)
+        ]
+        movements.append(StockMovement(
+            movement_type=MovementType.ISSUE, item=self.item, from_location=self.shelf_1, quantity=30
+        ))
+        post_movements(movements)
+        self.assertEqual(self.quantity_at(self.shelf_1), 20)
+        self.assertEqual(StockMovement.objects.count(), 51)
+
+    def test_every_write_bumps_version(self):
+        post_movement(movement_type=MovementType.RECEIVE, item=self.item, to_location=self.shelf_1, quantity=5)
+        row = Inventory.objects.get(item=self.item, location=self.shelf_1)
+        self.assertEqual(row.version, 1)
+
+        row.quantity = 7
+        row.save()
+        self.assertEqual(row.version, 2)
+        post_movements([
+            StockMovement(movement_type=MovementType.ISSUE, item=self.item, from_location=self.shelf_1, quantity=1),
+        ], optimistic=True)
+        row.refresh_from_db()
+        self.assertEqual((row.quantity, row.version), (6, 3))
+
+    def test_compare_and_set_rejects_rows_changed_since_read(self):
+        post_movement(movement_type=MovementType.RECEIVE, item=self.item, to_location=self.shelf_1, quantity=10)
+        post_movement(movement_type=MovementType.RECEIVE, item=self.item, to_location=self.shelf_2, quantity=10)
+        keys = [(self.item.pk, self.shelf_1.pk), (self.item.pk, self.shelf_2.pk)]
+        rows = read_stock(keys)
+        # Someone else writes one of the rows in between.
+        post_movement(movement_type=MovementType.ISSUE, item=self.item, from_location=self.shelf_2, quantity=4)
+
+        for row in rows.values():
+            row.quantity -= 1
+        with self.assertRaises(StaleInventory):
+            compare_and_set(list(rows.values()))
+        self.assertEqual(self.quantity_at(self.shelf_1), 10)
+        self.assertEqual(self.quantity_at(self.shelf_2), 6)
+
+    def test_retry_on_conflict_gives_up_after_the_last_attempt(self):
+        attempts = []
+
+        def conflicting(failures):
+            attempts.append(1)
+            if len(attempts) <= failures:
+                raise StaleInventory("changed")
+            return 'done'
+
+        self.assertEqual(retry_on_conflict(lambda: conflicting(2)), 'done')
+        self.assertEqual(len(attempts), 3)
+        attempts.clear()
+        with self.assertRaises(StaleInventory):
+            retry_on_conflict(lambda: conflicting(5), attempts=2)
+        self.assertEqual(len(attempts), 2)
+
+    def test_invalid_movement_shape(self):
+        movement = StockMovement(movement_type=MovementType.ISSUE, item=self.item, to_location=self.shelf_1, quantity=1)
+        with self.assertRaises(ValidationError):
+            movement.full_clean()
+
+
+@override_settings(API_TOKENS=['sync-token'])
+class InventoryApiTest(TestCase):
+
+    def setUp(self):
+        category = Category.objects.create(name="Electronics")
+        supplier = Supplier.objects.create(supplier_name="Global Tech")
+        self.item = Item.objects.create(
+            item_code="API-1", name="Switch", category=category,
+            supplier=supplier, price=10.00, internal_value=5.00
+        )
+        self.north = Location.objects.create(name="North")
+        south = Location.objects.create(name="South")
+        for location in (self.north, south):
+            subloc = SubLocation.objects.create(name="Hall", location=location)
+            area = Area.objects.create(name="Aisle", sub_location=subloc)
+            subarea = SubArea.objects.create(name="Bin", area=area)
+            Inventory.objects.create(item=self.item, location=subarea, quantity=4)
+        self.url = reverse('inventory:inventory-list')
+
+    def test_filter_under_location(self):
+        response = self.client.get(
+            self.url, {'under': self.north.pk, 'fields': 'item_code,location,quantity'},
+            HTTP_AUTHORIZATION='Bearer sync-token'
+        )
+        self.assertEqual(response.json()['results'], [
+            {'item_code': "API-1", 'location': "North > Hall > Aisle > Bin", 'quantity': 4},
+        ])
+
+    def test_tampered_cursors_are_rejected(self):
+        for values in (["not-a-uuid"], [None], [{"id": 1}]):
+            response = self.client.get(self.url, {'cursor': encode_cursor(values)}, HTTP_AUTHORIZATION='Bearer sync-token')
+            self.assertEqual((response.status_code, response.json()), (400, {'error': "Invalid cursor."}))
+
+    def test_session_login_is_accepted(self):
+        self.client.force_login(User.objects.create_user("picker", password="password"))
+        self.assertEqual(len(self.client.get(self.url).json()['results']), 2)
+
+    async def test_async_stock_by_item(self):
+        url = reverse('inventory:stock-by-item', args=["API-1"])
+        response = await self.async_client.get(url, headers={'Authorization': 'Bearer sync-token'})
+
+        body = response.json()
+        self.assertEqual((body['item_code'], body['total']), ("API-1", 8))
+        self.assertEqual([row['location'] for row in body['locations']], [
+            "North > Hall > Aisle > Bin", "South > Hall > Aisle > Bin",
+        ])
+        missing = await self.async_client.get(reverse('inventory:stock-by-item', args=["NOPE"]), headers={'Authorization': 'Bearer sync-token'})
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_async_stock_by_location(self):
+        url = reverse('inventory:stock-by-location', args=[self.north.pk])
+        self.assertEqual((await self.async_client.get(url)).status_code, 401)
+
+        response = await self.async_client.get(url, headers={'Authorization': 'Bearer sync-token'})
+        self.assertEqual(response.json()['items'], [{'item_code': "API-1", 'name': "Switch", 'quantity': 4}])
+
+    async def test_async_views_accept_session_login(self):
+        user = await User.objects.acreate_user("scanner", password="password")
+        await self.async_client.aforce_login(user)
+        response = await self.async_client.get(reverse('inventory:stock-by-item', args=["API-1"]))
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(API_TOKENS=['sync-token'])
+class CycleCountTest(TestCase):
+
+    def setUp(self):
+        category = Category.objects.create(name="Electronics")
+        supplier = Supplier.objects.create(supplier_name="Global Tech")
+        self.items = [
+            Item.objects.create(
+                item_code=f"CC-{n}", name=f"Part {n}", category=category,
+                supplier=supplier, price=10.00, internal_value=5.00,
+            )
+            for n in range(3)
+        ]
+        loc = Location.objects.create(name="Depot")
+        area = Area.objects.create(name="Rack", sub_location=SubLocation.objects.create(name="Zone", location=loc))
+        self.bin = SubArea.objects.create(name="Bin", area=area)
+        post_movements([
+            StockMovement(movement_type=MovementType.RECEIVE, item=self.items[0], to_location=self.bin, quantity=10),
+            StockMovement(movement_type=MovementType.RECEIVE, item=self.items[1], to_location=self.bin, quantity=4),
+        ])
+        self.session = CountSession.objects.create(reference="Q3 stock-take")
+
+    def submit(self, counts, location=None, client=None, **extra):
+        url = reverse('inventory:submit-count', args=[self.session.pk, (location or self.bin).pk])
+        headers = extra.pop('headers', {'Authorization': 'Bearer sync-token'})
+        return (client or self.client).post(
+            url, json.dumps({'counts': counts}), content_type='application/json', headers=headers, **extra
+        )
+
+    def test_submission_reconciles_whole_location(self):
+        response = self.submit([
+            {'item_code': 'CC-0', 'quantity': 6}, {'item_code': 'CC-0', 'quantity': 2},  # scanned twice
+            {'item_code': 'CC-2', 'quantity': 3},                                        # not on record
+        ])                                                                               # CC-1 not found
+
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual(body['lines'], 3)
+        self.assertEqual(body['variances'], [
+            {'item_code': code, 'expected': expected, 'counted': counted, 'variance': counted - expected}
+            for code, expected, counted in sorted(
+                [('CC-0', 10, 8), ('CC-1', 4, 0), ('CC-2', 0, 3)],
+                key=lambda row: Item.objects.get(item_code=row[0]).pk,
+            )
+        ])
+        self.assertEqual(
+            dict(Inventory.objects.filter(location=self.bin).values_list('item__item_code', 'quantity')),
+            {'CC-0': 8, 'CC-1': 0, 'CC-2': 3},
+        )
+        self.assertEqual(StockMovement.objects.filter(movement_type=MovementType.ADJUST, reference="Count Q3 stock-take").count(), 3)
+
+    def test_location_is_counted_once_per_open_session(self):
+        self.assertEqual(self.submit([{'item_code': 'CC-0', 'quantity': 10}]).status_code, 201)
+        self.assertEqual(self.submit([{'item_code': 'CC-0', 'quantity': 1}]).status_code, 409)
+        self.assertEqual(Inventory.objects.get(item=self.items[0], location=self.bin).quantity, 10)
+
+        self.session.status = CountStatus.CLOSED
+        self.session.save()
+        other = SubArea.objects.create(name="Bin 2", area=self.bin.area)
+        self.assertEqual(self.submit([], location=other).status_code, 409)
+
+    def test_bad_payloads_change_nothing(self):
+        self.assertEqual(self.submit([{'item_code': 'NOPE', 'quantity': 1}]).status_code, 400)
+        self.assertEqual(self.submit([{'item_code': 'CC-0', 'quantity': -1}]).status_code, 400)
+        self.assertEqual(self.submit([{'item_code': 'CC-0'}]).status_code, 400)
+        self.assertEqual(self.submit([{'item_code': 'CC-0', 'quantity': 5.7}]).status_code, 400)
+        self.assertEqual(self.submit([{'item_code': 'CC-0', 'quantity': True}]).status_code, 400)
+        self.assertEqual(self.submit([{'item_code': 'CC-0', 'quantity': "3"}]).status_code, 400)
+        self.assertFalse(CountLine.objects.exists())
+
+    def test_session_callers_need_permission_and_csrf(self):
+        clerk = User.objects.create_user('clerk', password='pw')
+        client = self.client_class(enforce_csrf_checks=True)
+        client.force_login(clerk)
+        self.assertEqual(self.submit([], client=client, headers={}).status_code, 403)
+
+        counter = User.objects.create_superuser('counter', 'c@example.com', 'pw')
+        client.force_login(counter)
+        self.assertEqual(self.submit([], client=client, headers={}).status_code, 403)  # no CSRF token
+        client.get(reverse('admin:index'))
+        token = client.cookies['csrftoken'].value
+        response = self.submit([], client=client, headers={'X-CSRFToken': token})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(CountLine.objects.filter(counted_by=counter).count(), 2)
+
+    def test_query_count_independent_of_lines(self):
+        def count_queries(codes, location):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.submit([{'item_code': code, 'quantity': 1} for code in codes], location=location)
+            self.assertEqual(response.status_code, 201)
+            return len(ctx.captured_queries)
+
+        category, supplier = self.items[0].category, self.items[0].supplier
+        Item.objects.bulk_create([
+            Item(item_code=f"BULK-{n}", name="Bulk", category=category, supplier=supplier, price=1, internal_value=1)
+            for n in range(40)
+        ])
+        small = SubArea.objects.create(name="Small", area=self.bin.area)
+        large = SubArea.objects.create(name="Large", area=self.bin.area)
+        baseline = count_queries(['BULK-0', 'BULK-1'], small)
+        self.assertEqual(count_queries([f'BULK-{n}' for n in range(40)], large), baseline)
+
+
+class QueryPlanTest(QueryPlanAssertions, TestCase):
+    """Inventory and ledger queries must use the indexes in inventory migration 0005."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Category")
+        supplier = Supplier.objects.create(supplier_name="Supplier")
+        items = Item.objects.bulk_create([
+            Item(item_code=f"P-{n:04}", name=f"Part {n}", category=category, supplier=supplier, price=2, internal_value=1)
+            for n in range(200)
+        ])
+        cls.location = Location.objects.create(name="Plan Site")
+        subloc = SubLocation.objects.create(name="Hall", location=cls.location)
+        area = Area.objects.create(name="Aisle", sub_location=subloc)
+        subareas = [SubArea.objects.create(name=f"Bin {n}", area=area) for n in range(10)]
+        Inventory.objects.bulk_create([
+            Inventory(item=item, location=subareas[n % 10], quantity=n % 7)
+            for n, item in enumerate(items)
+        ])
+        cls.item = items[0]
+
+    def test_inventory_under_location(self):
+        under = StorageClosure.objects.descendant_ids(self.location.pk, StorageLevel.SUB_AREA)
+        self.assertIndexed(Inventory.objects.filter(location__in=under))
+
+    def test_inventory_changelist_page(self):
+        self.assertIndexed(Inventory.objects.select_related('item', 'location').order_by('-pk')[:100])
+
+    def test_inventory_recently_updated(self):
+        since = timezone.now() - timedelta(days=1)
+        self.assertIndexed(Inventory.objects.filter(last_updated__gte=since).order_by('last_updated'))
+
+    def test_in_stock_rows_for_item(self):
+        self.assertIndexed(Inventory.objects.filter(item=self.item, quantity__gt=0))
+
+    def test_movement_history_for_item(self):
+        self.assertIndexed(StockMovement.objects.filter(item=self.item).order_by('-created_at')[:50])
@@ -0,0 +1,14 @@
+from django.urls import path
+from . import views
+
+app_name = 'inventory'
+
+urlpatterns = [
+    path('', views.inventory_list, name='inventory-list'),
+    path('items/<str:item_code>/', views.stock_by_item, name='stock-by-item'),
+    path('locations/<uuid:node_id>/', views.stock_by_location, name='stock-by-location'),
+    path(
+        'counts/<uuid:session_id>/locations/<uuid:location_id>/',
+        views.submit_location_count, name='submit-count',
+    ),
+]
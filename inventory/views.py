@@ -1,3 +1,127 @@
-from django.shortcuts import render
+from django.db.models import Sum
+from django.http import JsonResponse
 
-# Create your views here.
+from config.api import ApiError, api_view, has_valid_token, keyset_page, page_size, parse_json_body, parse_uuid
+from items.models import Item
+from storage.models import StorageClosure, StorageLevel, SubArea
+from .counting import CountError, submit_count
+from .models import CountSession, Inventory
+
+INVENTORY_FIELDS = {
+    'id': 'id',
+    'item_id': 'item_id',
+    'item_code': 'item__item_code',
+    'item_name': 'item__name',
+    'location_id': 'location_id',
+    'location': 'location__full_path',
+    'quantity': 'quantity',
+    'last_updated': 'last_updated',
+}
+
+@api_view
+def inventory_list(request):
+    """Inventory rows, optionally narrowed to ``?item_code=`` and/or ``?under=<storage node id>``."""
+    rows = Inventory.objects.all()
+    if request.GET.get('item_code'):
+        rows = rows.filter(item__item_code=request.GET['item_code'])
+    if request.GET.get('under'):
+        under = parse_uuid(request.GET['under'], 'under')
+        rows = rows.filter(location__in=StorageClosure.objects.descendant_ids(under, StorageLevel.SUB_AREA))
+    return keyset_page(request, rows, ('id',), INVENTORY_FIELDS)
+
+# Scanner lookups. These are async so an ASGI server can hold many concurrent
+# scanner requests on one worker while their queries are in flight.
+
+@api_view
+async def stock_by_item(request, item_code):
+    """On-hand stock for one item code, per sub-area and in total."""
+    item = await Item.objects.filter(item_code=item_code).values('id', 'item_code', 'name').afirst()
+    if item is None:
+        raise ApiError(f"No item with code {item_code!r}.", status=404)
+    rows = Inventory.objects.filter(item_id=item['id'], quantity__gt=0).order_by('location__full_path').values(
+        'location_id', 'location__full_path', 'quantity'
+    )
+    locations = [
+        {'location_id': row['location_id'], 'location': row['location__full_path'], 'quantity': row['quantity']}
+        async for row in rows
+    ]
+    return JsonResponse({
+        **item,
+        'total': sum(row['quantity'] for row in locations),
+        'locations': locations,
+    })
+
+@api_view
+async def stock_by_location(request, node_id):
+    """Per-item stock in a sub-area, or summed over every sub-area under a higher storage node."""
+    limit = page_size(request)
+    under = StorageClosure.objects.descendant_ids(node_id, StorageLevel.SUB_AREA)
+    if not await StorageClosure.objects.filter(descendant=node_id).aexists():
+        raise ApiError("Unknown storage node.", status=404)
+    rows = Inventory.objects.filter(location__in=under, quantity__gt=0).values(
+        'item__item_code', 'item__name'
+    ).annotate(total=Sum('quantity')).order_by('item__item_code')
+    items = [
+        {'item_code': row['item__item_code'], 'name': row['item__name'], 'quantity': row['total']}
+        async for row in rows[:limit + 1]
+    ]
+    return JsonResponse({'location_id': node_id, 'items': items[:limit], 'truncated': len(items) > limit})
+
+@api_view(methods=('POST',))
+def submit_location_count(request, session_id, location_id):
+    """
+    Record a whole SubArea's count in one request:
+    ``{"counts": [{"item_code": "...", "quantity": 3}, ...]}``. Repeated codes
+    are added together; items on hand there but not listed are counted as zero.
+    """
+    if not has_valid_token(request) and not request.user.has_perm('inventory.add_countline'):
+        raise ApiError("You do not have permission to submit counts.", status=403)
+    session = CountSession.objects.filter(pk=session_id).first()
+    if session is None:
+        raise ApiError("Unknown count session.", status=404)
+    if not SubArea.objects.filter(pk=location_id).exists():
+        raise ApiError("Unknown sub-area.", status=404)
+
+    entries = parse_json_body(request).get('counts')
+    if not isinstance(entries, list):
+        raise ApiError("'counts' must be a list.")
+    quantities = {}
+    for entry in entries:
+        try:
+            code, quantity = str(entry['item_code']), entry['quantity']
+        except (TypeError, KeyError):
+            quantity = None
+        # Not int(): that would truncate 5.7 and read true as 1.
+        if not isinstance(quantity, int) or isinstance(quantity, bool):
+            raise ApiError("Each count needs an item_code and an integer quantity.")
+        if quantity < 0:
+            raise ApiError(f"Negative quantity for {code!r}.")
+        quantities[code] = quantities.get(code, 0) + quantity
+
+    item_ids = dict(Item.objects.filter(item_code__in=quantities).values_list('item_code', 'id'))
+    unknown = sorted(quantities.keys() - item_ids.keys())
+    if unknown:
+        raise ApiError(f"Unknown item codes: {', '.join(unknown[:20])}.")
+
+    try:
+        lines = submit_count(
+            session, location_id, {item_ids[code]: quantity for code, quantity in quantities.items()},
+            # API-only workers run without sessions, so token requests may have no user at all.
+            user=request.user if getattr(request, 'user', None) and request.user.is_authenticated else None,
+        )
+    except CountError as exc:
+        raise ApiError(str(exc), status=409)
+
+    codes = {item_id: code for code, item_id in item_ids.items()}
+    missing = {line.item_id for line in lines} - codes.keys()
+    if missing:
+        codes.update(Item.objects.filter(pk__in=missing).values_list('id', 'item_code'))
+    return JsonResponse({
+        'session': session.pk,
+        'location': location_id,
+        'lines': len(lines),
+        'variances': [
+            {'item_code': codes[line.item_id], 'expected': line.expected, 'counted': line.counted, 'variance': line.variance}
+            for line in lines if line.variance
+        ],
+    }, status=201)
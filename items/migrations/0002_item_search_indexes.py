@@ -0,0 +1,49 @@
+from django.db import migrations
+
+# Built CONCURRENTLY so the items table stays writable while they build, which
+# is what AddIndexConcurrently does. These are raw SQL rather than that
+# operation because they are expression/opclass indexes for PostgreSQL only,
+# kept out of the model state so SQLite never tries to create them.
+POSTGRES_FORWARD = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    # Match the expressions Django generates for istartswith / icontains.
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS items_item_code_upper_prefix ON items_item (UPPER(item_code) text_pattern_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS items_item_name_upper_trgm ON items_item USING gin (UPPER(name) gin_trgm_ops)",
+)
+
+POSTGRES_BACKWARD = (
+    "DROP INDEX CONCURRENTLY IF EXISTS items_item_name_upper_trgm",
+    "DROP INDEX CONCURRENTLY IF EXISTS items_item_code_upper_prefix",
+)
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_FORWARD:
+            schema_editor.execute(statement)
+    elif schema_editor.connection.vendor == 'sqlite':
+        from items.search import ensure_search_index
+        ensure_search_index(schema_editor.connection.alias)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_BACKWARD:
+            schema_editor.execute(statement)
+    elif schema_editor.connection.vendor == 'sqlite':
+        from items.search import FTS_TEARDOWN
+        for statement in FTS_TEARDOWN:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('items', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
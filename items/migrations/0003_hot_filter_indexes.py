@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-17 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0002_item_search_indexes'),
+        ('suppliers', '0002_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['supplier', 'category'], name='item_supplier_category'),
+        ),
+    ]
@@ -25,5 +25,11 @@ class Item(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
     internal_value = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
 
+    class Meta:
+        indexes = [
+            # Admin filtering by supplier and category together, items-per-supplier reports.
+            models.Index(fields=['supplier', 'category'], name='item_supplier_category'),
+        ]
+
     def __str__(self):
         return f"[{self.item_code}] {self.name}"
\ No newline at end of file
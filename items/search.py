@@ -0,0 +1,78 @@
+"""
+Indexed Item search for the admin and the type-ahead endpoint.
+
+On PostgreSQL, ``items/migrations/0002`` adds a trigram GIN index on
+``UPPER(name)`` and a ``text_pattern_ops`` index on ``UPPER(item_code)``, which
+are exactly the expressions Django emits for ``icontains``/``istartswith``, so
+both lookups are index scans rather than full-table ``LIKE`` scans.
+
+On SQLite (local runs) an FTS5 table with the trigram tokenizer mirrors
+``item_code`` and ``name`` through triggers; ``ensure_search_index``
+(re)creates it after every ``migrate`` because SQLite table rebuilds drop
+triggers. FTS5 answers ``LIKE`` on a trigram table from its index, so the
+match is the same on both backends: the code starts with the term or the name
+contains it, case-insensitively. Terms under three characters, or holding
+``LIKE`` wildcards, scan instead. Other backends use plain lookups.
+"""
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'items_item_search'
+
+FTS_SETUP = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"item_code, name, content='items_item', content_rowid='rowid', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON items_item BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, item_code, name) VALUES (new.rowid, new.item_code, new.name); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON items_item BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, item_code, name) VALUES ('delete', old.rowid, old.item_code, old.name); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON items_item BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, item_code, name) VALUES ('delete', old.rowid, old.item_code, old.name); "
+    f"INSERT INTO {FTS_TABLE}(rowid, item_code, name) VALUES (new.rowid, new.item_code, new.name); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+
+FTS_TEARDOWN = (
+    *(f"DROP TRIGGER IF EXISTS {FTS_TABLE}{suffix}" for suffix in ('_ai', '_ad', '_au')),
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+)
+
+# An ESCAPE clause stops FTS5 using the index, so terms that need one are left to the ORM.
+LIKE_WILDCARDS = re.compile(r'[%_\\]')
+
+
+def ensure_search_index(using='default'):
+    """Create (and backfill) the SQLite FTS table and triggers if any are missing."""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    expected = {FTS_TABLE, f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au'}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name IN (%s, %s, %s, %s)", sorted(expected)
+        )
+        if {row[0] for row in cursor.fetchall()} == expected:
+            return
+        for statement in FTS_SETUP:
+            cursor.execute(statement)
+
+
+def search_items(queryset, term, using='default'):
+    """Narrow an Item queryset to rows whose code starts with or name contains ``term``."""
+    term = term.strip()
+    if not term:
+        return queryset
+
+    if connections[using].vendor == 'sqlite' and not LIKE_WILDCARDS.search(term):
+        # A UNION rather than OR, which would make FTS5 scan the whole table.
+        return queryset.filter(pk__in=RawSQL(
+            f"SELECT items_item.id FROM items_item WHERE items_item.rowid IN ("
+            f"SELECT rowid FROM {FTS_TABLE} WHERE item_code LIKE %s "
+            f"UNION SELECT rowid FROM {FTS_TABLE} WHERE name LIKE %s)",
+            [f'{term}%', f'%{term}%'],
+        ))
+    # Index-backed on PostgreSQL (see module docstring), a plain scan elsewhere.
+    return queryset.filter(Q(item_code__istartswith=term) | Q(name__icontains=term))
@@ -0,0 +1,50 @@
+"""
+``item_values_changed`` is sent when Items change category or
+``internal_value``, with a list of ``ItemValueChange`` tuples, so stock
+valuations can be adjusted without rescanning Inventory. Bulk writers that
+bypass ``save()`` should send it themselves, and also send ``items_written``
+with every Item they created or updated (``items``, fully populated).
+"""
+from collections import namedtuple
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import Signal, receiver
+
+from config.cache import reference_cache, CATEGORIES
+from .models import Item, Category
+
+ItemValueChange = namedtuple(
+    'ItemValueChange', 'item_id old_category_id old_value new_category_id new_value'
+)
+
+item_values_changed = Signal()
+items_written = Signal()
+
+
+@receiver(pre_save, sender=Item)
+def remember_previous_values(sender, instance, raw=False, **kwargs):
+    instance._previous_values = None
+    if not raw and not instance._state.adding:
+        instance._previous_values = Item.objects.filter(pk=instance.pk).values_list(
+            'category_id', 'internal_value'
+        ).first()
+
+
+@receiver(post_save, sender=Item)
+def item_saved(sender, instance, created, raw=False, **kwargs):
+    previous = getattr(instance, '_previous_values', None)
+    if raw or created or previous is None:
+        return
+    old_category_id, old_value = previous
+    new_value = Decimal(str(instance.internal_value))
+    if old_category_id != instance.category_id or old_value != new_value:
+        item_values_changed.send(sender=Item, changes=[ItemValueChange(
+            instance.pk, old_category_id, old_value, instance.category_id, new_value,
+        )])
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_cache(sender, **kwargs):
+    transaction.on_commit(lambda: reference_cache.invalidate(CATEGORIES))
@@ -1,7 +1,17 @@
-from django.test import TestCase
+import unittest
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.core.cache import caches
+from config.cache import ReferenceCache, reference_cache, CATEGORIES
+from config.query_plans import QueryPlanAssertions
 from django.db.utils import IntegrityError
 from django.core.exceptions import ValidationError
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Q
 from .models import Item, Category
+from .search import FTS_TABLE, ensure_search_index, search_items
 from suppliers.models import Supplier
 
 class ItemModelTest(TestCase):
@@ -43,4 +53,186 @@ class ItemModelTest(TestCase):
             price=-5.00, internal_value=2.00
         )
         with self.assertRaises(ValidationError):
-            item.full_clean()
\ No newline at end of file
+            item.full_clean()
+
+@override_settings(API_TOKENS=['sync-token'])
+class ItemApiTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Fasteners")
+        self.supplier = Supplier.objects.create(supplier_name="Bolt Supply Co")
+        for n in range(5):
+            Item.objects.create(
+                item_code=f"API-{n}", name=f"Bolt {n}",
+                category=self.category, supplier=self.supplier,
+                price=1.50, internal_value=0.75
+            )
+        self.url = reverse('items:item-list')
+        self.auth = {'HTTP_AUTHORIZATION': 'Bearer sync-token'}
+
+    def test_requires_authentication(self):
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+
+    def test_keyset_pagination_walks_every_item_once(self):
+        codes, cursor = [], None
+        while True:
+            params = {'limit': 2, 'fields': 'item_code'}
+            if cursor:
+                params['cursor'] = cursor
+            body = self.client.get(self.url, params, **self.auth).json()
+            codes += [row['item_code'] for row in body['results']]
+            cursor = body['next']
+            if not cursor:
+                break
+        self.assertEqual(codes, [f"API-{n}" for n in range(5)])
+
+    def test_field_selection_and_joined_fields(self):
+        body = self.client.get(self.url, {'fields': 'item_code,category,supplier,price', 'limit': 1}, **self.auth).json()
+        self.assertEqual(body['results'], [{
+            'item_code': "API-0", 'category': "Fasteners", 'supplier': "Bolt Supply Co", 'price': "1.50",
+        }])
+
+    def test_unknown_field_and_bad_cursor_are_rejected(self):
+        self.assertEqual(self.client.get(self.url, {'fields': 'secret'}, **self.auth).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'cursor': 'not-a-cursor'}, **self.auth).status_code, 400)
+
+    def test_page_query_count_is_constant(self):
+        with self.assertNumQueries(1):
+            self.client.get(self.url, {'limit': 5}, **self.auth)
+
+
+class ReferenceCacheTest(TestCase):
+    def setUp(self):
+        caches['local'].clear()
+        caches['default'].clear()
+        reference_cache.reset_stats()
+        Category.objects.create(name="Fasteners")
+
+    def category_names(self):
+        return reference_cache.get_or_set(
+            CATEGORIES, 'names', lambda: list(Category.objects.order_by('name').values_list('name', flat=True))
+        )
+
+    def test_second_lookup_is_served_from_cache(self):
+        self.assertEqual(self.category_names(), ["Fasteners"])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.category_names(), ["Fasteners"])
+        stats = reference_cache.stats()[CATEGORIES]
+        self.assertEqual((stats['misses'], stats['local_hits']), (1, 1))
+
+    def test_saving_a_category_invalidates_on_commit(self):
+        self.category_names()
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name="Adhesives")
+        self.assertEqual(self.category_names(), ["Adhesives", "Fasteners"])
+        self.assertEqual(reference_cache.stats()[CATEGORIES]['misses'], 2)
+
+    def test_read_inside_the_writing_transaction_is_not_kept(self):
+        self.category_names()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            Category.objects.create(name="Adhesives")
+            # A reader before commit still gets the old version's entry and
+            # cannot store anything under the version the commit will use.
+            self.assertEqual(self.category_names(), ["Fasteners"])
+            self.assertEqual(reference_cache.stats()[CATEGORIES]['invalidations'], 0)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.category_names(), ["Adhesives", "Fasteners"])
+
+    @override_settings(CACHES={
+        alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': alias}
+        for alias in ('local', 'default', 'a-local', 'a-default', 'b-local', 'b-default')
+    })
+    def test_without_a_shared_backend_staleness_ends_with_the_local_timeout(self):
+        # Two workers, each with its own local-memory caches, as without CACHE_URL.
+        worker_a, worker_b = ReferenceCache('a-local', 'a-default'), ReferenceCache('b-local', 'b-default')
+        self.assertEqual(worker_b.get_or_set(CATEGORIES, 'names', lambda: ["Fasteners"]), ["Fasteners"])
+
+        Category.objects.create(name="Adhesives")
+        worker_a.invalidate(CATEGORIES)  # Never seen by worker B.
+        caches['b-local'].clear()  # Worker B's local entry times out.
+
+        self.assertEqual(
+            worker_b.get_or_set(CATEGORIES, 'names', lambda: ["Adhesives", "Fasteners"]), ["Adhesives", "Fasteners"]
+        )
+
+
+@override_settings(API_TOKENS=['sync-token'])
+class ItemSearchTest(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Fasteners")
+        supplier = Supplier.objects.create(supplier_name="Bolt Supply Co")
+        for code, name in (("BLT-08", "M8 Hex Bolt"), ("BLT-10", "M10 Hex Bolt"), ("WSH-08", "M8 Washer")):
+            Item.objects.create(
+                item_code=code, name=name, category=category,
+                supplier=supplier, price=1.0, internal_value=0.5
+            )
+
+    def codes(self, term):
+        return sorted(search_items(Item.objects.all(), term).values_list('item_code', flat=True))
+
+    def test_prefix_match_on_code_and_name_words(self):
+        self.assertEqual(self.codes("BLT"), ["BLT-08", "BLT-10"])
+        self.assertEqual(self.codes("wash"), ["WSH-08"])
+        self.assertEqual(self.codes("m8"), ["BLT-08", "WSH-08"])
+
+    def test_matches_the_lookups_used_on_postgresql(self):
+        # Not "08": that is a word of BLT-08, but not the start of the code.
+        for term in ("blt", "08", "olt", "Hex B", "m8 w", "WSH-0", "8%", "x"):
+            expected = Item.objects.filter(Q(item_code__istartswith=term) | Q(name__icontains=term))
+            self.assertEqual(self.codes(term), sorted(expected.values_list('item_code', flat=True)), term)
+        self.assertEqual(self.codes("olt"), ["BLT-08", "BLT-10"])
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', "SQLite FTS index")
+    def test_dropped_trigger_is_recreated(self):
+        # SQLite table rebuilds during later migrations drop the triggers.
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TRIGGER {FTS_TABLE}_ai")
+            ensure_search_index()
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name = %s", [f"{FTS_TABLE}_ai"])
+            self.assertIsNotNone(cursor.fetchone())
+        self.assertEqual(self.codes("hex"), ["BLT-08", "BLT-10"])
+
+    def test_index_follows_updates_and_deletes(self):
+        item = Item.objects.get(item_code="WSH-08")
+        item.name = "M8 Spring Washer"
+        item.save()
+        self.assertEqual(self.codes("spring"), ["WSH-08"])
+        item.delete()
+        self.assertEqual(self.codes("spring"), [])
+
+    def test_search_endpoint(self):
+        response = self.client.get(
+            reverse('items:item-search'), {'q': 'hex', 'fields': 'item_code'},
+            HTTP_AUTHORIZATION='Bearer sync-token'
+        )
+        self.assertEqual(response.json()['results'], [{'item_code': "BLT-08"}, {'item_code': "BLT-10"}])
+
+    def test_admin_search(self):
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "password"))
+        response = self.client.get(reverse('admin:items_item_changelist'), {'q': 'washer'})
+        self.assertContains(response, "WSH-08")
+        self.assertNotContains(response, "BLT-10")
+
+
+class QueryPlanTest(QueryPlanAssertions, TestCase):
+    """Item listings must use the indexes in items migration 0003."""
+
+    @classmethod
+    def setUpTestData(cls):
+        categories = Category.objects.bulk_create([Category(name=f"Category {n}") for n in range(5)])
+        suppliers = Supplier.objects.bulk_create([Supplier(supplier_name=f"Supplier {n}") for n in range(10)])
+        Item.objects.bulk_create([
+            Item(
+                item_code=f"P-{n:04}", name=f"Part {n}", category=categories[n % 5],
+                supplier=suppliers[n % 10], price=2, internal_value=1,
+            )
+            for n in range(200)
+        ])
+        cls.category = categories[0]
+        cls.supplier = suppliers[1]
+
+    def test_items_by_supplier_and_category(self):
+        self.assertIndexed(Item.objects.filter(supplier=self.supplier, category=self.category))
+
+    def test_item_keyset_page(self):
+        self.assertIndexed(Item.objects.filter(item_code__gt="P-0100").order_by('item_code')[:100])
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'items'
+
+urlpatterns = [
+    path('', views.item_list, name='item-list'),
+    path('search/', views.item_search, name='item-search'),
+]
@@ -1,3 +1,35 @@
-from django.shortcuts import render
+from django.http import JsonResponse
 
-# Create your views here.
+from config.api import api_view, keyset_page, page_size, select_fields
+from .models import Item
+from .search import search_items
+
+SEARCH_LIMIT = 50
+
+ITEM_FIELDS = {
+    'id': 'id',
+    'item_code': 'item_code',
+    'name': 'name',
+    'description': 'description',
+    'category': 'category__name',
+    'supplier': 'supplier__supplier_name',
+    'price': 'price',
+    'internal_value': 'internal_value',
+}
+
+@api_view
+def item_list(request):
+    items = Item.objects.all()
+    if request.GET.get('category'):
+        items = items.filter(category__name=request.GET['category'])
+    return keyset_page(request, items, ('item_code',), ITEM_FIELDS)
+
+@api_view
+def item_search(request):
+    """Type-ahead lookup: items whose code starts with, or name contains, ``?q=``."""
+    fields = select_fields(request, list(ITEM_FIELDS), ('id', 'item_code', 'name'))
+    limit = min(page_size(request), SEARCH_LIMIT)
+    term = request.GET.get('q', '').strip()
+    items = search_items(Item.objects.all(), term) if term else Item.objects.none()
+    rows = items.order_by('item_code').values(*[ITEM_FIELDS[name] for name in fields])[:limit]
+    return JsonResponse({'results': [{name: row[ITEM_FIELDS[name]] for name in fields} for row in rows]})
@@ -0,0 +1,32 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Job, JobStatus
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('task', 'status', 'priority', 'progress', 'attempts', 'created_by', 'created_at', 'finished_at')
+    list_select_related = ('created_by',)
+    list_filter = ('status', 'task')
+    search_fields = ('task', 'locked_by')
+    actions = ('retry_jobs', 'cancel_jobs')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description="Retry selected failed or cancelled jobs")
+    def retry_jobs(self, request, queryset):
+        retried = queryset.filter(status__in=(JobStatus.FAILED, JobStatus.CANCELLED)).update(
+            status=JobStatus.QUEUED, attempts=0, run_after=timezone.now(), error='', finished_at=None,
+        )
+        self.message_user(request, f"Requeued {retried} job(s).")
+
+    @admin.action(description="Cancel selected queued jobs")
+    def cancel_jobs(self, request, queryset):
+        cancelled = queryset.filter(status=JobStatus.QUEUED).update(
+            status=JobStatus.CANCELLED, finished_at=timezone.now(),
+        )
+        self.message_user(request, f"Cancelled {cancelled} job(s).")
+
+admin.site.register(Job, JobAdmin)
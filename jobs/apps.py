@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class JobsConfig(AppConfig):
+    # Each app registers its background tasks in <app>/tasks.py; jobs.registry
+    # imports them on first use.
+    name = 'jobs'
@@ -0,0 +1,33 @@
+import signal
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Run a background job worker. Start one process per worker; they coordinate through the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--burst', action='store_true', help="Exit once the queue is empty.")
+        parser.add_argument('--max-jobs', type=int, help="Exit after this many jobs (lets a supervisor recycle the process).")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument('--stale-after', type=int, default=1800, help="Seconds without a heartbeat before a running job is requeued.")
+        parser.add_argument('--name', help="Worker name recorded on claimed jobs. Defaults to host:pid.")
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            name=options['name'],
+            poll_interval=options['poll_interval'],
+            stale_after=timedelta(seconds=options['stale_after']),
+        )
+        previous = {signum: signal.signal(signum, worker.stop) for signum in (signal.SIGTERM, signal.SIGINT)}
+
+        self.stdout.write(f"Worker {worker.name} started.")
+        try:
+            processed = worker.run(burst=options['burst'], max_jobs=options['max_jobs'])
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker.name} stopped after {processed} job(s)."))
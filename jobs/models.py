@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+import uuid
+
+class JobStatus(models.TextChoices):
+    QUEUED = 'QUEUED', 'Queued'
+    RUNNING = 'RUNNING', 'Running'
+    SUCCEEDED = 'SUCCEEDED', 'Succeeded'
+    FAILED = 'FAILED', 'Failed'
+    CANCELLED = 'CANCELLED', 'Cancelled'
+
+class Job(models.Model):
+    """
+    A unit of background work: a registered task name plus JSON keyword
+    arguments. Created with ``jobs.registry.enqueue`` and executed by the
+    ``run_jobs`` worker command.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=0, help_text="Higher runs first.")
+    status = models.CharField(max_length=10, choices=JobStatus.choices, default=JobStatus.QUEUED)
+    run_after = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+
+    progress = models.PositiveSmallIntegerField(default=0)
+    progress_message = models.CharField(max_length=200, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, editable=False
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ('-created_at',)
+        indexes = [
+            # The worker's claim query: next runnable job by priority.
+            models.Index(
+                fields=['-priority', 'run_after'],
+                condition=models.Q(status='QUEUED'),
+                name='job_queue',
+            ),
+            # Requeueing jobs whose worker died.
+            models.Index(fields=['locked_at'], condition=models.Q(status='RUNNING'), name='job_running'),
+        ]
+
+    def __str__(self):
+        return f"{self.task} ({self.get_status_display()})"
+
+    def report_progress(self, percent, message=''):
+        """
+        Record progress from inside a running task. Written straight to the
+        row (outside any task transaction you avoid opening) and doubles as a
+        heartbeat, so long jobs that report progress are not treated as stale.
+        """
+        self.progress = max(0, min(100, int(percent)))
+        self.progress_message = message[:200]
+        self.locked_at = timezone.now()
+        Job.objects.filter(pk=self.pk).update(
+            progress=self.progress, progress_message=self.progress_message, locked_at=self.locked_at,
+        )
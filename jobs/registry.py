@@ -0,0 +1,75 @@
+"""
+Task registry. Apps declare background work in ``<app>/tasks.py``::
+
+    from jobs.registry import task
+
+    @task('reporting.rebuild_rollups', max_attempts=1)
+    def rebuild_rollups(job):
+        ...
+
+Tasks are called as ``func(job, **job.payload)``; whatever they return must be
+JSON-serialisable and is stored on ``Job.result``. Long tasks should call
+``job.report_progress(percent, message)`` as they go, and should commit in
+batches rather than wrap everything in one transaction, so progress is visible
+and a retry does not redo finished work.
+
+The ``tasks`` modules are imported on first use of the registry rather than at
+startup, so web workers that never queue a job do not load them.
+"""
+from dataclasses import dataclass
+
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Job
+
+_tasks = {}
+_discovered = False
+
+
+def discover():
+    global _discovered
+    if not _discovered:
+        _discovered = True
+        autodiscover_modules('tasks')
+
+
+@dataclass(frozen=True)
+class Task:
+    name: str
+    func: object
+    max_attempts: int
+    priority: int
+
+
+def task(name, max_attempts=3, priority=0):
+    """Register ``func`` under ``name`` with its default retry budget and priority."""
+    def decorator(func):
+        if name in _tasks and _tasks[name].func is not func:
+            raise ValueError(f"Task {name!r} is already registered.")
+        _tasks[name] = Task(name, func, max_attempts, priority)
+        return func
+    return decorator
+
+
+def get_task(name):
+    discover()
+    return _tasks[name]
+
+
+def registered_tasks():
+    discover()
+    return sorted(_tasks)
+
+
+def enqueue(name, payload=None, priority=None, run_after=None, max_attempts=None, user=None):
+    """Queue ``name`` to run with ``payload`` as keyword arguments; returns the Job."""
+    registered = get_task(name)
+    return Job.objects.create(
+        task=name,
+        payload=payload or {},
+        priority=registered.priority if priority is None else priority,
+        max_attempts=registered.max_attempts if max_attempts is None else max_attempts,
+        run_after=run_after or timezone.now(),
+        created_by=user,
+    )
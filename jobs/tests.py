@@ -0,0 +1,117 @@
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.test import TestCase
+from django.core.management import call_command
+from django.utils import timezone
+
+# Cross-app imports
+from inventory.models import Inventory
+from items.models import Item, Category
+from suppliers.models import Supplier
+from storage.models import Location, SubLocation, Area, SubArea
+
+# Local app import
+from .models import Job, JobStatus
+from .registry import task, enqueue, registered_tasks
+from .worker import Worker, retry_delay
+
+calls = []
+
+@task('tests.record', priority=0)
+def record(job, value):
+    calls.append(value)
+    job.report_progress(50, "half way")
+    return {'value': value}
+
+@task('tests.flaky', max_attempts=2)
+def flaky(job):
+    raise RuntimeError("boom")
+
+class JobQueueTest(TestCase):
+
+    def setUp(self):
+        calls.clear()
+        self.worker = Worker(name='test-worker')
+
+    def test_jobs_run_by_priority_then_age(self):
+        enqueue('tests.record', {'value': 'low'})
+        enqueue('tests.record', {'value': 'high'}, priority=5)
+        enqueue('tests.record', {'value': 'later'}, run_after=timezone.now() + timedelta(hours=1))
+
+        self.assertEqual(self.worker.run(burst=True), 2)
+
+        self.assertEqual(calls, ['high', 'low'])
+        job = Job.objects.get(payload={'value': 'low'})
+        self.assertEqual((job.status, job.result, job.progress, job.attempts), (JobStatus.SUCCEEDED, {'value': 'low'}, 100, 1))
+        self.assertEqual(job.progress_message, "half way")
+        self.assertEqual(Job.objects.get(payload={'value': 'later'}).status, JobStatus.QUEUED)
+
+    def test_claim_is_exclusive(self):
+        job = enqueue('tests.record', {'value': 1})
+        other = Worker(name='other-worker')
+
+        self.assertEqual(self.worker.claim().pk, job.pk)
+        self.assertIsNone(other.claim())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), (JobStatus.RUNNING, 'test-worker'))
+
+    def test_failures_retry_with_backoff_then_fail(self):
+        job = enqueue('tests.flaky')
+
+        with self.assertLogs('jobs.worker', 'ERROR'):
+            self.worker.run_one()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (JobStatus.QUEUED, 1))
+        self.assertIn("RuntimeError: boom", job.error)
+        self.assertGreater(job.run_after, timezone.now() + retry_delay(1) - timedelta(seconds=5))
+        self.assertFalse(self.worker.run_one())
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        with self.assertLogs('jobs.worker', 'ERROR'):
+            self.worker.run_one()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (JobStatus.FAILED, 2))
+
+    def test_stale_running_jobs_are_requeued(self):
+        job = enqueue('tests.record', {'value': 1})
+        self.worker.claim()
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(Worker(name='other-worker', stale_after=timedelta(minutes=30)).requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), (JobStatus.QUEUED, ''))
+
+    def test_unknown_task_fails(self):
+        job = Job.objects.create(task='tests.missing')
+        self.worker.run_one()
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.FAILED)
+
+    def test_app_tasks_are_discovered_on_first_use(self):
+        self.assertIn('inventory.import_stock', registered_tasks())
+        self.assertIn('tests.record', registered_tasks())
+
+    def test_background_import_via_commands(self):
+        supplier = Supplier.objects.create(supplier_name="Acme")
+        category = Category.objects.create(name="Tools")
+        Item.objects.create(item_code="H-1", name="Hammer", category=category, supplier=supplier, price=1, internal_value=1)
+        area = Area.objects.create(
+            name="Rack 1", sub_location=SubLocation.objects.create(name="Zone 1", location=Location.objects.create(name="Warehouse A")),
+        )
+        SubArea.objects.create(name="Shelf 1", area=area)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'counts.csv')
+            with open(path, 'w') as fh:
+                fh.write('item_code,location,quantity\nH-1,Warehouse A > Zone 1 > Rack 1 > Shelf 1,7\nX-9,Nowhere,1\n')
+            call_command('import_stock', path, '--background', stdout=StringIO())
+            self.assertFalse(Inventory.objects.filter(item__item_code="H-1").exists())
+            call_command('run_jobs', '--burst', stdout=StringIO())
+
+        job = Job.objects.get(task='inventory.import_stock')
+        self.assertEqual(job.status, JobStatus.SUCCEEDED)
+        self.assertEqual((job.result['upserted'], job.result['rejected']), (1, 1))
+        self.assertEqual(Inventory.objects.get(item__item_code="H-1").quantity, 7)
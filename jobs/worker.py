@@ -0,0 +1,139 @@
+"""
+The job worker loop.
+
+Claiming a job must hand it to exactly one worker. On PostgreSQL the next
+runnable row is locked with ``SELECT ... FOR UPDATE SKIP LOCKED``, so workers
+skip past each other's claims instead of queueing on the same row. Backends
+without SKIP LOCKED (SQLite for local runs) fall back to a compare-and-set
+``UPDATE ... WHERE status = 'QUEUED'``: whichever worker's update matches the
+row wins, and the others move on to the next candidate.
+
+Failed jobs are retried with exponential backoff until ``max_attempts`` is
+used up. Jobs left RUNNING by a worker that died are requeued once their
+last heartbeat is older than ``stale_after``.
+"""
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job, JobStatus
+from .registry import get_task
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_DELAY = timedelta(seconds=30)
+RETRY_MAX_DELAY = timedelta(hours=1)
+CLAIM_CANDIDATES = 10
+
+
+def retry_delay(attempts):
+    return min(RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0), RETRY_MAX_DELAY)
+
+
+class Worker:
+
+    def __init__(self, name=None, poll_interval=1.0, stale_after=timedelta(minutes=30)):
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.stopping = False
+
+    def stop(self, *args):
+        """Finish the current job, then exit the loop (usable as a signal handler)."""
+        self.stopping = True
+
+    def runnable(self):
+        return Job.objects.filter(status=JobStatus.QUEUED, run_after__lte=timezone.now()).order_by(
+            '-priority', 'run_after'
+        )
+
+    def claim(self):
+        """Claim the next runnable job for this worker, or return None."""
+        now = timezone.now()
+        claimed = {
+            'status': JobStatus.RUNNING, 'attempts': F('attempts') + 1,
+            'locked_by': self.name, 'locked_at': now, 'started_at': now,
+        }
+        if connection.features.has_select_for_update_skip_locked:
+            with transaction.atomic():
+                job = self.runnable().select_for_update(skip_locked=True).first()
+                if job is None:
+                    return None
+                Job.objects.filter(pk=job.pk).update(**claimed)
+        else:
+            for pk in self.runnable().values_list('pk', flat=True)[:CLAIM_CANDIDATES]:
+                if Job.objects.filter(pk=pk, status=JobStatus.QUEUED).update(**claimed):
+                    break
+            else:
+                return None
+            job = Job(pk=pk)
+        job.refresh_from_db()
+        return job
+
+    def requeue_stale(self):
+        """Return jobs whose worker stopped heart-beating to the queue (or fail them if out of attempts)."""
+        stale = Job.objects.filter(status=JobStatus.RUNNING, locked_at__lt=timezone.now() - self.stale_after)
+        error = "Worker stopped responding."
+        failed = stale.filter(attempts__gte=F('max_attempts')).update(
+            status=JobStatus.FAILED, locked_by='', error=error, finished_at=timezone.now(),
+        )
+        requeued = stale.update(status=JobStatus.QUEUED, locked_by='', locked_at=None, error=error)
+        return requeued + failed
+
+    def execute(self, job):
+        try:
+            registered = get_task(job.task)
+        except KeyError:
+            self.finish(job, JobStatus.FAILED, error=f"Unknown task {job.task!r}.")
+            return
+
+        logger.info("Running job %s (%s), attempt %s", job.pk, job.task, job.attempts)
+        try:
+            result = registered.func(job, **job.payload)
+        except Exception:
+            error = traceback.format_exc()
+            logger.exception("Job %s (%s) failed", job.pk, job.task)
+            if job.attempts < job.max_attempts:
+                Job.objects.filter(pk=job.pk, locked_by=self.name).update(
+                    status=JobStatus.QUEUED, locked_by='', locked_at=None, error=error,
+                    run_after=timezone.now() + retry_delay(job.attempts),
+                )
+            else:
+                self.finish(job, JobStatus.FAILED, error=error)
+        else:
+            self.finish(job, JobStatus.SUCCEEDED, result=result, progress=100)
+
+    def finish(self, job, status, **fields):
+        Job.objects.filter(pk=job.pk, locked_by=self.name).update(
+            status=status, locked_by='', finished_at=timezone.now(), **fields,
+        )
+
+    def run_one(self):
+        """Claim and run a single job; returns False if the queue had nothing runnable."""
+        close_old_connections()
+        job = self.claim()
+        if job is None:
+            return False
+        self.execute(job)
+        return True
+
+    def run(self, burst=False, max_jobs=None):
+        """Process jobs until stopped; with ``burst``, exit as soon as the queue is empty."""
+        processed = 0
+        self.requeue_stale()
+        while not self.stopping and (max_jobs is None or processed < max_jobs):
+            if self.run_one():
+                processed += 1
+                continue
+            if burst:
+                break
+            self.requeue_stale()
+            time.sleep(self.poll_interval)
+        return processed
@@ -1,3 +1,152 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.core.exceptions import ValidationError
+from django.db.models import Count
+from .models import (
+    PurchaseOrder, PurchaseOrderLine, ReorderRule, OrderStatus, RECEIVABLE_STATUSES,
+    TransferOrder, TransferOrderLine, TransferStatus,
+)
+from .receiving import receive_orders
+from .reorder import suggest, create_draft_orders
+from .transfers import dispatch_transfer, receive_transfer
+from inventory.movements import InsufficientStock, StaleInventory
 
-# Register your models here.
+class PurchaseOrderLineInline(admin.TabularInline):
+    """Lines can only be edited while the order is a draft; after that they are what the supplier was sent."""
+    model = PurchaseOrderLine
+    extra = 1
+    raw_id_fields = ('item', 'location')
+    readonly_fields = ('quantity_received',)
+
+    def has_add_permission(self, request, obj=None):
+        return super().has_add_permission(request, obj) and (obj is None or obj.status == OrderStatus.DRAFT)
+
+    def has_change_permission(self, request, obj=None):
+        return super().has_change_permission(request, obj) and (obj is None or obj.status == OrderStatus.DRAFT)
+
+    def has_delete_permission(self, request, obj=None):
+        return super().has_delete_permission(request, obj) and (obj is None or obj.status == OrderStatus.DRAFT)
+
+class PurchaseOrderAdmin(admin.ModelAdmin):
+    list_display = ('reference', 'supplier', 'status', 'line_count', 'expected_date', 'created_at')
+    list_select_related = ('supplier',)
+    list_filter = ('status', 'expected_date')
+    search_fields = ('reference', 'supplier__supplier_name')
+    readonly_fields = ('status',)
+    inlines = (PurchaseOrderLineInline,)
+    actions = ('place_orders', 'receive_outstanding')
+
+    def get_readonly_fields(self, request, obj=None):
+        if obj is not None and obj.status != OrderStatus.DRAFT:
+            return ('status', 'supplier')
+        return self.readonly_fields
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(line_count=Count('lines'))
+
+    def line_count(self, obj):
+        return obj.line_count
+    line_count.short_description = 'Lines'
+    line_count.admin_order_field = 'line_count'
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
+
+    @admin.action(description="Place selected draft orders")
+    def place_orders(self, request, queryset):
+        placed = queryset.filter(status=OrderStatus.DRAFT).update(status=OrderStatus.ORDERED)
+        self.message_user(request, f"Placed {placed} order(s).")
+
+    @admin.action(description="Receive everything outstanding on selected orders")
+    def receive_outstanding(self, request, queryset):
+        order_ids = queryset.filter(status__in=RECEIVABLE_STATUSES).values_list('pk', flat=True)
+        try:
+            movements = receive_orders(dict.fromkeys(order_ids), user=request.user)
+        except ValidationError as exc:
+            self.message_user(request, ' '.join(exc.messages), messages.ERROR)
+            return
+        self.message_user(request, f"Booked {len(movements)} line(s) into stock.")
+
+admin.site.register(PurchaseOrder, PurchaseOrderAdmin)
+
+class ReorderRuleAdmin(admin.ModelAdmin):
+    list_display = ('item', 'location', 'min_quantity', 'max_quantity')
+    list_select_related = ('item', 'location')
+    list_editable = ('min_quantity', 'max_quantity')
+    list_filter = ('location',)
+    search_fields = ('item__item_code', 'item__name')
+    raw_id_fields = ('item', 'put_away')
+    actions = ('raise_draft_orders',)
+
+    @admin.action(description="Raise draft orders for selected rules below their minimum")
+    def raise_draft_orders(self, request, queryset):
+        orders = create_draft_orders(suggest(queryset), user=request.user)
+        self.message_user(request, f"Raised {len(orders)} draft order(s).")
+
+admin.site.register(ReorderRule, ReorderRuleAdmin)
+
+class TransferOrderLineInline(admin.TabularInline):
+    """Lines can only be edited while the order is a draft; after dispatch they are what is in transit."""
+    model = TransferOrderLine
+    extra = 1
+    autocomplete_fields = ('item', 'from_location', 'to_location')
+
+    def has_add_permission(self, request, obj=None):
+        return super().has_add_permission(request, obj) and (obj is None or obj.status == TransferStatus.DRAFT)
+
+    def has_change_permission(self, request, obj=None):
+        return super().has_change_permission(request, obj) and (obj is None or obj.status == TransferStatus.DRAFT)
+
+    def has_delete_permission(self, request, obj=None):
+        return super().has_delete_permission(request, obj) and (obj is None or obj.status == TransferStatus.DRAFT)
+
+class TransferOrderAdmin(admin.ModelAdmin):
+    list_display = ('reference', 'from_site', 'to_site', 'status', 'line_count', 'created_at', 'dispatched_at', 'received_at')
+    list_select_related = ('from_site', 'to_site')
+    list_filter = ('status', 'from_site', 'to_site')
+    search_fields = ('reference',)
+    readonly_fields = ('status',)
+    inlines = (TransferOrderLineInline,)
+    actions = ('dispatch_transfers', 'receive_transfers')
+
+    def get_readonly_fields(self, request, obj=None):
+        if obj is not None and obj.status != TransferStatus.DRAFT:
+            return ('status', 'from_site', 'to_site')
+        return self.readonly_fields
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(line_count=Count('lines'))
+
+    def line_count(self, obj):
+        return obj.line_count
+    line_count.short_description = 'Lines'
+    line_count.admin_order_field = 'line_count'
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
+
+    def advance(self, request, queryset, status, step, done):
+        # Each order is its own transaction, so one bad order does not hold up the rest.
+        moved = 0
+        for order in queryset.filter(status=status).order_by('created_at'):
+            try:
+                step(order.pk, user=request.user)
+            except (ValidationError, InsufficientStock, StaleInventory) as exc:
+                message = ' '.join(exc.messages) if isinstance(exc, ValidationError) else str(exc)
+                self.message_user(request, f"{order}: {message}", messages.ERROR)
+            else:
+                moved += 1
+        self.message_user(request, f"{done} {moved} transfer(s).")
+
+    @admin.action(description="Dispatch selected draft transfers")
+    def dispatch_transfers(self, request, queryset):
+        self.advance(request, queryset, TransferStatus.DRAFT, dispatch_transfer, "Dispatched")
+
+    @admin.action(description="Receive selected in-transit transfers")
+    def receive_transfers(self, request, queryset):
+        self.advance(request, queryset, TransferStatus.IN_TRANSIT, receive_transfer, "Received")
+
+admin.site.register(TransferOrder, TransferOrderAdmin)
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.registry import enqueue
+from orders.reorder import suggest, by_supplier, create_draft_orders
+from suppliers.models import Supplier
+
+
+class Command(BaseCommand):
+    help = "List items below their reorder point, grouped by supplier; optionally raise draft purchase orders."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--create-orders', action='store_true', help="Raise DRAFT purchase orders for the suggestions.")
+        parser.add_argument('--background', action='store_true', help="Queue the run for a run_jobs worker instead.")
+
+    def handle(self, *args, **options):
+        if options['background']:
+            job = enqueue('orders.reorder', {'create_orders': options['create_orders']})
+            self.stdout.write(self.style.SUCCESS(f"Queued reorder run as job {job.pk}."))
+            return
+
+        started = time.perf_counter()
+        suggestions = suggest()
+        elapsed = time.perf_counter() - started
+
+        grouped = by_supplier(suggestions)
+        names = dict(Supplier.objects.filter(pk__in=grouped).values_list('pk', 'supplier_name'))
+        for supplier_id, group in grouped.items():
+            self.stdout.write(f"{names[supplier_id]}: {len(group)} item(s), {sum(s.quantity for s in group)} unit(s)")
+        self.stdout.write(f"{len(suggestions)} suggestion(s) computed in {elapsed:.2f}s.")
+
+        if options['create_orders']:
+            orders = create_draft_orders(suggestions)
+            self.stdout.write(self.style.SUCCESS(f"Raised {len(orders)} draft purchase order(s)."))
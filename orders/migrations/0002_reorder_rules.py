@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-17 18:56
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0003_hot_filter_indexes'),
+        ('orders', '0001_initial'),
+        ('storage', '0004_storage_hierarchy_paths'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='deliver_to',
+            field=models.ForeignKey(blank=True, help_text='Site the delivery is expected at, for lines without their own location.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='storage.location'),
+        ),
+        migrations.CreateModel(
+            name='ReorderRule',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('min_quantity', models.PositiveIntegerField(help_text='Reorder when stock plus open orders falls below this.')),
+                ('max_quantity', models.PositiveIntegerField(help_text='Order back up to this level.')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reorder_rules', to='items.item')),
+                ('location', models.ForeignKey(blank=True, help_text='Leave blank to apply the levels to all stock of the item.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='storage.location')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('item', 'location'), name='reorder_rule_item_location'), models.UniqueConstraint(condition=models.Q(('location__isnull', True)), fields=('item',), name='reorder_rule_item_global'), models.CheckConstraint(condition=models.Q(('max_quantity__gte', models.F('min_quantity'))), name='reorder_rule_max_gte_min')],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 6.0 on 2026-10-17 19:36
+
+import django.core.validators
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0003_hot_filter_indexes'),
+        ('orders', '0002_reorder_rules'),
+        ('storage', '0004_storage_hierarchy_paths'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransferOrder',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('reference', models.CharField(blank=True, max_length=30, unique=True)),
+                ('status', models.CharField(choices=[('DRAFT', 'Draft'), ('IN_TRANSIT', 'In Transit'), ('RECEIVED', 'Received')], default='DRAFT', max_length=10)),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('dispatched_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('received_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('created_by', models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('from_site', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='storage.location')),
+                ('to_site', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='storage.location')),
+            ],
+            options={
+                'ordering': ('-created_at',),
+            },
+        ),
+        migrations.CreateModel(
+            name='TransferOrderLine',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('quantity', models.PositiveIntegerField(validators=[django.core.validators.MinValueValidator(1)])),
+                ('from_location', models.ForeignKey(help_text='Picked from, at the source site.', on_delete=django.db.models.deletion.PROTECT, related_name='+', to='storage.subarea')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='items.item')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='orders.transferorder')),
+                ('to_location', models.ForeignKey(help_text='Put away at, at the destination site.', on_delete=django.db.models.deletion.PROTECT, related_name='+', to='storage.subarea')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='transferorder',
+            index=models.Index(fields=['to_site', 'status'], name='transfer_to_site_status'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='transferorderline',
+            unique_together={('order', 'item', 'from_location', 'to_location')},
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-17 19:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_transfer_orders'),
+        ('storage', '0004_storage_hierarchy_paths'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reorderrule',
+            name='put_away',
+            field=models.ForeignKey(blank=True, help_text='Where reordered stock is put away. Leave blank to use the bin already holding the most of it.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='storage.subarea'),
+        ),
+    ]
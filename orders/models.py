@@ -1,3 +1,197 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator
+from django.db.models import F, Q
+import uuid
 
-# Create your models here.
+class OrderStatus(models.TextChoices):
+    DRAFT = 'DRAFT', 'Draft'
+    ORDERED = 'ORDERED', 'Ordered'
+    PARTIAL = 'PARTIAL', 'Partially Received'
+    RECEIVED = 'RECEIVED', 'Received'
+    CANCELLED = 'CANCELLED', 'Cancelled'
+
+RECEIVABLE_STATUSES = (OrderStatus.ORDERED, OrderStatus.PARTIAL)
+OPEN_STATUSES = (OrderStatus.DRAFT, *RECEIVABLE_STATUSES)
+
+class ReferenceCounter(models.Model):
+    """The last number handed out for each reference prefix (``PO``, ``TR``)."""
+    prefix = models.CharField(max_length=10, primary_key=True)
+    last_number = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.prefix}: {self.last_number}"
+
+def next_references(prefix, count=1):
+    """
+    Reserve ``count`` consecutive references such as ``PO-000042``.
+
+    The counter row stays locked until the caller's transaction ends, so
+    concurrent orders queue briefly instead of racing for a number.
+    """
+    with transaction.atomic():
+        ReferenceCounter.objects.get_or_create(prefix=prefix)
+        counter = ReferenceCounter.objects.select_for_update().get(prefix=prefix)
+        first = counter.last_number + 1
+        counter.last_number += count
+        counter.save(update_fields=['last_number'])
+    return [f"{prefix}-{number:06d}" for number in range(first, first + count)]
+
+class PurchaseOrder(models.Model):
+    """
+    An order placed with a single supplier. Deliveries are booked through
+    ``orders.receiving.receive_orders``, which moves the status on from
+    ORDERED to PARTIAL/RECEIVED.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    reference = models.CharField(max_length=30, unique=True, blank=True)
+    supplier = models.ForeignKey('suppliers.Supplier', on_delete=models.PROTECT, related_name='purchase_orders')
+    status = models.CharField(max_length=10, choices=OrderStatus.choices, default=OrderStatus.DRAFT)
+    deliver_to = models.ForeignKey(
+        'storage.Location', on_delete=models.PROTECT, null=True, blank=True, related_name='+',
+        help_text="Site the delivery is expected at, for lines without their own location.",
+    )
+    expected_date = models.DateField(null=True, blank=True)
+    notes = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, editable=False
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ('-created_at',)
+        indexes = [
+            # Open orders per supplier (receiving screens, reorder runs).
+            models.Index(fields=['supplier', 'status'], name='po_supplier_status'),
+        ]
+
+    def __str__(self):
+        return self.reference
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            if not self.reference:
+                [self.reference] = next_references('PO')
+            super().save(*args, **kwargs)
+
+class PurchaseOrderLine(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    order = models.ForeignKey(PurchaseOrder, on_delete=models.CASCADE, related_name='lines')
+    item = models.ForeignKey('items.Item', on_delete=models.PROTECT)
+    location = models.ForeignKey(
+        'storage.SubArea', on_delete=models.PROTECT, null=True, blank=True, related_name='+',
+        help_text="Where deliveries of this line are put away.",
+    )
+    quantity_ordered = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+    quantity_received = models.PositiveIntegerField(default=0, editable=False)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
+
+    class Meta:
+        unique_together = ('order', 'item')
+
+    def __str__(self):
+        return f"{self.order} - {self.item_id} x {self.quantity_ordered}"
+
+    @property
+    def quantity_outstanding(self):
+        return max(self.quantity_ordered - self.quantity_received, 0)
+
+    def clean(self):
+        if self.item_id and self.order_id and self.item.supplier_id != self.order.supplier_id:
+            raise ValidationError({'item': "This item is not sold by the order's supplier."})
+
+class ReorderRule(models.Model):
+    """
+    Min/max stock levels for an Item, either across the whole catalogue
+    (no ``location``) or within one site. See ``orders.reorder``.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    item = models.ForeignKey('items.Item', on_delete=models.CASCADE, related_name='reorder_rules')
+    location = models.ForeignKey(
+        'storage.Location', on_delete=models.CASCADE, null=True, blank=True, related_name='+',
+        help_text="Leave blank to apply the levels to all stock of the item.",
+    )
+    put_away = models.ForeignKey(
+        'storage.SubArea', on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+        help_text="Where reordered stock is put away. Leave blank to use the bin already holding the most of it.",
+    )
+    min_quantity = models.PositiveIntegerField(help_text="Reorder when stock plus open orders falls below this.")
+    max_quantity = models.PositiveIntegerField(help_text="Order back up to this level.")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['item', 'location'], name='reorder_rule_item_location'),
+            models.UniqueConstraint(fields=['item'], condition=Q(location__isnull=True), name='reorder_rule_item_global'),
+            models.CheckConstraint(condition=Q(max_quantity__gte=F('min_quantity')), name='reorder_rule_max_gte_min'),
+        ]
+
+    def clean(self):
+        if self.put_away_id and self.location_id and self.put_away.area.sub_location.location_id != self.location_id:
+            raise ValidationError({'put_away': "This bin is not at the rule's site."})
+
+    def __str__(self):
+        return f"{self.item_id} @ {self.location_id or 'all'}: {self.min_quantity}-{self.max_quantity}"
+
+class TransferStatus(models.TextChoices):
+    DRAFT = 'DRAFT', 'Draft'
+    IN_TRANSIT = 'IN_TRANSIT', 'In Transit'
+    RECEIVED = 'RECEIVED', 'Received'
+
+class TransferOrder(models.Model):
+    """
+    Stock moving between two sites. ``orders.transfers.dispatch_transfer``
+    takes it out of the source SubAreas (DRAFT to IN_TRANSIT) and
+    ``receive_transfer`` puts it away at the destination (to RECEIVED).
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    reference = models.CharField(max_length=30, unique=True, blank=True)
+    from_site = models.ForeignKey('storage.Location', on_delete=models.PROTECT, related_name='+')
+    to_site = models.ForeignKey('storage.Location', on_delete=models.PROTECT, related_name='+')
+    status = models.CharField(max_length=10, choices=TransferStatus.choices, default=TransferStatus.DRAFT)
+    notes = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    dispatched_at = models.DateTimeField(null=True, blank=True, editable=False)
+    received_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        ordering = ('-created_at',)
+        indexes = [
+            # Inbound transfers awaiting receipt at a site.
+            models.Index(fields=['to_site', 'status'], name='transfer_to_site_status'),
+        ]
+
+    def __str__(self):
+        return self.reference
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            if not self.reference:
+                [self.reference] = next_references('TR')
+            super().save(*args, **kwargs)
+
+    def clean(self):
+        if self.from_site_id and self.from_site_id == self.to_site_id:
+            raise ValidationError({'to_site': "A transfer needs two different sites."})
+
+class TransferOrderLine(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    order = models.ForeignKey(TransferOrder, on_delete=models.CASCADE, related_name='lines')
+    item = models.ForeignKey('items.Item', on_delete=models.PROTECT, related_name='+')
+    from_location = models.ForeignKey(
+        'storage.SubArea', on_delete=models.PROTECT, related_name='+', help_text="Picked from, at the source site.",
+    )
+    to_location = models.ForeignKey(
+        'storage.SubArea', on_delete=models.PROTECT, related_name='+', help_text="Put away at, at the destination site.",
+    )
+    quantity = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+
+    class Meta:
+        unique_together = ('order', 'item', 'from_location', 'to_location')
+
+    def __str__(self):
+        return f"{self.order} - {self.item_id} x {self.quantity}"
@@ -0,0 +1,88 @@
+"""
+Booking deliveries against purchase orders.
+
+A receipt for any number of orders is posted as one batch of RECEIVE
+movements through ``inventory.movements.post_movements``, so Inventory is
+upserted with bulk writes and its rows locked in a fixed order. The orders
+themselves are locked first, also in primary-key order, so two workers
+receiving overlapping sets of orders queue rather than deadlock, and the same
+order can never be received twice concurrently.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from inventory.models import MovementType, StockMovement
+from inventory.movements import post_movements
+from .models import OrderStatus, PurchaseOrder, PurchaseOrderLine, RECEIVABLE_STATUSES
+
+LINE_BATCH_SIZE = 500
+
+
+def receive_orders(receipts, location=None, user=None):
+    """
+    Receive deliveries in a single transaction.
+
+    ``receipts`` maps a PurchaseOrder id to ``{line_id: quantity}``, or to None
+    to receive everything outstanding on that order. Each line is put away at
+    its own ``location``, falling back to ``location``. Raises ValidationError
+    (and books nothing) if any order or line cannot be received as asked.
+    Returns the posted StockMovements.
+    """
+    with transaction.atomic():
+        orders = {
+            order.pk: order
+            for order in PurchaseOrder.objects.select_for_update().filter(pk__in=receipts).order_by('pk')
+        }
+        missing = set(receipts) - set(orders)
+        if missing:
+            raise ValidationError(f"Unknown purchase orders: {', '.join(map(str, sorted(missing)))}.")
+        for order in orders.values():
+            if order.status not in RECEIVABLE_STATUSES:
+                raise ValidationError(f"{order} is {order.get_status_display().lower()} and cannot be received.")
+
+        lines = PurchaseOrderLine.objects.filter(order__in=orders).order_by('order_id', 'pk')
+        lines_by_order = {}
+        for line in lines:
+            lines_by_order.setdefault(line.order_id, {})[line.pk] = line
+
+        movements, received = [], []
+        for order_id, quantities in receipts.items():
+            order_lines = lines_by_order.get(order_id, {})
+            if quantities is None:
+                quantities = {pk: line.quantity_outstanding for pk, line in order_lines.items()}
+            for line_id, quantity in quantities.items():
+                line = order_lines.get(line_id)
+                if line is None:
+                    raise ValidationError(f"Line {line_id} is not on {orders[order_id]}.")
+                if not quantity:
+                    continue
+                if quantity < 0 or quantity > line.quantity_outstanding:
+                    raise ValidationError(
+                        f"Cannot receive {quantity} of {line.item_id} on {orders[order_id]}; "
+                        f"{line.quantity_outstanding} outstanding."
+                    )
+                to_location_id = line.location_id or getattr(location, 'pk', location)
+                if to_location_id is None:
+                    raise ValidationError(f"No put-away location for {line.item_id} on {orders[order_id]}.")
+                movements.append(StockMovement(
+                    movement_type=MovementType.RECEIVE, item_id=line.item_id, to_location_id=to_location_id,
+                    quantity=quantity, reference=orders[order_id].reference,
+                ))
+                line.quantity_received += quantity
+                received.append(line)
+
+        if not movements:
+            return []
+
+        post_movements(movements, user=user)
+        PurchaseOrderLine.objects.bulk_update(received, ['quantity_received'], batch_size=LINE_BATCH_SIZE)
+
+        now = timezone.now()
+        touched = [orders[order_id] for order_id in sorted({line.order_id for line in received})]
+        for order in touched:
+            complete = all(line.quantity_outstanding == 0 for line in lines_by_order[order.pk].values())
+            order.status = OrderStatus.RECEIVED if complete else OrderStatus.PARTIAL
+            order.updated_at = now
+        PurchaseOrder.objects.bulk_update(touched, ['status', 'updated_at'])
+    return movements
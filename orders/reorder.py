@@ -0,0 +1,151 @@
+"""
+Reorder-point engine.
+
+``suggest()`` evaluates ReorderRules against stock in three grouped queries,
+however many rules and Inventory rows there are: one over the rules, one
+aggregating Inventory per (item, site), and one aggregating outstanding
+quantities on open purchase orders (drafts included) per (item, site). The
+join between them is a dict lookup per rule. Counting open orders as incoming
+means re-running the engine does not re-order the same gap.
+
+``create_draft_orders()`` turns suggestions into one DRAFT PurchaseOrder per
+supplier and site, written with two ``bulk_create`` calls. Every line gets a
+put-away SubArea so the order can be received as it stands: the rule's
+``put_away`` if set, otherwise the bin already holding the most of the item at
+the site (anywhere, for catalogue-wide rules). Items never stocked before get
+no location and must be given one on the order before it is received.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import F, Sum
+
+from inventory.models import Inventory
+from reporting.rollups import SITE_PATH
+from .models import PurchaseOrder, PurchaseOrderLine, ReorderRule, OPEN_STATUSES, next_references
+
+LINE_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    rule_id: object
+    item_id: object
+    supplier_id: object
+    location_id: object
+    put_away_id: object
+    on_hand: int
+    on_order: int
+    min_quantity: int
+    max_quantity: int
+    quantity: int
+    unit_price: object
+
+
+def _per_site(rows):
+    """Fold ``(item_id, site_id, quantity)`` rows into per-site and per-item totals."""
+    by_site, by_item = defaultdict(int), defaultdict(int)
+    for item_id, site_id, quantity in rows:
+        by_site[(item_id, site_id)] += quantity
+        by_item[item_id] += quantity
+    return by_site, by_item
+
+
+def suggest(rules=None):
+    """
+    Return a Suggestion for every rule (default: all) whose stock on hand plus
+    open orders is below ``min_quantity``, ordering back up to ``max_quantity``.
+
+    Site rules count stock under their Location and open order lines put away
+    there (or delivered there, when a line has no location of its own);
+    catalogue-wide rules count everything.
+    """
+    stock = Inventory.objects.filter(quantity__gt=0)
+    lines = PurchaseOrderLine.objects.filter(order__status__in=OPEN_STATUSES, quantity_received__lt=F('quantity_ordered'))
+    if rules is None:
+        rules = ReorderRule.objects.all()
+    else:
+        stock = stock.filter(item__in=rules.values('item'))
+        lines = lines.filter(item__in=rules.values('item'))
+
+    on_hand, on_hand_total = _per_site(
+        stock.values('item_id', SITE_PATH).annotate(total=Sum('quantity')).values_list('item_id', SITE_PATH, 'total')
+    )
+    on_order, on_order_total = _per_site(
+        (item_id, line_site or order_site, total)
+        for item_id, line_site, order_site, total in lines.values('item_id', SITE_PATH, 'order__deliver_to_id').annotate(
+            total=Sum(F('quantity_ordered') - F('quantity_received'))
+        ).values_list('item_id', SITE_PATH, 'order__deliver_to_id', 'total')
+    )
+
+    suggestions = []
+    for rule in rules.values(
+        'pk', 'item_id', 'item__supplier_id', 'item__price', 'location_id', 'put_away_id', 'min_quantity', 'max_quantity',
+    ).order_by('item__supplier_id', 'location_id', 'item_id'):
+        item_id, site_id = rule['item_id'], rule['location_id']
+        if site_id is None:
+            held, incoming = on_hand_total[item_id], on_order_total[item_id]
+        else:
+            held, incoming = on_hand[(item_id, site_id)], on_order[(item_id, site_id)]
+        if held + incoming >= rule['min_quantity']:
+            continue
+        suggestions.append(Suggestion(
+            rule_id=rule['pk'], item_id=item_id, supplier_id=rule['item__supplier_id'], location_id=site_id,
+            put_away_id=rule['put_away_id'],
+            on_hand=held, on_order=incoming, min_quantity=rule['min_quantity'], max_quantity=rule['max_quantity'],
+            quantity=rule['max_quantity'] - held - incoming, unit_price=rule['item__price'],
+        ))
+    return suggestions
+
+
+def by_supplier(suggestions):
+    """Group suggestions as ``{supplier_id: [Suggestion, ...]}``."""
+    grouped = defaultdict(list)
+    for suggestion in suggestions:
+        grouped[suggestion.supplier_id].append(suggestion)
+    return dict(grouped)
+
+
+def _put_away_bins(suggestions):
+    """Map ``(item_id, site_id)`` and ``(item_id, None)`` to the SubArea holding the most of the item."""
+    item_ids = {suggestion.item_id for suggestion in suggestions if suggestion.put_away_id is None}
+    bins = {}
+    if not item_ids:
+        return bins
+    rows = Inventory.objects.filter(item_id__in=item_ids).order_by('-quantity', 'location__full_path')
+    for item_id, site_id, location_id in rows.values_list('item_id', SITE_PATH, 'location_id'):
+        bins.setdefault((item_id, site_id), location_id)
+        bins.setdefault((item_id, None), location_id)
+    return bins
+
+
+def create_draft_orders(suggestions, user=None):
+    """Create one DRAFT order per (supplier, site) holding the suggested lines; returns the orders."""
+    grouped = defaultdict(list)
+    for suggestion in suggestions:
+        grouped[(suggestion.supplier_id, suggestion.location_id)].append(suggestion)
+    if not grouped:
+        return []
+    bins = _put_away_bins(suggestions)
+
+    with transaction.atomic():
+        # bulk_create skips save(), which normally fills the reference in.
+        orders = {
+            key: PurchaseOrder(
+                supplier_id=key[0], deliver_to_id=key[1], created_by=user,
+                reference=reference, notes="Raised by the reorder engine.",
+            )
+            for key, reference in zip(grouped, next_references('PO', len(grouped)))
+        }
+        PurchaseOrder.objects.bulk_create(orders.values())
+        PurchaseOrderLine.objects.bulk_create([
+            PurchaseOrderLine(
+                order=orders[key], item_id=suggestion.item_id,
+                location_id=suggestion.put_away_id or bins.get((suggestion.item_id, suggestion.location_id)),
+                quantity_ordered=suggestion.quantity, unit_price=suggestion.unit_price,
+            )
+            for key, group in grouped.items()
+            for suggestion in group
+        ], batch_size=LINE_BATCH_SIZE)
+    return list(orders.values())
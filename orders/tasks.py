@@ -0,0 +1,10 @@
+from jobs.registry import task
+from .reorder import suggest, create_draft_orders
+
+
+@task('orders.reorder')
+def reorder(job, create_orders=False):
+    suggestions = suggest()
+    job.report_progress(50, f"{len(suggestions)} suggestion(s)")
+    orders = create_draft_orders(suggestions, user=job.created_by) if create_orders else []
+    return {'suggestions': len(suggestions), 'orders': [order.reference for order in orders]}
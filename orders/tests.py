@@ -1,3 +1,366 @@
+from io import StringIO
+
 from django.test import TestCase
+from django.core.management import call_command
+from django.core.exceptions import ValidationError
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+# Cross-app imports
+from inventory.models import Inventory, StockMovement, MovementType
+from items.models import Item, Category
+from suppliers.models import Supplier
+from storage.models import Location, SubLocation, Area, SubArea
+
+# Local app import
+from inventory.movements import post_movement, InsufficientStock
+from .models import (
+    PurchaseOrder, PurchaseOrderLine, ReorderRule, OrderStatus, TransferOrder, TransferOrderLine, TransferStatus,
+    next_references,
+)
+from .receiving import receive_orders
+from .transfers import dispatch_transfer, receive_transfer
+from .reorder import suggest, by_supplier, create_draft_orders
+
+class PurchaseOrderReceivingTest(TestCase):
+
+    def setUp(self):
+        self.category = Category.objects.create(name="Fixings")
+        self.supplier = Supplier.objects.create(supplier_name="Bolt Co")
+        area = Area.objects.create(
+            name="Rack 1",
+            sub_location=SubLocation.objects.create(name="Zone 1", location=Location.objects.create(name="Warehouse A")),
+        )
+        self.goods_in = SubArea.objects.create(name="Goods In", area=area)
+        self.shelf = SubArea.objects.create(name="Shelf 1", area=area)
+        self.items = [
+            Item.objects.create(
+                item_code=f"B-{n}", name=f"Bolt {n}", category=self.category,
+                supplier=self.supplier, price=1.00, internal_value=0.50,
+            )
+            for n in range(30)
+        ]
+
+    def make_order(self, items, quantity=10, status=OrderStatus.ORDERED, location=None):
+        order = PurchaseOrder.objects.create(supplier=self.supplier, status=status)
+        PurchaseOrderLine.objects.bulk_create([
+            PurchaseOrderLine(order=order, item=item, quantity_ordered=quantity, unit_price=1, location=location)
+            for item in items
+        ])
+        return order
+
+    def stock(self, item, location):
+        return Inventory.objects.filter(item=item, location=location).values_list('quantity', flat=True).first() or 0
+
+    def test_references_are_numbered_in_sequence(self):
+        first, second = self.make_order([]), self.make_order([])
+        number = int(first.reference.removeprefix("PO-"))
+        self.assertEqual(second.reference, f"PO-{number + 1:06d}")
+        [third, fourth] = next_references('PO', 2)
+        self.assertEqual((third, fourth), (f"PO-{number + 2:06d}", f"PO-{number + 3:06d}"))
+        self.assertEqual(next_references('TR'), ["TR-000001"])
+
+    def test_receive_everything_outstanding(self):
+        order = self.make_order(self.items[:3], location=self.shelf)
+        movements = receive_orders({order.pk: None})
+
+        self.assertEqual(len(movements), 3)
+        self.assertEqual(self.stock(self.items[0], self.shelf), 10)
+        self.assertEqual(
+            StockMovement.objects.filter(reference=order.reference, movement_type=MovementType.RECEIVE).count(), 3
+        )
+        order.refresh_from_db()
+        self.assertEqual(order.status, OrderStatus.RECEIVED)
+        self.assertFalse(order.lines.exclude(quantity_received=10).exists())
+
+    def test_partial_then_final_receipt(self):
+        order = self.make_order(self.items[:2])
+        first, second = order.lines.order_by('item__item_code')
+
+        receive_orders({order.pk: {first.pk: 4}}, location=self.goods_in)
+        order.refresh_from_db()
+        self.assertEqual(order.status, OrderStatus.PARTIAL)
+
+        receive_orders({order.pk: None}, location=self.goods_in)
+        order.refresh_from_db()
+        self.assertEqual(order.status, OrderStatus.RECEIVED)
+        self.assertEqual(self.stock(first.item, self.goods_in), 10)
+        self.assertEqual(self.stock(second.item, self.goods_in), 10)
+
+    def test_over_receipt_books_nothing(self):
+        good = self.make_order(self.items[:1], location=self.shelf)
+        bad = self.make_order(self.items[1:2], location=self.shelf)
+        bad_line = bad.lines.get()
+
+        with self.assertRaises(ValidationError):
+            receive_orders({good.pk: None, bad.pk: {bad_line.pk: 11}})
+
+        self.assertFalse(Inventory.objects.exists())
+        good.refresh_from_db()
+        self.assertEqual(good.status, OrderStatus.ORDERED)
+
+    def test_draft_and_missing_location_are_rejected(self):
+        draft = self.make_order(self.items[:1], status=OrderStatus.DRAFT, location=self.shelf)
+        with self.assertRaises(ValidationError):
+            receive_orders({draft.pk: None})
+
+        unplaced = self.make_order(self.items[:1])
+        with self.assertRaises(ValidationError):
+            receive_orders({unplaced.pk: None})
+
+    def test_query_count_does_not_grow_with_lines(self):
+        small = self.make_order(self.items[:2], location=self.shelf)
+        with CaptureQueriesContext(connection) as few:
+            receive_orders({small.pk: None})
+
+        large = [self.make_order(self.items[n:n + 10], location=self.goods_in) for n in range(0, 30, 10)]
+        with CaptureQueriesContext(connection) as many:
+            receive_orders(dict.fromkeys(order.pk for order in large))
+
+        self.assertEqual(Inventory.objects.filter(location=self.goods_in).count(), 30)
+        self.assertEqual(len(many), len(few))
+
+    def test_admin_receive_action(self):
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.client.force_login(user)
+        order = self.make_order(self.items[:2], location=self.shelf)
+
+        response = self.client.post(reverse('admin:orders_purchaseorder_changelist'), {
+            'action': 'receive_outstanding', '_selected_action': [order.pk],
+        })
+
+        self.assertEqual(response.status_code, 302)
+        order.refresh_from_db()
+        self.assertEqual(order.status, OrderStatus.RECEIVED)
+        self.assertEqual(StockMovement.objects.get(item=self.items[0]).created_by, user)
+
+    def test_placed_orders_are_frozen(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        order = self.make_order(self.items[:2], status=OrderStatus.DRAFT)
+        change_url = reverse('admin:orders_purchaseorder_change', args=[order.pk])
+        lines = self.client.get(change_url).context['inline_admin_formsets'][0]
+        self.assertTrue(lines.has_change_permission)
+
+        PurchaseOrder.objects.filter(pk=order.pk).update(status=OrderStatus.ORDERED)
+        response = self.client.get(change_url)
+        lines = response.context['inline_admin_formsets'][0]
+        self.assertFalse(lines.has_add_permission or lines.has_change_permission or lines.has_delete_permission)
+        self.assertIn('supplier', response.context['adminform'].readonly_fields)
+
+class TransferOrderTest(TestCase):
+
+    def setUp(self):
+        category = Category.objects.create(name="Fixings")
+        supplier = Supplier.objects.create(supplier_name="Bolt Co")
+        self.items = [
+            Item.objects.create(
+                item_code=f"T-{n}", name=f"Bolt {n}", category=category,
+                supplier=supplier, price=1.00, internal_value=0.50,
+            )
+            for n in range(3)
+        ]
+        self.site_a, self.site_b = Location.objects.create(name="Site A"), Location.objects.create(name="Site B")
+        self.shelf_a = self.bin_in(self.site_a)
+        self.shelf_b = self.bin_in(self.site_b)
+        for item in self.items:
+            post_movement(movement_type=MovementType.RECEIVE, item=item, to_location=self.shelf_a, quantity=10)
+
+    def bin_in(self, site):
+        area = Area.objects.create(name="Rack", sub_location=SubLocation.objects.create(name="Zone", location=site))
+        return SubArea.objects.create(name="Shelf", area=area)
+
+    def make_transfer(self, quantity=4, to_location=None):
+        order = TransferOrder.objects.create(from_site=self.site_a, to_site=self.site_b)
+        TransferOrderLine.objects.bulk_create([
+            TransferOrderLine(
+                order=order, item=item, from_location=self.shelf_a,
+                to_location=to_location or self.shelf_b, quantity=quantity,
+            )
+            for item in self.items
+        ])
+        return order
+
+    def stock(self, item, location):
+        return Inventory.objects.filter(item=item, location=location).values_list('quantity', flat=True).first() or 0
+
+    def test_dispatch_then_receive(self):
+        order = self.make_transfer()
+        self.assertTrue(order.reference.startswith("TR-"))
+
+        dispatch_transfer(order.pk)
+        order.refresh_from_db()
+        self.assertEqual(order.status, TransferStatus.IN_TRANSIT)
+        self.assertIsNotNone(order.dispatched_at)
+        self.assertEqual(self.stock(self.items[0], self.shelf_a), 6)
+        self.assertEqual(self.stock(self.items[0], self.shelf_b), 0)
+
+        receive_transfer(order.pk)
+        order.refresh_from_db()
+        self.assertEqual(order.status, TransferStatus.RECEIVED)
+        self.assertEqual(self.stock(self.items[0], self.shelf_b), 4)
+        self.assertEqual(
+            StockMovement.objects.filter(reference=order.reference).count(), 2 * len(self.items)
+        )
+        # Received into stock, issued once and written once by the transfer.
+        self.assertEqual(Inventory.objects.get(item=self.items[0], location=self.shelf_a).version, 2)
+
+    def test_each_step_happens_once(self):
+        order = self.make_transfer()
+        dispatch_transfer(order.pk)
+        with self.assertRaisesMessage(ValidationError, "in transit, not draft"):
+            dispatch_transfer(order.pk)
+        self.assertEqual(self.stock(self.items[0], self.shelf_a), 6)
+
+    def test_failed_dispatch_leaves_order_and_stock_alone(self):
+        order = self.make_transfer(quantity=11)
+        with self.assertRaises(InsufficientStock):
+            dispatch_transfer(order.pk)
+        order.refresh_from_db()
+        self.assertEqual(order.status, TransferStatus.DRAFT)
+        self.assertEqual(self.stock(self.items[0], self.shelf_a), 10)
+
+    def test_lines_must_stay_within_the_two_sites(self):
+        order = self.make_transfer(to_location=self.shelf_a)
+        with self.assertRaisesMessage(ValidationError, "not at the destination site"):
+            dispatch_transfer(order.pk)
+        self.assertEqual(TransferOrder.objects.get(pk=order.pk).status, TransferStatus.DRAFT)
+
+    def test_admin_actions(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        order = self.make_transfer()
+        url = reverse('admin:orders_transferorder_changelist')
+
+        for action in ('dispatch_transfers', 'receive_transfers'):
+            response = self.client.post(url, {'action': action, '_selected_action': [order.pk]})
+            self.assertEqual(response.status_code, 302)
+        order.refresh_from_db()
+        self.assertEqual(order.status, TransferStatus.RECEIVED)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_dispatched_orders_are_frozen(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        order = self.make_transfer()
+        change_url = reverse('admin:orders_transferorder_change', args=[order.pk])
+        lines = self.client.get(change_url).context['inline_admin_formsets'][0]
+        self.assertTrue(lines.has_change_permission)
+
+        dispatch_transfer(order.pk)
+        response = self.client.get(change_url)
+        lines = response.context['inline_admin_formsets'][0]
+        self.assertFalse(lines.has_add_permission or lines.has_change_permission or lines.has_delete_permission)
+        self.assertIn('to_site', response.context['adminform'].readonly_fields)
+
+    def test_receipt_rechecks_the_destination(self):
+        order = self.make_transfer()
+        dispatch_transfer(order.pk)
+        order.lines.update(to_location=self.shelf_a)
+        with self.assertRaisesMessage(ValidationError, "not at the destination site"):
+            receive_transfer(order.pk)
+        self.assertEqual(TransferOrder.objects.get(pk=order.pk).status, TransferStatus.IN_TRANSIT)
+
+class ReorderEngineTest(TestCase):
+
+    def setUp(self):
+        category = Category.objects.create(name="Fixings")
+        self.acme = Supplier.objects.create(supplier_name="Acme")
+        self.bolt_co = Supplier.objects.create(supplier_name="Bolt Co")
+        self.north, self.south = [Location.objects.create(name=name) for name in ("North", "South")]
+        self.north_bin = self.make_bin(self.north)
+        self.south_bin = self.make_bin(self.south)
+        self.hammer = Item.objects.create(
+            item_code="H-1", name="Hammer", category=category, supplier=self.acme, price=12.00, internal_value=8.00,
+        )
+        self.bolt = Item.objects.create(
+            item_code="B-1", name="Bolt", category=category, supplier=self.bolt_co, price=0.20, internal_value=0.10,
+        )
+        Inventory.objects.create(item=self.hammer, location=self.north_bin, quantity=3)
+        Inventory.objects.create(item=self.hammer, location=self.south_bin, quantity=20)
+        Inventory.objects.create(item=self.bolt, location=self.north_bin, quantity=500)
+
+    def make_bin(self, location):
+        sub = SubLocation.objects.create(name="Main", location=location)
+        area = Area.objects.create(name="Aisle", sub_location=sub)
+        return SubArea.objects.create(name="Bin", area=area)
+
+    def test_site_and_catalogue_rules(self):
+        ReorderRule.objects.create(item=self.hammer, location=self.north, min_quantity=5, max_quantity=10)
+        ReorderRule.objects.create(item=self.hammer, location=self.south, min_quantity=5, max_quantity=10)
+        ReorderRule.objects.create(item=self.bolt, min_quantity=1000, max_quantity=2000)
+
+        with CaptureQueriesContext(connection) as queries:
+            suggestions = suggest()
+
+        self.assertEqual(len(queries), 3)
+        self.assertEqual(
+            {(s.item_id, s.location_id, s.on_hand, s.quantity) for s in suggestions},
+            {(self.hammer.pk, self.north.pk, 3, 7), (self.bolt.pk, None, 500, 1500)},
+        )
+        grouped = by_supplier(suggestions)
+        self.assertEqual([s.item_id for s in grouped[self.acme.pk]], [self.hammer.pk])
+        self.assertEqual([s.item_id for s in grouped[self.bolt_co.pk]], [self.bolt.pk])
+
+    def test_open_orders_count_as_incoming(self):
+        ReorderRule.objects.create(item=self.hammer, location=self.north, min_quantity=5, max_quantity=10)
+        order = PurchaseOrder.objects.create(supplier=self.acme, status=OrderStatus.ORDERED)
+        PurchaseOrderLine.objects.create(order=order, item=self.hammer, quantity_ordered=1, unit_price=12, location=self.north_bin)
+
+        [suggestion] = suggest()
+        self.assertEqual((suggestion.on_order, suggestion.quantity), (1, 6))
+
+        PurchaseOrderLine.objects.filter(order=order).update(location=self.south_bin)
+        [suggestion] = suggest()
+        self.assertEqual((suggestion.on_order, suggestion.quantity), (0, 7))
+
+    def test_draft_orders_are_not_raised_twice(self):
+        ReorderRule.objects.create(item=self.hammer, location=self.north, min_quantity=5, max_quantity=10)
+        ReorderRule.objects.create(item=self.bolt, location=self.north, min_quantity=1000, max_quantity=1000)
+        ReorderRule.objects.create(item=self.bolt, min_quantity=1000, max_quantity=1500)
+
+        orders = create_draft_orders(suggest())
+
+        self.assertEqual(len(orders), 3)
+        north_bolts = PurchaseOrder.objects.get(supplier=self.bolt_co, deliver_to=self.north)
+        self.assertEqual(north_bolts.status, OrderStatus.DRAFT)
+        self.assertTrue(north_bolts.reference.startswith("PO-"))
+        self.assertEqual(north_bolts.lines.get().quantity_ordered, 500)
+        self.assertEqual(suggest(), [])
+
+    def test_drafts_can_be_placed_and_received_as_raised(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        dock = SubArea.objects.create(name="Dock", area=self.south_bin.area)
+        ReorderRule.objects.create(item=self.hammer, location=self.north, min_quantity=5, max_quantity=10)
+        ReorderRule.objects.create(item=self.bolt, location=self.south, put_away=dock, min_quantity=10, max_quantity=40)
+        ReorderRule.objects.create(item=self.bolt, min_quantity=1000, max_quantity=1500)
+
+        rules_url = reverse('admin:orders_reorderrule_changelist')
+        self.client.post(rules_url, {'action': 'raise_draft_orders', '_selected_action': list(
+            ReorderRule.objects.values_list('pk', flat=True)
+        )})
+        self.assertEqual(
+            set(PurchaseOrderLine.objects.values_list('item', 'location')),
+            {(self.hammer.pk, self.north_bin.pk), (self.bolt.pk, dock.pk), (self.bolt.pk, self.north_bin.pk)},
+        )
+
+        orders_url = reverse('admin:orders_purchaseorder_changelist')
+        selected = list(PurchaseOrder.objects.values_list('pk', flat=True))
+        for action in ('place_orders', 'receive_outstanding'):
+            self.client.post(orders_url, {'action': action, '_selected_action': selected})
+        self.assertEqual(set(PurchaseOrder.objects.values_list('status', flat=True)), {OrderStatus.RECEIVED})
+        self.assertEqual(Inventory.objects.get(item=self.hammer, location=self.north_bin).quantity, 10)
+        self.assertEqual(Inventory.objects.get(item=self.bolt, location=dock).quantity, 40)
+        self.assertEqual(Inventory.objects.get(item=self.bolt, location=self.north_bin).quantity, 1500)
+
+    def test_put_away_must_be_at_the_rules_site(self):
+        rule = ReorderRule(item=self.hammer, location=self.north, put_away=self.south_bin, min_quantity=1, max_quantity=2)
+        with self.assertRaises(ValidationError):
+            rule.full_clean()
+
+    def test_reorder_command(self):
+        ReorderRule.objects.create(item=self.hammer, location=self.north, min_quantity=5, max_quantity=10)
+        out = StringIO()
+        call_command('reorder', '--create-orders', stdout=out)
 
-# Create your tests here.
+        self.assertIn("Acme: 1 item(s), 7 unit(s)", out.getvalue())
+        self.assertEqual(PurchaseOrder.objects.filter(status=OrderStatus.DRAFT).count(), 1)
@@ -0,0 +1,82 @@
+"""
+Dispatching and receiving transfer orders between sites.
+
+Both steps post their lines as one batch of movements with
+``optimistic=True``: Inventory rows are read without locks and written back
+with a compare-and-set on ``Inventory.version``, so a large transfer never
+holds row locks while it works out quantities, and never blocks the pickers
+and receivers working the same bins. A step that loses a race is rolled back
+whole and run again by ``retry_on_conflict``. Claiming the order itself is a
+compare-and-set on its status, so each step happens at most once per order.
+
+Stock in transit is on no shelf: dispatch books ISSUE movements out of the
+source SubAreas and receipt books RECEIVE movements into the destination
+ones, both referencing the transfer.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from inventory.models import MovementType, StockMovement
+from inventory.movements import post_movements, retry_on_conflict
+from storage.models import StorageClosure, StorageLevel
+from .models import TransferOrder, TransferStatus
+
+
+def dispatch_transfer(order_id, user=None):
+    """Take an order's stock out of its source SubAreas; returns the ISSUE movements."""
+    return retry_on_conflict(lambda: _advance(
+        order_id, TransferStatus.DRAFT, TransferStatus.IN_TRANSIT, 'dispatched_at', user,
+    ))
+
+
+def receive_transfer(order_id, user=None):
+    """Put an in-transit order's stock away at the destination; returns the RECEIVE movements."""
+    return retry_on_conflict(lambda: _advance(
+        order_id, TransferStatus.IN_TRANSIT, TransferStatus.RECEIVED, 'received_at', user,
+    ))
+
+
+def _advance(order_id, from_status, to_status, stamp, user):
+    with transaction.atomic():
+        claimed = TransferOrder.objects.filter(pk=order_id, status=from_status).update(
+            status=to_status, **{stamp: timezone.now()}
+        )
+        order = TransferOrder.objects.get(pk=order_id)
+        if not claimed:
+            raise ValidationError(
+                f"{order} is {order.get_status_display().lower()}, not {from_status.label.lower()}."
+            )
+        lines = list(order.lines.all())
+        if not lines:
+            raise ValidationError(f"{order} has no lines.")
+        dispatching = to_status == TransferStatus.IN_TRANSIT
+        # Checked again on receipt: the destination must still be inside ``to_site``.
+        check_sites(order, lines, destination_only=not dispatching)
+
+        movements = [
+            StockMovement(
+                movement_type=MovementType.ISSUE if dispatching else MovementType.RECEIVE,
+                item_id=line.item_id, quantity=line.quantity, reference=order.reference,
+                **({'from_location_id': line.from_location_id} if dispatching else {'to_location_id': line.to_location_id}),
+            )
+            for line in lines
+        ]
+        post_movements(movements, user=user, optimistic=True)
+    return movements
+
+
+def check_sites(order, lines, destination_only=False):
+    """Raise ValidationError unless every line picks at the source site and puts away at the destination."""
+    sides = [(order.to_site_id, 'to_location_id')]
+    if not destination_only:
+        sides.insert(0, (order.from_site_id, 'from_location_id'))
+    for site_id, field in sides:
+        inside = set(StorageClosure.objects.filter(
+            ancestor=site_id, descendant_level=StorageLevel.SUB_AREA,
+            descendant__in={getattr(line, field) for line in lines},
+        ).values_list('descendant', flat=True))
+        for line in lines:
+            if getattr(line, field) not in inside:
+                side = 'source' if field == 'from_location_id' else 'destination'
+                raise ValidationError(f"Line for {line.item_id} on {order} is not at the {side} site.")
@@ -0,0 +1,27 @@
+from django.contrib import admin
+from .models import OutboxEvent, OutboxCursor
+
+class OutboxEventAdmin(admin.ModelAdmin):
+    """Events are written by the outbox signals and removed by ``relay_outbox --prune``."""
+    list_display = ('id', 'topic', 'key', 'created_at')
+    list_filter = ('topic',)
+    search_fields = ('key',)
+    # The table grows fast; counting it for the paginator would dominate the page.
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+admin.site.register(OutboxEvent, OutboxEventAdmin)
+
+class OutboxCursorAdmin(admin.ModelAdmin):
+    list_display = ('consumer', 'position', 'updated_at')
+    readonly_fields = ('updated_at',)
+
+admin.site.register(OutboxCursor, OutboxCursorAdmin)
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class OutboxConfig(AppConfig):
+    name = 'outbox'
+
+    def ready(self):
+        from . import signals  # noqa: F401
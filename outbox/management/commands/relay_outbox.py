@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from outbox import relay
+from outbox.models import Topic
+
+
+class Command(BaseCommand):
+    help = "Publish outbox events a consumer has not seen yet to a sink, moving its cursor as it goes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('consumer', help="Cursor name, e.g. 'erp' or 'shop-feed'.")
+        parser.add_argument('--sink', choices=sorted(relay.SINKS), default='stdout')
+        parser.add_argument('--path', help="File to append JSON lines to (file sink).")
+        parser.add_argument('--url', help="Endpoint to POST batches to (webhook sink).")
+        parser.add_argument('--token', help="Bearer token for the webhook sink.")
+        parser.add_argument('--topics', nargs='+', choices=Topic.values, help="Only relay these topics.")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--settle', type=int, metavar='SECONDS', help="Override OUTBOX_SETTLE_SECONDS.")
+        parser.add_argument('--rewind', type=int, metavar='ID', help="Move the cursor to this event id first.")
+        parser.add_argument('--follow', action='store_true', help="Keep polling for new events until interrupted.")
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds between polls with --follow.")
+        parser.add_argument('--prune', action='store_true', help="Delete events every consumer has been sent.")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        sink = self.make_sink(options)
+        if options['rewind'] is not None:
+            relay.rewind(options['consumer'], options['rewind'])
+
+        # With the stdout sink the events are the output, so progress goes to stderr.
+        log = self.stderr if options['sink'] == 'stdout' else self.stdout
+        try:
+            while True:
+                result = relay.relay(
+                    options['consumer'], sink, batch_size=options['batch_size'],
+                    topics=options['topics'], settle=options['settle'],
+                )
+                if result.published or not options['follow']:
+                    log.write(result.summary())
+                if not options['follow']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sink.close()
+
+        if options['prune']:
+            log.write(f"Pruned {relay.prune()} relayed event(s).")
+
+    def make_sink(self, options):
+        if options['sink'] == 'file':
+            if not options['path']:
+                raise CommandError("The file sink needs --path.")
+            return relay.FileSink(options['path'])
+        if options['sink'] == 'webhook':
+            if not options['url']:
+                raise CommandError("The webhook sink needs --url.")
+            return relay.WebhookSink(options['url'], token=options['token'])
+        return relay.StreamSink(self.stdout)
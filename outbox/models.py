@@ -0,0 +1,68 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models, router
+from django.utils import timezone
+
+
+class Topic(models.TextChoices):
+    STOCK = 'stock', 'Stock'
+    ITEM = 'item', 'Item'
+    SUPPLIER = 'supplier', 'Supplier'
+
+
+class OutboxEventQuerySet(models.QuerySet):
+
+    def record(self, topic, events):
+        """
+        Write ``[(key, payload), ...]`` for ``topic``. This runs inside every
+        stock and catalogue write, so rows go straight to ``executemany``
+        rather than through model instances and ``bulk_create``.
+        """
+        if not events:
+            return
+        connection = connections[router.db_for_write(self.model)]
+        created_at = connection.ops.adapt_datetimefield_value(timezone.now())
+        encode = DjangoJSONEncoder().encode
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        columns = ', '.join(map(connection.ops.quote_name, ('topic', 'key', 'payload', 'created_at')))
+        # Payloads arrive as JSON text; PostgreSQL needs it cast to jsonb explicitly.
+        payload_sql = '%s::jsonb' if connection.vendor == 'postgresql' else '%s'
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {table} ({columns}) VALUES (%s, %s, {payload_sql}, %s)",
+                [(topic, key, encode(payload), created_at) for key, payload in events],
+            )
+
+
+class OutboxEvent(models.Model):
+    """
+    One change to an Inventory row, Item or Supplier, written in the same
+    transaction as the change itself (see ``outbox.signals``). The id is the
+    position consumers keep in ``OutboxCursor``.
+    """
+    topic = models.CharField(max_length=10, choices=Topic.choices)
+    # The changed row's id; "<item id>:<sub-area id>" for stock.
+    key = models.CharField(max_length=80)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = OutboxEventQuerySet.as_manager()
+
+    class Meta:
+        ordering = ('id',)
+        indexes = [
+            # Consumers following some topics only.
+            models.Index(fields=['topic', 'id'], name='outbox_event_topic'),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.topic} {self.key}"
+
+
+class OutboxCursor(models.Model):
+    """How far a consumer has read: the id of the last event relayed to it."""
+    consumer = models.CharField(max_length=100, unique=True)
+    position = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.consumer} @ {self.position}"
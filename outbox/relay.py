@@ -0,0 +1,153 @@
+"""
+Relaying outbox events to downstream consumers.
+
+Each consumer (the ERP, the web shop feed, ...) has an ``OutboxCursor``. A
+relay run locks that cursor, reads the next batch of events after it in id
+order, hands the batch to a sink and moves the cursor past it, all in one
+transaction. Two relays for the same consumer therefore take turns, and a
+consumer that was offline catches up batch by batch from where it stopped.
+Delivery is at least once: a batch whose commit fails after the sink took it
+is sent again, so consumers should ignore event ids they have already seen.
+
+Ids are handed out when events are inserted, not when they commit, so a
+batch is cut short at the first event younger than the settle window
+(``OUTBOX_SETTLE_SECONDS``). That gives transactions still holding a lower id
+time to commit before the cursor passes them.
+"""
+import json
+import sys
+import time
+import urllib.request
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import OutboxCursor, OutboxEvent
+
+
+def serialize(event):
+    return {
+        'id': event.pk, 'topic': event.topic, 'key': event.key,
+        'created_at': event.created_at.isoformat(), 'payload': event.payload,
+    }
+
+
+class StreamSink:
+    """Writes each event as a line of JSON."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def publish(self, events):
+        self.stream.writelines(json.dumps(event, cls=DjangoJSONEncoder) + '\n' for event in events)
+        self.stream.flush()
+
+    def close(self):
+        pass
+
+
+class FileSink(StreamSink):
+    """Appends JSON lines to ``path``."""
+
+    def __init__(self, path):
+        super().__init__(open(path, 'a', encoding='utf-8'))
+
+    def close(self):
+        self.stream.close()
+
+
+class WebhookSink:
+    """POSTs each batch as ``{"events": [...]}``; any non-2xx response fails the batch."""
+
+    def __init__(self, url, token=None, timeout=30):
+        self.url = url
+        self.timeout = timeout
+        self.headers = {'Content-Type': 'application/json'}
+        if token:
+            self.headers['Authorization'] = f'Bearer {token}'
+
+    def publish(self, events):
+        body = json.dumps({'events': events}, cls=DjangoJSONEncoder).encode()
+        request = urllib.request.Request(self.url, data=body, headers=self.headers, method='POST')
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+    def close(self):
+        pass
+
+
+SINKS = {'stdout': StreamSink, 'file': FileSink, 'webhook': WebhookSink}
+
+
+@dataclass
+class RelayResult:
+    published: int = 0
+    batches: int = 0
+    position: int = 0
+    elapsed: float = 0.0
+
+    def summary(self):
+        return (
+            f"Relayed {self.published} event(s) in {self.batches} batch(es), "
+            f"now at {self.position}, in {self.elapsed:.2f}s."
+        )
+
+
+def relay_batch(consumer, sink, batch_size=500, topics=None, settle=None):
+    """Relay one batch to ``consumer``; returns ``(events relayed, cursor position)``."""
+    settle = settings.OUTBOX_SETTLE_SECONDS if settle is None else settle
+    with transaction.atomic():
+        cursor, _ = OutboxCursor.objects.select_for_update().get_or_create(consumer=consumer)
+        events = OutboxEvent.objects.filter(pk__gt=cursor.position)
+        if topics:
+            events = events.filter(topic__in=topics)
+        cutoff = timezone.now() - timedelta(seconds=settle)
+        batch = []
+        for event in events.order_by('pk')[:batch_size]:
+            if event.created_at > cutoff:
+                break
+            batch.append(event)
+        if batch:
+            sink.publish([serialize(event) for event in batch])
+            cursor.position = batch[-1].pk
+            cursor.save(update_fields=['position', 'updated_at'])
+    return len(batch), cursor.position
+
+
+def relay(consumer, sink, batch_size=500, topics=None, settle=None):
+    """Relay batches to ``consumer`` until it has caught up with the settled events."""
+    result = RelayResult()
+    started = time.monotonic()
+    while True:
+        count, result.position = relay_batch(consumer, sink, batch_size, topics, settle)
+        if count:
+            result.published += count
+            result.batches += 1
+        if count < batch_size:
+            break
+    result.elapsed = time.monotonic() - started
+    return result
+
+
+def rewind(consumer, position=0):
+    """Move ``consumer``'s cursor, e.g. back to 0 to replay everything still kept."""
+    OutboxCursor.objects.update_or_create(consumer=consumer, defaults={'position': position})
+
+
+def prune(now=None):
+    """
+    Delete events older than ``OUTBOX_KEEP_DAYS`` that every consumer has
+    already been sent; returns the number deleted.
+    """
+    now = now or timezone.now()
+    events = OutboxEvent.objects.filter(created_at__lt=now - timedelta(days=settings.OUTBOX_KEEP_DAYS))
+    slowest = OutboxCursor.objects.aggregate(position=Min('position'))['position']
+    if slowest is not None:
+        events = events.filter(pk__lte=slowest)
+    deleted, _ = events.delete()
+    return deleted
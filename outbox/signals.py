@@ -0,0 +1,69 @@
+"""
+Outbox writers. Every receiver runs inside the writer's transaction, so an
+event is committed if and only if the change it describes is.
+
+Stock follows ``stock_changed`` (one insert per write batch, whichever path
+wrote it). Items and Suppliers follow ``post_save``/``post_delete``, and bulk
+Item writers announce themselves with ``items_written``.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from inventory.signals import stock_changed
+from items.models import Item
+from items.signals import items_written
+from suppliers.models import Supplier
+from .models import OutboxEvent, Topic
+
+ITEM_FIELDS = ('id', 'item_code', 'name', 'category_id', 'supplier_id', 'price', 'internal_value')
+SUPPLIER_FIELDS = (
+    'id', 'supplier_name', 'email', 'contact_number', 'supplier_status', 'main_contact', 'payment_method',
+)
+
+
+def record_saved(topic, instance, fields):
+    """Record ``instance`` as stored, read back so values are typed as the database returns them."""
+    row = type(instance).objects.filter(pk=instance.pk).values(*fields).first()
+    if row is not None:
+        OutboxEvent.objects.record(topic, [(str(instance.pk), row)])
+
+
+def record_deleted(topic, pk):
+    OutboxEvent.objects.record(topic, [(str(pk), {'id': pk, 'deleted': True})])
+
+
+@receiver(stock_changed)
+def record_stock_changes(sender, changes, **kwargs):
+    OutboxEvent.objects.record(Topic.STOCK, [
+        (f"{change.item_id}:{change.location_id}", change._asdict()) for change in changes
+    ])
+
+
+@receiver(post_save, sender=Item)
+def record_item_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_saved(Topic.ITEM, instance, ITEM_FIELDS)
+
+
+@receiver(items_written)
+def record_items_written(sender, items, **kwargs):
+    # Bulk writers pass the instances they wrote, so nothing is read back.
+    OutboxEvent.objects.record(Topic.ITEM, [
+        (str(item.pk), {name: getattr(item, name) for name in ITEM_FIELDS}) for item in items
+    ])
+
+
+@receiver(post_delete, sender=Item)
+def record_item_deleted(sender, instance, **kwargs):
+    record_deleted(Topic.ITEM, instance.pk)
+
+
+@receiver(post_save, sender=Supplier)
+def record_supplier_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_saved(Topic.SUPPLIER, instance, SUPPLIER_FIELDS)
+
+
+@receiver(post_delete, sender=Supplier)
+def record_supplier_deleted(sender, instance, **kwargs):
+    record_deleted(Topic.SUPPLIER, instance.pk)
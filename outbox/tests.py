@@ -0,0 +1,160 @@
+import json
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from io import StringIO
+
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.utils import timezone
+
+# Cross-app imports
+from inventory.models import MovementType, StockMovement
+from inventory.movements import post_movement, post_movements, InsufficientStock
+from items.models import Item, Category
+from suppliers.catalogue import CatalogueSync
+from suppliers.models import Supplier
+from storage.models import Location, SubLocation, Area, SubArea
+
+# Local app import
+from .models import OutboxEvent, OutboxCursor, Topic
+from .relay import StreamSink, WebhookSink, relay, rewind, prune
+
+class OutboxTest(TestCase):
+
+    def setUp(self):
+        self.category = Category.objects.create(name="Fixings")
+        self.supplier = Supplier.objects.create(supplier_name="Bolt Co")
+        self.item = Item.objects.create(
+            item_code="OB-1", name="Bolt", category=self.category,
+            supplier=self.supplier, price=1.00, internal_value=0.50,
+        )
+        area = Area.objects.create(
+            name="Rack 1",
+            sub_location=SubLocation.objects.create(name="Zone 1", location=Location.objects.create(name="Warehouse A")),
+        )
+        self.shelf = SubArea.objects.create(name="Shelf 1", area=area)
+        self.start = OutboxEvent.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+
+    def events(self, topic=None):
+        events = OutboxEvent.objects.filter(pk__gt=self.start)
+        return list(events.filter(topic=topic) if topic else events)
+
+    def relayed(self, consumer='erp', **kwargs):
+        stream = StringIO()
+        result = relay(consumer, StreamSink(stream), settle=0, **kwargs)
+        return result, [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    def test_changes_are_recorded_with_the_write(self):
+        self.assertEqual(self.events(), [])
+        post_movement(movement_type=MovementType.RECEIVE, item=self.item, to_location=self.shelf, quantity=5)
+        with self.assertRaises(InsufficientStock):
+            post_movements([
+                StockMovement(movement_type=MovementType.ISSUE, item=self.item, from_location=self.shelf, quantity=9),
+            ])
+        self.item.price = 1.25
+        self.item.save()
+        Supplier.objects.create(supplier_name="Nut Co")
+
+        stock = self.events(Topic.STOCK)
+        self.assertEqual(len(stock), 1)
+        self.assertEqual(stock[0].key, f"{self.item.pk}:{self.shelf.pk}")
+        self.assertEqual((stock[0].payload['delta'], stock[0].payload['quantity']), (5, 5))
+        self.assertEqual(self.events(Topic.ITEM)[0].payload['price'], '1.25')
+        self.assertEqual(self.events(Topic.SUPPLIER)[0].payload['supplier_name'], "Nut Co")
+
+    def test_bulk_catalogue_writes_are_recorded(self):
+        CatalogueSync(self.supplier).run(enumerate([
+            {'item_code': 'OB-1', 'name': 'Bolt', 'price': '2.00', 'internal_value': '0.50'},
+            {'item_code': 'OB-2', 'name': 'Nut', 'price': '0.10', 'internal_value': '0.05', 'category': 'Fixings'},
+        ], start=2))
+        self.assertEqual(
+            sorted((e.payload['item_code'], e.payload['price']) for e in self.events(Topic.ITEM)),
+            [('OB-1', '2.00'), ('OB-2', '0.10')],
+        )
+
+    def test_relay_catches_up_from_the_cursor(self):
+        rewind('erp', self.start)
+        for quantity in (1, 2, 3):
+            post_movement(movement_type=MovementType.RECEIVE, item=self.item, to_location=self.shelf, quantity=quantity)
+
+        result, published = self.relayed(batch_size=2)
+        self.assertEqual((result.published, result.batches), (3, 2))
+        self.assertEqual([event['payload']['quantity'] for event in published], [1, 3, 6])
+        self.assertEqual(OutboxCursor.objects.get(consumer='erp').position, published[-1]['id'])
+
+        self.assertEqual(self.relayed()[0].published, 0)
+        Item.objects.create(
+            item_code="OB-9", name="Washer", category=self.category,
+            supplier=self.supplier, price=0.10, internal_value=0.05,
+        ).delete()
+        _, published = self.relayed()
+        self.assertEqual([event['topic'] for event in published], [Topic.ITEM, Topic.ITEM])
+        self.assertEqual(published[-1]['payload'], {'id': published[0]['key'], 'deleted': True})
+
+    def test_topics_and_settle_window(self):
+        rewind('shop', self.start)
+        post_movement(movement_type=MovementType.RECEIVE, item=self.item, to_location=self.shelf, quantity=1)
+        Supplier.objects.create(supplier_name="Nut Co")
+
+        fresh = relay('shop', StreamSink(StringIO()), settle=60)
+        self.assertEqual(fresh.published, 0)
+        _, published = self.relayed('shop', topics=[Topic.SUPPLIER])
+        self.assertEqual([event['topic'] for event in published], [Topic.SUPPLIER])
+
+    def test_prune_keeps_what_a_consumer_still_needs(self):
+        rewind('erp', self.start)
+        rewind('shop', self.start)
+        post_movement(movement_type=MovementType.RECEIVE, item=self.item, to_location=self.shelf, quantity=1)
+        self.relayed('erp')
+        later = timezone.now() + timedelta(days=30)
+
+        self.assertEqual(prune(timezone.now()), 0)
+        prune(later)
+        self.assertEqual(len(self.events()), 1)
+        self.relayed('shop')
+        prune(later)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_webhook_sink_posts_batches(self):
+        received = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                received.append(json.loads(self.rfile.read(int(self.headers['Content-Length']))))
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            rewind('erp', self.start)
+            post_movement(movement_type=MovementType.RECEIVE, item=self.item, to_location=self.shelf, quantity=1)
+            relay('erp', WebhookSink(f'http://127.0.0.1:{server.server_port}/'), settle=0)
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertEqual([len(body['events']) for body in received], [1])
+
+    @override_settings(OUTBOX_SETTLE_SECONDS=0)
+    def test_relay_command(self):
+        post_movement(movement_type=MovementType.RECEIVE, item=self.item, to_location=self.shelf, quantity=4)
+        fd, path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(fd)
+        try:
+            out = StringIO()
+            call_command(
+                'relay_outbox', 'feed', '--sink', 'file', '--path', path,
+                '--rewind', str(self.start), '--topics', 'stock', stdout=out,
+            )
+            with open(path) as handle:
+                lines = [json.loads(line) for line in handle]
+        finally:
+            os.remove(path)
+        self.assertEqual([line['payload']['quantity'] for line in lines], [4])
+        self.assertIn("Relayed 1 event(s)", out.getvalue())
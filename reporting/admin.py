@@ -1,3 +1,43 @@
 from django.contrib import admin
+from .models import ItemStock, LocationStock, CategoryStock, StockSnapshot
 
-# Register your models here.
+class StockRollupAdmin(admin.ModelAdmin):
+    """Rollups are maintained by reporting.rollups; the admin only reads them."""
+    ordering = ('-value',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+class ItemStockAdmin(StockRollupAdmin):
+    list_display = ('item', 'quantity', 'value', 'updated_at')
+    list_select_related = ('item',)
+    search_fields = ('item__item_code', 'item__name')
+
+admin.site.register(ItemStock, ItemStockAdmin)
+
+class LocationStockAdmin(StockRollupAdmin):
+    list_display = ('location', 'quantity', 'value', 'updated_at')
+    list_select_related = ('location',)
+
+admin.site.register(LocationStock, LocationStockAdmin)
+
+class CategoryStockAdmin(StockRollupAdmin):
+    list_display = ('category', 'quantity', 'value', 'updated_at')
+    list_select_related = ('category',)
+
+admin.site.register(CategoryStock, CategoryStockAdmin)
+
+
+class StockSnapshotAdmin(StockRollupAdmin):
+    """Snapshots are written by ``snapshot_stock`` and removed by its retention pass."""
+    list_display = ('taken_at', 'lines', 'quantity', 'value')
+    ordering = ('-taken_at',)
+    date_hierarchy = 'taken_at'
+
+admin.site.register(StockSnapshot, StockSnapshotAdmin)
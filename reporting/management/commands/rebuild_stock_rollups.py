@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from reporting import rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the Item, Location and Category on-hand rollups from Inventory."
+
+    def handle(self, *args, **options):
+        counts = rollups.rebuild()
+        summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stock rollups: {summary}."))
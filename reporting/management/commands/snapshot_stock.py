@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.registry import enqueue
+from reporting import snapshots
+
+
+class Command(BaseCommand):
+    help = "Copy current stock into a point-in-time snapshot, then delete snapshots past retention."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-prune', action='store_true', help="Skip the retention pass.")
+        parser.add_argument('--prune-only', action='store_true', help="Apply retention without taking a snapshot.")
+        parser.add_argument('--background', action='store_true', help="Queue the snapshot for a run_jobs worker instead.")
+        parser.add_argument(
+            '--every', type=int, metavar='HOURS',
+            help="Queue a job that snapshots now and re-queues itself every HOURS hours.",
+        )
+
+    def handle(self, *args, **options):
+        if options['every'] is not None and options['every'] < 1:
+            raise CommandError("--every must be at least 1 hour.")
+        if options['background'] or options['every']:
+            job = enqueue('reporting.snapshot_stock', {'every_hours': options['every']})
+            self.stdout.write(self.style.SUCCESS(f"Queued stock snapshot as job {job.pk}."))
+            return
+
+        if not options['prune_only']:
+            snapshot = snapshots.take()
+            self.stdout.write(self.style.SUCCESS(
+                f"Snapshot {snapshot.pk}: {snapshot.lines} lines, {snapshot.quantity} units, value {snapshot.value}."
+            ))
+        if not options['no_prune']:
+            self.stdout.write(f"Pruned {snapshots.prune()} expired snapshot(s).")
@@ -0,0 +1,73 @@
+# Generated by Django 6.0 on 2026-10-17 18:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F, Sum
+
+
+def populate_rollups(apps, schema_editor):
+    Inventory = apps.get_model('inventory', 'Inventory')
+    value = Sum(F('quantity') * F('item__internal_value'))
+    groupings = (
+        ('ItemStock', 'item_id', 'item_id'),
+        ('LocationStock', 'location_id', 'location__area__sub_location__location_id'),
+        ('CategoryStock', 'category_id', 'item__category_id'),
+    )
+    for model_name, field, path in groupings:
+        model = apps.get_model('reporting', model_name)
+        rows = Inventory.objects.values(path).annotate(total_quantity=Sum('quantity'), total_value=value)
+        model.objects.bulk_create([
+            model(**{field: row[path]}, quantity=row['total_quantity'], value=row['total_value'] or 0)
+            for row in rows
+        ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('inventory', '0004_stockmovement'),
+        ('items', '0001_initial'),
+        ('storage', '0004_storage_hierarchy_paths'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryStock',
+            fields=[
+                ('quantity', models.BigIntegerField(default=0)),
+                ('value', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stock_rollup', serialize=False, to='items.category')),
+            ],
+            options={
+                'verbose_name': 'Category stock',
+            },
+        ),
+        migrations.CreateModel(
+            name='ItemStock',
+            fields=[
+                ('quantity', models.BigIntegerField(default=0)),
+                ('value', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stock_rollup', serialize=False, to='items.item')),
+            ],
+            options={
+                'verbose_name': 'Item stock',
+            },
+        ),
+        migrations.CreateModel(
+            name='LocationStock',
+            fields=[
+                ('quantity', models.BigIntegerField(default=0)),
+                ('value', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('location', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stock_rollup', serialize=False, to='storage.location')),
+            ],
+            options={
+                'verbose_name': 'Location stock',
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
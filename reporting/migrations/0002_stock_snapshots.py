@@ -0,0 +1,41 @@
+# Generated by Django 6.0 on 2026-10-17 19:20
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0003_hot_filter_indexes'),
+        ('reporting', '0001_initial'),
+        ('storage', '0004_storage_hierarchy_paths'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('taken_at', models.DateTimeField(db_index=True)),
+                ('lines', models.PositiveIntegerField(default=0)),
+                ('quantity', models.BigIntegerField(default=0)),
+                ('value', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+            ],
+            options={
+                'ordering': ('-taken_at',),
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshotLine',
+            fields=[
+                ('pk', models.CompositePrimaryKey('snapshot', 'item', 'location', blank=True, editable=False, primary_key=True, serialize=False)),
+                ('quantity', models.PositiveIntegerField()),
+                ('unit_value', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='items.item')),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='storage.subarea')),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reporting.stocksnapshot')),
+            ],
+        ),
+    ]
@@ -1,3 +1,85 @@
+import uuid
+
 from django.db import models
 
-# Create your models here.
+
+class StockRollup(models.Model):
+    """
+    Running on-hand totals, maintained incrementally from ``stock_changed`` and
+    ``item_values_changed`` by ``reporting.rollups``. ``value`` is quantity at
+    ``Item.internal_value``. Rebuild with ``manage.py rebuild_stock_rollups``.
+    """
+    quantity = models.BigIntegerField(default=0)
+    value = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+class ItemStock(StockRollup):
+    item = models.OneToOneField(
+        'items.Item', on_delete=models.CASCADE, primary_key=True, related_name='stock_rollup'
+    )
+
+    class Meta:
+        verbose_name = "Item stock"
+
+    def __str__(self):
+        return f"{self.item_id}: {self.quantity}"
+
+class LocationStock(StockRollup):
+    location = models.OneToOneField(
+        'storage.Location', on_delete=models.CASCADE, primary_key=True, related_name='stock_rollup'
+    )
+
+    class Meta:
+        verbose_name = "Location stock"
+
+    def __str__(self):
+        return f"{self.location_id}: {self.quantity}"
+
+class CategoryStock(StockRollup):
+    category = models.OneToOneField(
+        'items.Category', on_delete=models.CASCADE, primary_key=True, related_name='stock_rollup'
+    )
+
+    class Meta:
+        verbose_name = "Category stock"
+
+    def __str__(self):
+        return f"{self.category_id}: {self.quantity}"
+
+class StockSnapshot(models.Model):
+    """
+    One point-in-time copy of Inventory, written by ``reporting.snapshots``.
+    The totals are stored on the header so month-end figures need no scan.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    taken_at = models.DateTimeField(db_index=True)
+    lines = models.PositiveIntegerField(default=0)
+    quantity = models.BigIntegerField(default=0)
+    value = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ('-taken_at',)
+
+    def __str__(self):
+        return f"Stock at {self.taken_at:%Y-%m-%d %H:%M}"
+
+class StockSnapshotLine(models.Model):
+    """
+    Append-only history row: only non-zero stock is copied, and rows carry no
+    id or timestamp of their own (the key is snapshot, item and location), so
+    each costs a few dozen bytes. The snapshot is the date bucket; retention
+    deletes whole snapshots.
+    """
+    pk = models.CompositePrimaryKey('snapshot', 'item', 'location')
+    snapshot = models.ForeignKey(StockSnapshot, on_delete=models.CASCADE, related_name='+')
+    item = models.ForeignKey('items.Item', on_delete=models.PROTECT, related_name='+')
+    location = models.ForeignKey('storage.SubArea', on_delete=models.PROTECT, related_name='+')
+    quantity = models.PositiveIntegerField()
+    # Item.internal_value when the snapshot was taken, for historic valuations.
+    unit_value = models.DecimalField(max_digits=10, decimal_places=2)
+
+    def __str__(self):
+        return f"{self.snapshot_id}: {self.quantity} x {self.item_id}"
@@ -0,0 +1,145 @@
+"""
+Incremental on-hand rollups per Item, top-level Location and Category.
+
+Writers never touch these tables directly: ``apply_stock_changes``,
+``apply_item_value_changes`` and ``apply_site_change`` are wired to the
+inventory/items/storage signals, and ``rebuild`` recomputes everything from
+Inventory in three aggregate queries.
+
+Deltas are applied by locking the affected rollup rows in primary-key order and
+writing them back with one upsert, the same pattern as
+``inventory.movements``, so a batch costs a fixed number of queries.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from inventory.models import Inventory
+from items.models import Item
+from storage.models import StorageClosure, StorageLevel
+from .models import ItemStock, LocationStock, CategoryStock
+
+SITE_PATH = 'location__area__sub_location__location'
+
+
+def _apply(model, deltas):
+    """Add ``{pk: [quantity, value]}`` deltas onto rollup rows of ``model``."""
+    keys = sorted(key for key, (quantity, value) in deltas.items() if quantity or value)
+    if not keys:
+        return
+
+    # Only positive deltas may create rows; a negative delta for a missing row
+    # means the parent is being deleted and its rollup is already gone.
+    model.objects.bulk_create(
+        [model(pk=key) for key in keys if deltas[key][0] > 0],
+        ignore_conflicts=True,
+    )
+    rows = list(model.objects.select_for_update().filter(pk__in=keys).order_by('pk'))
+    now = timezone.now()
+    for row in rows:
+        quantity, value = deltas[row.pk]
+        row.quantity += quantity
+        row.value += value
+        row.updated_at = now
+    model.objects.bulk_create(
+        rows, update_conflicts=True, unique_fields=[model._meta.pk.name],
+        update_fields=['quantity', 'value', 'updated_at'], batch_size=500,
+    )
+
+
+def site_ids_for(subarea_ids):
+    """Map SubArea ids to their top-level Location id via the closure table."""
+    return dict(StorageClosure.objects.filter(
+        descendant__in=subarea_ids, ancestor_level=StorageLevel.LOCATION
+    ).values_list('descendant', 'ancestor'))
+
+
+def apply_stock_changes(changes):
+    quantities = defaultdict(int)
+    for change in changes:
+        quantities[(change.item_id, change.location_id)] += change.delta
+
+    items = {
+        pk: (category_id, value)
+        for pk, category_id, value in Item.objects.filter(
+            pk__in={item_id for item_id, _ in quantities}
+        ).values_list('pk', 'category_id', 'internal_value')
+    }
+    sites = site_ids_for({location_id for _, location_id in quantities})
+
+    by_item, by_site, by_category = (defaultdict(lambda: [0, Decimal(0)]) for _ in range(3))
+    for (item_id, location_id), quantity in quantities.items():
+        if item_id not in items:
+            continue
+        category_id, unit_value = items[item_id]
+        value = unit_value * quantity
+        for totals, key in ((by_item, item_id), (by_site, sites.get(location_id)), (by_category, category_id)):
+            if key is not None:
+                totals[key][0] += quantity
+                totals[key][1] += value
+
+    with transaction.atomic():
+        _apply(ItemStock, by_item)
+        _apply(LocationStock, by_site)
+        _apply(CategoryStock, by_category)
+
+
+def apply_item_value_changes(changes):
+    changes = {change.item_id: change for change in changes}
+    on_hand = dict(ItemStock.objects.filter(pk__in=changes).values_list('pk', 'quantity'))
+
+    by_item, by_site, by_category = (defaultdict(lambda: [0, Decimal(0)]) for _ in range(3))
+    for item_id, change in changes.items():
+        quantity = on_hand.get(item_id, 0)
+        value_delta = change.new_value - change.old_value
+        by_item[item_id][1] += quantity * value_delta
+        by_category[change.old_category_id][0] -= quantity
+        by_category[change.old_category_id][1] -= quantity * change.old_value
+        by_category[change.new_category_id][0] += quantity
+        by_category[change.new_category_id][1] += quantity * change.new_value
+
+    per_site = Inventory.objects.filter(item_id__in=changes).values('item_id', SITE_PATH).annotate(
+        quantity=Sum('quantity')
+    )
+    for row in per_site:
+        change = changes[row['item_id']]
+        by_site[row[SITE_PATH]][1] += row['quantity'] * (change.new_value - change.old_value)
+
+    with transaction.atomic():
+        _apply(ItemStock, by_item)
+        _apply(LocationStock, by_site)
+        _apply(CategoryStock, by_category)
+
+
+def apply_site_change(node_id, old_site_id, new_site_id):
+    """Move the stock held anywhere below storage node ``node_id`` from one site's totals to another's."""
+    totals = Inventory.objects.filter(
+        location__in=StorageClosure.objects.descendant_ids(node_id, StorageLevel.SUB_AREA)
+    ).aggregate(total_quantity=Sum('quantity'), total_value=Sum(F('quantity') * F('item__internal_value')))
+    quantity, value = totals['total_quantity'] or 0, totals['total_value'] or Decimal(0)
+    with transaction.atomic():
+        _apply(LocationStock, {old_site_id: [-quantity, -value], new_site_id: [quantity, value]})
+
+
+def rebuild():
+    """Recompute every rollup row from Inventory."""
+    value = Sum(F('quantity') * F('item__internal_value'))
+    groupings = (
+        (ItemStock, 'item_id', 'item_id'),
+        (LocationStock, 'location_id', SITE_PATH),
+        (CategoryStock, 'category_id', 'item__category_id'),
+    )
+    counts = {}
+    with transaction.atomic():
+        for model, field, path in groupings:
+            model.objects.all().delete()
+            rows = Inventory.objects.values(path).annotate(total_quantity=Sum('quantity'), total_value=value)
+            model.objects.bulk_create([
+                model(**{field: row[path]}, quantity=row['total_quantity'], value=row['total_value'] or 0)
+                for row in rows
+            ], batch_size=1000)
+            counts[model.__name__] = len(rows)
+    return counts
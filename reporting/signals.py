@@ -0,0 +1,21 @@
+from django.dispatch import receiver
+
+from inventory.signals import stock_changed
+from items.signals import item_values_changed
+from storage.signals import site_changed
+from . import rollups
+
+
+@receiver(stock_changed)
+def update_stock_rollups(sender, changes, **kwargs):
+    rollups.apply_stock_changes(changes)
+
+
+@receiver(item_values_changed)
+def revalue_stock_rollups(sender, changes, **kwargs):
+    rollups.apply_item_value_changes(changes)
+
+
+@receiver(site_changed)
+def move_site_rollups(sender, node_id, old_site_id, new_site_id, **kwargs):
+    rollups.apply_site_change(node_id, old_site_id, new_site_id)
@@ -0,0 +1,133 @@
+"""
+Point-in-time stock history.
+
+``take()`` copies every non-zero Inventory row into ``StockSnapshotLine`` with
+one ``INSERT ... SELECT`` that never passes through Python, with stock writes
+held off so the copy and its ``taken_at`` boundary agree. ``stock_at()`` answers "what was on hand at T" from the latest
+snapshot at or before T plus the movements posted after it, so only the
+movements since the last snapshot are ever replayed. That relies on every
+stock change being posted as a movement (``inventory.movements``); a direct
+``Inventory.save()`` is invisible to it.
+
+``prune()`` applies the retention rules: every snapshot is kept for
+``STOCK_SNAPSHOT_KEEP_DAYS``, then only the last one of each month for
+``STOCK_SNAPSHOT_KEEP_MONTHS``, then none.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from inventory.models import Inventory, StockMovement
+from storage.models import StorageClosure, StorageLevel
+from .models import StockSnapshot, StockSnapshotLine
+
+
+def take():
+    """
+    Copy current stock into a new snapshot and return it.
+
+    Stock writers are held off for the copy: on PostgreSQL by a SHARE lock on
+    Inventory, which also waits for writers already in flight to commit; on
+    SQLite by the copy's own write lock. ``taken_at`` is stamped after the
+    copy, so every movement already in the copy was created before it and
+    every movement created later is replayed on top of it, exactly once.
+    """
+    with transaction.atomic():
+        snapshot = StockSnapshot.objects.create(taken_at=timezone.now())
+        source = Inventory.objects.filter(quantity__gt=0).values_list(
+            'item_id', 'location_id', 'quantity', 'item__internal_value'
+        )
+        select, params = source.query.sql_with_params()
+        table = connection.ops.quote_name(StockSnapshotLine._meta.db_table)
+        snapshot_id = StockSnapshotLine._meta.get_field('snapshot').get_db_prep_value(snapshot.pk, connection)
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f"LOCK TABLE {connection.ops.quote_name(Inventory._meta.db_table)} IN SHARE MODE")
+            cursor.execute(
+                f"INSERT INTO {table} (snapshot_id, item_id, location_id, quantity, unit_value) "
+                f"SELECT %s, copied.* FROM ({select}) copied",
+                (snapshot_id, *params),
+            )
+
+        totals = StockSnapshotLine.objects.filter(snapshot=snapshot).aggregate(
+            line_count=Count('*'), total_quantity=Sum('quantity'), total_value=Sum(F('quantity') * F('unit_value')),
+        )
+        snapshot.taken_at = timezone.now()
+        snapshot.lines = totals['line_count']
+        snapshot.quantity = totals['total_quantity'] or 0
+        snapshot.value = totals['total_value'] or 0
+        snapshot.save(update_fields=['taken_at', 'lines', 'quantity', 'value'])
+    return snapshot
+
+
+def base_snapshot(when):
+    """The latest snapshot taken at or before ``when``, or None."""
+    return StockSnapshot.objects.filter(taken_at__lte=when).order_by('-taken_at').first()
+
+
+def movement_deltas(since, until, under=None):
+    """``{(item_id, subarea_id): delta}`` for movements in ``(since, until]``."""
+    movements = StockMovement.objects.filter(created_at__gt=since, created_at__lte=until).order_by()
+    subareas = StorageClosure.objects.descendant_ids(under, StorageLevel.SUB_AREA) if under else None
+    deltas = defaultdict(int)
+    for field, sign in (('to_location', 1), ('from_location', -1)):
+        rows = movements.filter(**{f'{field}__isnull': False})
+        if subareas is not None:
+            rows = rows.filter(**{f'{field}__in': subareas})
+        for item_id, location_id, quantity in rows.values(
+            'item_id', f'{field}_id'
+        ).annotate(total=Sum('quantity')).values_list('item_id', f'{field}_id', 'total'):
+            deltas[item_id, location_id] += sign * quantity
+    return {key: delta for key, delta in deltas.items() if delta}
+
+
+def stock_at(when, under=None):
+    """
+    Return ``(snapshot, lines, deltas)`` for stock at ``when``: the snapshot's
+    lines as a lazy queryset and the movement deltas to apply on top of them.
+    Raises ``StockSnapshot.DoesNotExist`` when no snapshot is old enough.
+    """
+    snapshot = base_snapshot(when)
+    if snapshot is None:
+        raise StockSnapshot.DoesNotExist(f"No stock snapshot at or before {when:%Y-%m-%d %H:%M}.")
+    lines = StockSnapshotLine.objects.filter(snapshot=snapshot)
+    if under:
+        lines = lines.filter(location__in=StorageClosure.objects.descendant_ids(under, StorageLevel.SUB_AREA))
+    return snapshot, lines, movement_deltas(snapshot.taken_at, when, under)
+
+
+def expired(now=None):
+    """Ids of the snapshots the retention rules no longer keep."""
+    now = now or timezone.now()
+    keep_all_after = now - timedelta(days=settings.STOCK_SNAPSHOT_KEEP_DAYS)
+    months = settings.STOCK_SNAPSHOT_KEEP_MONTHS
+    local_now = timezone.localtime(now)
+    oldest_month = (local_now.year * 12 + local_now.month - 1) - months
+
+    month_ends, drop = {}, []
+    for snapshot_id, taken_at in StockSnapshot.objects.filter(
+        taken_at__lt=keep_all_after
+    ).order_by('taken_at').values_list('id', 'taken_at'):
+        local = timezone.localtime(taken_at)
+        month = local.year * 12 + local.month - 1
+        if month < oldest_month:
+            drop.append(snapshot_id)
+            continue
+        # Ordered oldest first, so a later snapshot in the month displaces the earlier one.
+        if month in month_ends:
+            drop.append(month_ends[month])
+        month_ends[month] = snapshot_id
+    return drop
+
+
+def prune(now=None):
+    """Delete expired snapshots and their lines; returns the number of snapshots removed."""
+    drop = expired(now)
+    with transaction.atomic():
+        StockSnapshotLine.objects.filter(snapshot__in=drop).delete()
+        StockSnapshot.objects.filter(pk__in=drop).delete()
+    return len(drop)
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from jobs.models import Job, JobStatus
+from jobs.registry import enqueue, task
+from . import rollups, snapshots
+
+
+@task('reporting.rebuild_rollups', max_attempts=1)
+def rebuild_rollups(job):
+    return rollups.rebuild()
+
+
+@task('reporting.snapshot_stock', max_attempts=3)
+def snapshot_stock(job, every_hours=None):
+    """Take a stock snapshot and apply retention; with ``every_hours``, queue the next run."""
+    snapshot = snapshots.take()
+    pruned = snapshots.prune()
+    if every_hours:
+        already_queued = Job.objects.filter(task=job.task, status=JobStatus.QUEUED).exclude(pk=job.pk).exists()
+        if not already_queued:
+            enqueue(job.task, {'every_hours': every_hours}, run_after=snapshot.taken_at + timedelta(hours=every_hours))
+    return {'snapshot': str(snapshot.pk), 'lines': snapshot.lines, 'pruned': pruned}
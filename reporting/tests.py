@@ -1,3 +1,295 @@
-from django.test import TestCase
+import csv
+import io
+from datetime import datetime, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from inventory.importers import StockImporter, read_rows
+from inventory.models import Inventory, MovementType, StockMovement
+from inventory.movements import post_movement
+from items.models import Item, Category
+from storage.models import Location, SubLocation, Area, SubArea
+from suppliers.models import Supplier
+from jobs.models import Job, JobStatus
+from jobs.registry import enqueue
+from jobs.worker import Worker
+from reporting import rollups, snapshots
+from reporting.models import ItemStock, LocationStock, CategoryStock, StockSnapshot, StockSnapshotLine
+
+def make_bin(location):
+    """A SubArea under a fresh Hall > Aisle at ``location``."""
+    subloc = SubLocation.objects.create(name="Hall", location=location)
+    area = Area.objects.create(name="Aisle", sub_location=subloc)
+    return SubArea.objects.create(name="Bin", area=area)
+
+# <--- Stock Rollup Tests --->
+
+class StockRollupTest(TestCase):
+
+    def setUp(self):
+        self.tools = Category.objects.create(name="Tools")
+        self.parts = Category.objects.create(name="Parts")
+        supplier = Supplier.objects.create(supplier_name="Acme")
+        self.hammer = Item.objects.create(
+            item_code="H-1", name="Hammer", category=self.tools,
+            supplier=supplier, price=12.00, internal_value=8.00
+        )
+        self.north = Location.objects.create(name="North")
+        self.south = Location.objects.create(name="South")
+        # Committed, so the importer's cached path lookup sees the new bins.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.north_bin = make_bin(self.north)
+            self.south_bin = make_bin(self.south)
+
+    def totals(self, model, pk):
+        row = model.objects.get(pk=pk)
+        return row.quantity, row.value
+
+    def test_inventory_saves_update_rollups(self):
+        row = Inventory.objects.create(item=self.hammer, location=self.north_bin, quantity=10)
+        Inventory.objects.create(item=self.hammer, location=self.south_bin, quantity=5)
+        row.quantity = 4
+        row.save()
+
+        self.assertEqual(self.totals(ItemStock, self.hammer.pk), (9, Decimal("72.00")))
+        self.assertEqual(self.totals(LocationStock, self.north.pk), (4, Decimal("32.00")))
+        self.assertEqual(self.totals(CategoryStock, self.tools.pk), (9, Decimal("72.00")))
+
+        row.delete()
+        self.assertEqual(self.totals(LocationStock, self.north.pk), (0, Decimal("0.00")))
+
+    def test_movements_and_imports_update_rollups(self):
+        post_movement(movement_type=MovementType.RECEIVE, item=self.hammer, to_location=self.north_bin, quantity=6)
+        post_movement(
+            movement_type=MovementType.TRANSFER, item=self.hammer,
+            from_location=self.north_bin, to_location=self.south_bin, quantity=2
+        )
+        stream = io.StringIO(f"item_code,location,quantity\nH-1,{self.south_bin.full_path},10\n")
+        StockImporter().run(read_rows(stream, 'csv'))
+
+        self.assertEqual(self.totals(LocationStock, self.north.pk)[0], 4)
+        self.assertEqual(self.totals(LocationStock, self.south.pk)[0], 10)
+        self.assertEqual(self.totals(ItemStock, self.hammer.pk)[0], 14)
+
+    def test_item_revaluation_and_recategorisation(self):
+        Inventory.objects.create(item=self.hammer, location=self.north_bin, quantity=10)
+        self.hammer.internal_value = Decimal("9.50")
+        self.hammer.category = self.parts
+        self.hammer.save()
+
+        self.assertEqual(self.totals(ItemStock, self.hammer.pk), (10, Decimal("95.00")))
+        self.assertEqual(self.totals(LocationStock, self.north.pk), (10, Decimal("95.00")))
+        self.assertEqual(self.totals(CategoryStock, self.tools.pk), (0, Decimal("0.00")))
+        self.assertEqual(self.totals(CategoryStock, self.parts.pk), (10, Decimal("95.00")))
+
+    def test_item_delete_drops_its_stock(self):
+        Inventory.objects.create(item=self.hammer, location=self.north_bin, quantity=3)
+        self.hammer.delete()
+        self.assertFalse(ItemStock.objects.exists())
+        self.assertEqual(self.totals(CategoryStock, self.tools.pk), (0, Decimal("0.00")))
+
+    def test_moving_storage_between_sites_moves_its_stock(self):
+        Inventory.objects.create(item=self.hammer, location=self.north_bin, quantity=7)
+        Inventory.objects.create(item=self.hammer, location=self.south_bin, quantity=2)
+        area = self.north_bin.area
+        area.sub_location = self.south_bin.area.sub_location
+        area.name = "Moved aisle"
+        area.save()
+
+        self.assertEqual(self.totals(LocationStock, self.north.pk), (0, Decimal("0.00")))
+        self.assertEqual(self.totals(LocationStock, self.south.pk), (9, Decimal("72.00")))
+
+        # A rename within the site leaves the totals alone.
+        with CaptureQueriesContext(connection) as queries:
+            self.south_bin.area.sub_location.name = "Back hall"
+            self.south_bin.area.sub_location.save()
+        self.assertFalse([query for query in queries if 'reporting_locationstock' in query['sql']])
+        sub_location = area.sub_location
+        sub_location.location = self.north
+        sub_location.save()
+        self.assertEqual(self.totals(LocationStock, self.north.pk), (9, Decimal("72.00")))
+        self.assertFalse(LocationStock.objects.filter(pk=self.south.pk, quantity__gt=0).exists())
+
+    def test_rebuild_matches_incremental_totals(self):
+        Inventory.objects.create(item=self.hammer, location=self.north_bin, quantity=7)
+        Inventory.objects.filter(item=self.hammer).update(quantity=11)
+
+        rollups.rebuild()
+
+        self.assertEqual(self.totals(ItemStock, self.hammer.pk), (11, Decimal("88.00")))
+        self.assertEqual(self.totals(LocationStock, self.north.pk), (11, Decimal("88.00")))
+        self.assertEqual(self.totals(CategoryStock, self.tools.pk), (11, Decimal("88.00")))
+
+
+# <--- Streaming Report Tests --->
+
+class StreamingReportTest(TestCase):
+
+    def setUp(self):
+        tools = Category.objects.create(name="Tools")
+        supplier = Supplier.objects.create(supplier_name="Acme")
+        self.hammer = Item.objects.create(
+            item_code="H-1", name="Hammer", category=tools, supplier=supplier, price=12.00, internal_value=8.00
+        )
+        self.saw = Item.objects.create(
+            item_code="S-1", name="Saw", category=tools, supplier=supplier, price=20.00, internal_value=15.00
+        )
+        self.north = Location.objects.create(name="North")
+        north_bin = make_bin(self.north)
+        south_bin = make_bin(Location.objects.create(name="South"))
+        Inventory.objects.create(item=self.hammer, location=north_bin, quantity=3)
+        Inventory.objects.create(item=self.saw, location=north_bin, quantity=0)
+        Inventory.objects.create(item=self.saw, location=south_bin, quantity=2)
+        self.staff = User.objects.create_user('clerk', password='pw', is_staff=True)
+
+    def fetch(self, name, **params):
+        response = self.client.get(reverse(f'reporting:{name}'), params)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        return list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+    def test_reports_require_staff(self):
+        response = self.client.get(reverse('reporting:stock-on-hand'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_stock_on_hand_under_location(self):
+        self.client.force_login(self.staff)
+        rows = self.fetch('stock-on-hand')
+        self.assertEqual(rows[0][:4], ['Location', 'Item Code', 'Item', 'Quantity'])
+        self.assertEqual([row[1] for row in rows[1:]], ['H-1', 'S-1'])
+
+        rows = self.fetch('stock-on-hand', under=self.north.pk)
+        self.assertEqual([row[:4] for row in rows[1:]], [['North > Hall > Aisle > Bin', 'H-1', 'Hammer', '3']])
+
+    def test_stock_valuation_totals(self):
+        self.client.force_login(self.staff)
+        rows = self.fetch('stock-valuation')
+        self.assertEqual(rows[-1], ['Total', '', '', '5', '', '', '76.00', '54.00'])
+
+    def test_items_by_supplier_and_movements(self):
+        self.client.force_login(self.staff)
+        rows = self.fetch('items-by-supplier')
+        self.assertEqual([(row[1], row[-1]) for row in rows[1:]], [('H-1', '3'), ('S-1', '2')])
+
+        bin_ = SubArea.objects.get(full_path='North > Hall > Aisle > Bin')
+        post_movement(movement_type=MovementType.RECEIVE, item=self.hammer, to_location=bin_, quantity=4, reference="PO-1")
+        rows = self.fetch('stock-movements', since=timezone.localdate().isoformat())
+        self.assertEqual([row[1:4] + [row[6]] for row in rows[1:]], [['RECEIVE', 'H-1', '4', 'PO-1']])
+
+    @override_settings(TIME_ZONE='America/New_York')
+    def test_movement_dates_are_days_in_the_site_time_zone(self):
+        self.client.force_login(self.staff)
+        bin_ = SubArea.objects.get(full_path='North > Hall > Aisle > Bin')
+        midnight = timezone.make_aware(datetime(2026, 3, 2))
+        for reference, moment in (("late", midnight - timedelta(minutes=1)), ("next", midnight)):
+            post_movement(movement_type=MovementType.RECEIVE, item=self.hammer, to_location=bin_, quantity=1, reference=reference)
+            StockMovement.objects.filter(reference=reference).update(created_at=moment)
+
+        rows = self.fetch('stock-movements', since='2026-03-01', until='2026-03-01')
+        self.assertEqual([row[6] for row in rows[1:]], ["late"])
+        rows = self.fetch('stock-movements', since='2026-03-02')
+        self.assertEqual([row[6] for row in rows[1:]], ["next"])
+
+    def test_bad_filters_are_rejected_before_streaming(self):
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get(reverse('reporting:stock-on-hand'), {'under': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('reporting:stock-movements'), {'since': 'x'}).status_code, 400)
+
+
+# <--- Stock Snapshot Tests --->
+
+class StockSnapshotTest(TestCase):
+
+    def setUp(self):
+        tools = Category.objects.create(name="Tools")
+        supplier = Supplier.objects.create(supplier_name="Acme")
+        self.hammer = Item.objects.create(
+            item_code="H-1", name="Hammer", category=tools, supplier=supplier, price=12.00, internal_value=8.00
+        )
+        self.saw = Item.objects.create(
+            item_code="S-1", name="Saw", category=tools, supplier=supplier, price=20.00, internal_value=15.00
+        )
+        self.north = Location.objects.create(name="North")
+        self.north_bin = make_bin(self.north)
+        self.south_bin = make_bin(Location.objects.create(name="South"))
+        Inventory.objects.create(item=self.hammer, location=self.north_bin, quantity=3)
+        Inventory.objects.create(item=self.saw, location=self.north_bin, quantity=0)
+        Inventory.objects.create(item=self.saw, location=self.south_bin, quantity=2)
+        self.staff = User.objects.create_user('clerk', password='pw', is_staff=True)
+
+    def test_take_copies_non_zero_stock_with_values(self):
+        snapshot = snapshots.take()
+        self.assertEqual((snapshot.lines, snapshot.quantity, snapshot.value), (2, 5, Decimal('54.00')))
+        self.assertEqual(
+            set(StockSnapshotLine.objects.filter(snapshot=snapshot).values_list('item__item_code', 'quantity', 'unit_value')),
+            {('H-1', 3, Decimal('8.00')), ('S-1', 2, Decimal('15.00'))},
+        )
+
+    def test_taken_at_follows_every_copied_movement(self):
+        movement = post_movement(movement_type=MovementType.RECEIVE, item=self.hammer, to_location=self.north_bin, quantity=4)
+        snapshot = snapshots.take()
+        self.assertGreater(snapshot.taken_at, movement.created_at)
+        _, lines, deltas = snapshots.stock_at(snapshot.taken_at)
+        self.assertEqual(deltas, {})
+        self.assertEqual(lines.get(item=self.hammer).quantity, 7)
+
+    def test_stock_at_replays_movements_since_snapshot(self):
+        snapshot = snapshots.take()
+        self.hammer.internal_value = 10
+        self.hammer.save()
+        post_movement(movement_type=MovementType.TRANSFER, item=self.hammer,
+                      from_location=self.north_bin, to_location=self.south_bin, quantity=1)
+        post_movement(movement_type=MovementType.ISSUE, item=self.saw, from_location=self.south_bin, quantity=2)
+
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('reporting:stock-at'), {'at': timezone.now().isoformat()})
+        self.assertEqual(response['X-Stock-Snapshot'], snapshot.taken_at.isoformat())
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        # Snapshot rows keep their value at the time; the transferred hammer is valued today.
+        self.assertEqual(rows[1:], [
+            ['North > Hall > Aisle > Bin', 'H-1', 'Hammer', '2', '8.00', '16.00'],
+            ['South > Hall > Aisle > Bin', 'H-1', 'Hammer', '1', '10.00', '10.00'],
+            ['Total', '', '', '3', '', '26.00'],
+        ])
+
+        before = self.client.get(reverse('reporting:stock-at'), {'at': snapshot.taken_at.isoformat(), 'under': self.north.pk})
+        rows = list(csv.reader(io.StringIO(b''.join(before.streaming_content).decode())))
+        self.assertEqual([row[1:4] for row in rows[1:-1]], [['H-1', 'Hammer', '3']])
+
+    def test_stock_at_needs_an_earlier_snapshot(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('reporting:stock-at'), {'at': '2000-01-01'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(reverse('reporting:stock-at')).status_code, 400)
+
+    @override_settings(STOCK_SNAPSHOT_KEEP_DAYS=10, STOCK_SNAPSHOT_KEEP_MONTHS=2)
+    def test_prune_keeps_recent_and_month_end_snapshots(self):
+        now = timezone.make_aware(datetime(2026, 6, 15, 12))
+        def at(*args):
+            return StockSnapshot.objects.create(taken_at=timezone.make_aware(datetime(*args))).pk
+
+        recent = [at(2026, 6, 10), at(2026, 6, 12)]
+        may = [at(2026, 5, 1), at(2026, 5, 31)]
+        april = [at(2026, 4, 2), at(2026, 4, 30)]
+        march = [at(2026, 3, 31)]
+        StockSnapshotLine.objects.create(snapshot_id=may[0], item=self.hammer, location=self.north_bin, quantity=1, unit_value=1)
+
+        self.assertEqual(snapshots.prune(now), 3)
+        self.assertEqual(set(StockSnapshot.objects.values_list('pk', flat=True)), {*recent, may[1], april[1]})
+        self.assertFalse(StockSnapshotLine.objects.filter(snapshot_id=may[0]).exists())
+        self.assertNotIn(march[0], StockSnapshot.objects.values_list('pk', flat=True))
+
+    def test_periodic_job_requeues_itself(self):
+        job = enqueue('reporting.snapshot_stock', {'every_hours': 24})
+        Worker(name='test').run(burst=True, max_jobs=1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.SUCCEEDED)
+        follow_up = Job.objects.get(task='reporting.snapshot_stock', status=JobStatus.QUEUED)
+        self.assertEqual(follow_up.run_after, StockSnapshot.objects.get().taken_at + timedelta(hours=24))
@@ -0,0 +1,12 @@
+from django.urls import path
+from . import views
+
+app_name = 'reporting'
+
+urlpatterns = [
+    path('stock-on-hand.csv', views.stock_on_hand, name='stock-on-hand'),
+    path('stock-valuation.csv', views.stock_valuation, name='stock-valuation'),
+    path('items-by-supplier.csv', views.items_by_supplier, name='items-by-supplier'),
+    path('stock-at.csv', views.stock_at, name='stock-at'),
+    path('stock-movements.csv', views.stock_movements, name='stock-movements'),
+]
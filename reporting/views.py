@@ -1,3 +1,235 @@
-from django.shortcuts import render
+"""
+CSV exports streamed straight from the database.
 
-# Create your views here.
+Each report is a ``values_list(...).iterator(chunk_size=...)`` over one
+joined query: on PostgreSQL that is a server-side cursor, so rows are fetched
+a chunk at a time and written out as they arrive. Memory use is the same for
+ten rows or ten million, and the first bytes reach the client before the
+query has finished. (Behind a transaction-pooling pgbouncer, set
+``DB_DISABLE_SERVER_SIDE_CURSORS`` and the driver buffers the result instead.)
+"""
+import csv
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from functools import wraps
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import DecimalField, ExpressionWrapper, F
+from django.db.models.functions import Coalesce
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.http import require_GET
+
+from inventory.models import Inventory, StockMovement
+from items.models import Item
+from storage.models import StorageClosure, StorageLevel, SubArea
+from .models import StockSnapshot
+from . import snapshots
+
+CHUNK_SIZE = 2000
+
+
+class ReportError(Exception):
+    pass
+
+
+class Echo:
+    """File-like object whose ``write`` hands the line back to ``csv.writer``'s caller."""
+    def write(self, value):
+        return value
+
+
+def csv_response(name, header, rows):
+    writer = csv.writer(Echo())
+    lines = (writer.writerow(row) for row in _prepend(header, rows))
+    response = StreamingHttpResponse(lines, content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{name}-{timezone.localdate():%Y%m%d}.csv"'
+    return response
+
+
+def _prepend(header, rows):
+    yield header
+    yield from rows
+
+
+def report_view(view):
+    """Staff-only GET view; ``ReportError`` becomes a 400 before streaming starts."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except ReportError as exc:
+            return HttpResponseBadRequest(str(exc))
+    return staff_member_required(require_GET(wrapper))
+
+
+def parse_under(request):
+    if not request.GET.get('under'):
+        return None
+    try:
+        return uuid.UUID(request.GET['under'])
+    except ValueError:
+        raise ReportError("'under' must be a storage node id.")
+
+
+def filter_under(request, rows, field='location'):
+    under = parse_under(request)
+    if under is None:
+        return rows
+    return rows.filter(**{f'{field}__in': StorageClosure.objects.descendant_ids(under, StorageLevel.SUB_AREA)})
+
+
+def start_of(day):
+    """Midnight at the start of ``day`` in the site's time zone."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def parse_date(request, name):
+    value = request.GET.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ReportError(f"'{name}' must be a YYYY-MM-DD date.")
+
+
+@report_view
+def stock_on_hand(request):
+    """Every Inventory row with stock, by location path. ``?under=<node id>`` narrows to a subtree."""
+    rows = filter_under(request, Inventory.objects.filter(quantity__gt=0)).order_by(
+        'location__full_path', 'item__item_code'
+    ).values_list('location__full_path', 'item__item_code', 'item__name', 'quantity', 'last_updated')
+    return csv_response(
+        'stock-on-hand',
+        ['Location', 'Item Code', 'Item', 'Quantity', 'Last Updated'],
+        rows.iterator(chunk_size=CHUNK_SIZE),
+    )
+
+
+@report_view
+def stock_valuation(request):
+    """Stock valued at list ``price`` and at ``internal_value``, with a running total row at the end."""
+    money = DecimalField(max_digits=20, decimal_places=2)
+    rows = filter_under(request, Inventory.objects.filter(quantity__gt=0)).order_by(
+        'location__full_path', 'item__item_code'
+    ).annotate(
+        price_value=ExpressionWrapper(F('quantity') * F('item__price'), output_field=money),
+        internal_value_total=ExpressionWrapper(F('quantity') * F('item__internal_value'), output_field=money),
+    ).values_list(
+        'location__full_path', 'item__item_code', 'item__name', 'quantity',
+        'item__price', 'item__internal_value', 'price_value', 'internal_value_total',
+    )
+
+    def with_totals(rows):
+        quantity, price_total, internal_total = 0, Decimal('0.00'), Decimal('0.00')
+        for row in rows:
+            quantity += row[3]
+            price_total += row[6]
+            internal_total += row[7]
+            yield row
+        yield ['Total', '', '', quantity, '', '', price_total, internal_total]
+
+    return csv_response(
+        'stock-valuation',
+        ['Location', 'Item Code', 'Item', 'Quantity', 'Price', 'Internal Value', 'Value at Price', 'Value at Internal'],
+        with_totals(rows.iterator(chunk_size=CHUNK_SIZE)),
+    )
+
+
+@report_view
+def items_by_supplier(request):
+    """Catalogue grouped by supplier, with on-hand totals from the ItemStock rollup."""
+    rows = Item.objects.annotate(on_hand=Coalesce('stock_rollup__quantity', 0)).order_by(
+        'supplier__supplier_name', 'item_code'
+    ).values_list('supplier__supplier_name', 'item_code', 'name', 'category__name', 'price', 'internal_value', 'on_hand')
+    return csv_response(
+        'items-by-supplier',
+        ['Supplier', 'Item Code', 'Item', 'Category', 'Price', 'Internal Value', 'On Hand'],
+        rows.iterator(chunk_size=CHUNK_SIZE),
+    )
+
+
+@report_view
+def stock_movements(request):
+    """The movement ledger, oldest first, between ``?since=`` and ``?until=`` (inclusive dates)."""
+    rows = StockMovement.objects.all()
+    since, until = parse_date(request, 'since'), parse_date(request, 'until')
+    # Plain ranges on created_at, so its index is used; ``__date`` would wrap the column in a cast.
+    if since:
+        rows = rows.filter(created_at__gte=start_of(since))
+    if until:
+        rows = rows.filter(created_at__lt=start_of(until + timedelta(days=1)))
+    rows = rows.order_by('created_at', 'id').values_list(
+        'created_at', 'movement_type', 'item__item_code', 'quantity',
+        'from_location__full_path', 'to_location__full_path', 'reference', 'created_by__username',
+    )
+    return csv_response(
+        'stock-movements',
+        ['Created', 'Type', 'Item Code', 'Quantity', 'From', 'To', 'Reference', 'User'],
+        rows.iterator(chunk_size=CHUNK_SIZE),
+    )
+
+
+def parse_moment(request, name):
+    """An ISO datetime, or a date meaning the end of that day, in the site's time zone."""
+    value = request.GET.get(name)
+    if not value:
+        raise ReportError(f"'{name}' is required.")
+    try:
+        moment = datetime.combine(date.fromisoformat(value), time.max)
+    except ValueError:
+        try:
+            moment = datetime.fromisoformat(value)
+        except ValueError:
+            raise ReportError(f"'{name}' must be a YYYY-MM-DD date or an ISO datetime.")
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+@report_view
+def stock_at(request):
+    """
+    Stock on hand and its value at ``?at=`` (date or datetime): the latest
+    snapshot before then, with the movements posted since applied on top.
+    ``?under=<node id>`` narrows to a subtree.
+    """
+    try:
+        snapshot, lines, deltas = snapshots.stock_at(parse_moment(request, 'at'), parse_under(request))
+    except StockSnapshot.DoesNotExist as exc:
+        raise ReportError(str(exc))
+
+    rows = lines.order_by('location__full_path', 'item__item_code').values_list(
+        'location__full_path', 'item__item_code', 'item__name', 'quantity', 'unit_value', 'item_id', 'location_id',
+    )
+
+    def merged(rows):
+        quantity_total, value_total = 0, Decimal('0.00')
+        for path, item_code, name, quantity, unit_value, item_id, location_id in rows:
+            quantity += deltas.pop((item_id, location_id), 0)
+            if quantity:
+                quantity_total += quantity
+                value_total += quantity * unit_value
+                yield [path, item_code, name, quantity, unit_value, quantity * unit_value]
+
+        # Stock that arrived after the snapshot where it had none; valued at today's internal value.
+        items = Item.objects.in_bulk({item_id for item_id, _ in deltas})
+        paths = dict(SubArea.objects.filter(pk__in={location_id for _, location_id in deltas}).values_list('id', 'full_path'))
+        for (item_id, location_id), quantity in sorted(
+            deltas.items(), key=lambda entry: (paths[entry[0][1]], items[entry[0][0]].item_code)
+        ):
+            item = items[item_id]
+            quantity_total += quantity
+            value_total += quantity * item.internal_value
+            yield [paths[location_id], item.item_code, item.name, quantity, item.internal_value, quantity * item.internal_value]
+        yield ['Total', '', '', quantity_total, '', value_total]
+
+    response = csv_response(
+        'stock-at',
+        ['Location', 'Item Code', 'Item', 'Quantity', 'Unit Value', 'Value'],
+        merged(rows.iterator(chunk_size=CHUNK_SIZE)),
+    )
+    response['X-Stock-Snapshot'] = snapshot.taken_at.isoformat()
+    return response
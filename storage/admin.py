@@ -1,5 +1,39 @@
 from django.contrib import admin
-from .models import Location, SubLocation, Area, SubArea
+from config.cache import reference_cache, STORAGE
+from .models import Location, SubLocation, Area, SubArea, StorageClosure, StorageLevel
+
+class StorageLocationFilter(admin.SimpleListFilter):
+    """
+    Filters anything with a ``location`` FK to SubArea by top-level Location,
+    using the closure table instead of joining through the whole tree.
+    """
+    title = 'location'
+    parameter_name = 'storage_location'
+
+    def lookups(self, request, model_admin):
+        return reference_cache.get_or_set(
+            STORAGE, 'location-choices',
+            lambda: list(Location.objects.order_by('name').values_list('id', 'name')),
+        )
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(
+                location__in=StorageClosure.objects.descendant_ids(self.value(), StorageLevel.SUB_AREA)
+            )
+        return queryset
+
+class StoragePathFilter(admin.RelatedFieldListFilter):
+    """
+    Related-field filter for storage FKs, labelled with the stored full_path
+    so building the choices is one query rather than one ``__str__`` per node.
+    """
+    def field_choices(self, field, request, model_admin):
+        model = field.related_model
+        return reference_cache.get_or_set(
+            STORAGE, f'path-choices:{model._meta.model_name}',
+            lambda: list(model.objects.order_by('full_path').values_list('pk', 'full_path')),
+        )
 
 class LocationAdmin(admin.ModelAdmin):
     list_display = (
@@ -17,7 +51,8 @@ class SubLocationAdmin(admin.ModelAdmin):
         'name',
         'location',
     )
-    list_filter = ('location',) 
+    list_select_related = ('location',)
+    list_filter = ('location',)
     search_fields = ('name', 'location__name')
 
 admin.site.register(SubLocation, SubLocationAdmin)
@@ -28,7 +63,8 @@ class AreaAdmin(admin.ModelAdmin):
         'name',
         'sub_location',
     )
-    list_filter = ('sub_location',)
+    list_select_related = ('sub_location__location',)
+    list_filter = (('sub_location', StoragePathFilter),)
     search_fields = ('name', 'sub_location__name')
 
 admin.site.register(Area, AreaAdmin)
@@ -39,7 +75,18 @@ class SubAreaAdmin(admin.ModelAdmin):
         'name',
         'area',
     )
-    list_filter = ('area',)
-    search_fields = ('name', 'area__name')
+    list_select_related = ('area__sub_location',)
+    list_filter = (('area', StoragePathFilter),)
+    # Also backs the Inventory and StockMovement location autocompletes.
+    search_fields = ('full_path',)
+    ordering = ('full_path',)
+
+    def get_search_results(self, request, queryset, search_term):
+        # The whole term as a path prefix, which storage migration 0005 indexes; the
+        # default per-word icontains would scan every SubArea.
+        if search_term.strip():
+            queryset = queryset.filter(full_path__istartswith=search_term.strip())
+        # Autocomplete labels use __str__, which reads the area.
+        return queryset.select_related('area'), False
 
 admin.site.register(SubArea, SubAreaAdmin)
\ No newline at end of file
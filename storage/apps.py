@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class StorageConfig(AppConfig):
     name = 'storage'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,61 @@
+"""
+Bulk maintenance of the denormalized storage hierarchy.
+
+``StorageNode.save()`` keeps ``full_path`` and ``StorageClosure`` current for
+normal edits; ``rebuild()`` recomputes both from scratch for data that was
+written with ``bulk_create``/``update()`` or predates the columns. It takes an
+app registry so migrations can run it against historical models.
+"""
+from django.apps import apps as global_apps
+
+PATH_SEPARATOR = ' > '
+
+# (model name, parent FK name, closure level), root first.
+LEVELS = (
+    ('Location', None, 'location'),
+    ('SubLocation', 'location', 'sub_location'),
+    ('Area', 'sub_location', 'area'),
+    ('SubArea', 'area', 'sub_area'),
+)
+
+
+def rebuild(apps=global_apps, batch_size=2000):
+    StorageClosure = apps.get_model('storage', 'StorageClosure')
+
+    # node id -> (full path, closure level, [(ancestor id, ancestor level), ...] nearest first)
+    nodes = {}
+    closure_rows = []
+
+    for model_name, parent_field, level in LEVELS:
+        model = apps.get_model('storage', model_name)
+        fields = ['id', 'name'] + ([f'{parent_field}_id'] if parent_field else [])
+        changed = []
+
+        for row in model.objects.values_list(*fields).iterator(chunk_size=batch_size):
+            node_id, name = row[0], row[1]
+            if parent_field:
+                parent_path, parent_level, parent_ancestors = nodes[row[2]]
+                full_path = f"{parent_path}{PATH_SEPARATOR}{name}"
+                ancestors = [(row[2], parent_level)] + parent_ancestors
+            else:
+                full_path = name
+                ancestors = []
+
+            nodes[node_id] = (full_path, level, ancestors)
+            changed.append(model(id=node_id, full_path=full_path))
+
+            closure_rows.append(StorageClosure(
+                ancestor=node_id, ancestor_level=level,
+                descendant=node_id, descendant_level=level, depth=0,
+            ))
+            for depth, (ancestor_id, ancestor_level) in enumerate(ancestors, start=1):
+                closure_rows.append(StorageClosure(
+                    ancestor=ancestor_id, ancestor_level=ancestor_level,
+                    descendant=node_id, descendant_level=level, depth=depth,
+                ))
+
+        model.objects.bulk_update(changed, ['full_path'], batch_size=batch_size)
+
+    StorageClosure.objects.all().delete()
+    StorageClosure.objects.bulk_create(closure_rows, batch_size=batch_size)
+    return len(nodes)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from config.cache import reference_cache, STORAGE
+from storage import hierarchy
+
+
+class Command(BaseCommand):
+    help = "Recompute full_path and the closure table for the whole storage tree."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = hierarchy.rebuild(batch_size=options['batch_size'])
+        reference_cache.invalidate(STORAGE)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt paths for {count} storage nodes."))
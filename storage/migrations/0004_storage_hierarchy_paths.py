@@ -0,0 +1,54 @@
+# Generated by Django 6.0 on 2026-10-17 18:41
+
+from django.db import migrations, models
+
+
+def rebuild_storage_hierarchy(apps, schema_editor):
+    from storage.hierarchy import rebuild
+    rebuild(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('storage', '0003_auto_20251219_1045'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='area',
+            name='full_path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='full_path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='subarea',
+            name='full_path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='sublocation',
+            name='full_path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=500),
+        ),
+        migrations.CreateModel(
+            name='StorageClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ancestor', models.UUIDField()),
+                ('ancestor_level', models.CharField(choices=[('location', 'Location'), ('sub_location', 'Sub Location'), ('area', 'Area'), ('sub_area', 'Sub Area')], max_length=20)),
+                ('descendant', models.UUIDField()),
+                ('descendant_level', models.CharField(choices=[('location', 'Location'), ('sub_location', 'Sub Location'), ('area', 'Area'), ('sub_area', 'Sub Area')], max_length=20)),
+                ('depth', models.PositiveSmallIntegerField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ancestor', 'descendant_level'], name='storage_closure_anc_level'), models.Index(fields=['descendant'], name='storage_closure_descendant')],
+                'unique_together': {('ancestor', 'descendant')},
+            },
+        ),
+        migrations.RunPython(rebuild_storage_hierarchy, migrations.RunPython.noop),
+    ]
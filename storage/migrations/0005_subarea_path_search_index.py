@@ -0,0 +1,49 @@
+from django.db import migrations
+
+# Serve the SubArea admin/autocomplete search, full_path__istartswith. The
+# db_index on full_path is case-sensitive, so it cannot answer that lookup.
+# Raw SQL for the same reason as items 0002: these are expression/collation
+# indexes for one backend each, kept out of the model state.
+POSTGRES_FORWARD = (
+    # Matches Django's UPPER(full_path::text) LIKE UPPER(%s).
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS storage_subarea_path_upper_prefix "
+    "ON storage_subarea (UPPER(full_path) text_pattern_ops)",
+)
+POSTGRES_BACKWARD = (
+    "DROP INDEX CONCURRENTLY IF EXISTS storage_subarea_path_upper_prefix",
+)
+
+# SQLite's LIKE is case-insensitive and can only use a NOCASE index.
+SQLITE_FORWARD = (
+    "CREATE INDEX IF NOT EXISTS storage_subarea_path_nocase ON storage_subarea (full_path COLLATE NOCASE)",
+)
+SQLITE_BACKWARD = (
+    "DROP INDEX IF EXISTS storage_subarea_path_nocase",
+)
+
+
+FORWARD = {'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}
+BACKWARD = {'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD}
+
+
+def create_search_index(apps, schema_editor):
+    for statement in FORWARD.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    for statement in BACKWARD.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('storage', '0004_storage_hierarchy_paths'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
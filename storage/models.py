@@ -1,51 +1,204 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
 import uuid
 
-class Location(models.Model):
+from .hierarchy import PATH_SEPARATOR
+
+class StorageLevel(models.TextChoices):
+    LOCATION = 'location', 'Location'
+    SUB_LOCATION = 'sub_location', 'Sub Location'
+    AREA = 'area', 'Area'
+    SUB_AREA = 'sub_area', 'Sub Area'
+
+class StorageNode(models.Model):
+    """
+    Shared behaviour for the four storage levels.
+
+    Every node stores its denormalized ``full_path`` and owns a set of rows in
+    ``StorageClosure``; both are kept in step with renames and moves on save.
+    """
+    full_path = models.CharField(max_length=500, db_index=True, editable=False, default='')
+
+    # Name of the FK to the level above (None for the root level).
+    parent_field = None
+    level = None
+
+    class Meta:
+        abstract = True
+
+    def get_parent(self):
+        if self.parent_field is None:
+            return None
+        return getattr(self, self.parent_field)
+
+    def build_full_path(self):
+        parent = self.get_parent()
+        if parent is None:
+            return self.name
+        return f"{parent.full_path}{PATH_SEPARATOR}{self.name}"
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'full_path'}
+
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                fields = ['full_path']
+                if self.parent_field:
+                    fields.append(f'{self.parent_field}_id')
+                previous = type(self).objects.filter(pk=self.pk).values(*fields).first()
+
+            self.full_path = self.build_full_path()
+            super().save(*args, **kwargs)
+
+            if previous is None:
+                StorageClosure.objects.attach(self)
+                return
+
+            if self.parent_field:
+                parent_id = getattr(self, f'{self.parent_field}_id')
+                if previous[f'{self.parent_field}_id'] != parent_id:
+                    StorageClosure.objects.move(self)
+            if previous['full_path'] != self.full_path:
+                self._rewrite_descendant_paths(previous['full_path'])
+
+    def _rewrite_descendant_paths(self, old_path):
+        """Swap the old path prefix for the new one on every node below this one."""
+        new_prefix = Value(self.full_path, output_field=models.CharField())
+        remainder = Substr('full_path', len(old_path) + 1)
+        for model in STORAGE_MODELS:
+            model.objects.filter(
+                pk__in=StorageClosure.objects.descendant_ids(self.pk, model.level, include_self=False)
+            ).update(full_path=Concat(new_prefix, remainder, output_field=models.CharField()))
+
+class Location(StorageNode):
     # Explicit UUID Primary Key
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=100, unique=True)
-    
+
+    level = StorageLevel.LOCATION
+
     def __str__(self):
         return self.name
 
-class SubLocation(models.Model):
+class SubLocation(StorageNode):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=100)
     location = models.ForeignKey(Location, on_delete=models.CASCADE)
 
+    parent_field = 'location'
+    level = StorageLevel.SUB_LOCATION
+
     class Meta:
-        unique_together = ('location', 'name') 
+        unique_together = ('location', 'name')
 
     def __str__(self):
         return f"{self.location.name} - {self.name}"
 
-class Area(models.Model):
+class Area(StorageNode):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=100)
     sub_location = models.ForeignKey(SubLocation, on_delete=models.CASCADE)
 
+    parent_field = 'sub_location'
+    level = StorageLevel.AREA
+
     class Meta:
         unique_together = ('sub_location', 'name')
 
     def __str__(self):
         return f"{self.sub_location.name} - {self.name}"
 
-class SubArea(models.Model):
+class SubArea(StorageNode):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=100)
     area = models.ForeignKey(Area, on_delete=models.PROTECT)
 
+    parent_field = 'area'
+    level = StorageLevel.SUB_AREA
+
     def get_full_location_display(self):
-        ar = self.area
-        sl = ar.sub_location
-        loc = sl.location
-        return f"{loc.name} > {sl.name} > {ar.name} > {self.name}"
-    
+        return self.full_path
+
     get_full_location_display.short_description = 'Full Location Path'
 
     class Meta:
         unique_together = ('area', 'name')
 
     def __str__(self):
-        return f"{self.area.name} - {self.name}"
\ No newline at end of file
+        return f"{self.area.name} - {self.name}"
+
+STORAGE_MODELS = (Location, SubLocation, Area, SubArea)
+
+class StorageClosureQuerySet(models.QuerySet):
+
+    def descendant_ids(self, ancestor_id, level=None, include_self=True):
+        """Subquery of node ids at ``level`` sitting under ``ancestor_id``."""
+        qs = self.filter(ancestor=ancestor_id)
+        if level is not None:
+            qs = qs.filter(descendant_level=level)
+        if not include_self:
+            qs = qs.filter(depth__gt=0)
+        return qs.values('descendant')
+
+    def attach(self, node):
+        """Insert the closure rows for a freshly created node."""
+        rows = [self.model(
+            ancestor=node.pk, ancestor_level=node.level,
+            descendant=node.pk, descendant_level=node.level, depth=0,
+        )]
+        parent = node.get_parent()
+        if parent is not None:
+            for ancestor, ancestor_level, depth in self.filter(descendant=parent.pk).values_list(
+                'ancestor', 'ancestor_level', 'depth'
+            ):
+                rows.append(self.model(
+                    ancestor=ancestor, ancestor_level=ancestor_level,
+                    descendant=node.pk, descendant_level=node.level, depth=depth + 1,
+                ))
+        self.bulk_create(rows)
+
+    def move(self, node):
+        """Re-hang the subtree under ``node`` beneath its new parent."""
+        subtree = list(self.filter(ancestor=node.pk).values_list('descendant', 'descendant_level', 'depth'))
+        subtree_ids = self.descendant_ids(node.pk)
+
+        self.filter(descendant__in=subtree_ids).exclude(ancestor__in=subtree_ids).delete()
+
+        parent = node.get_parent()
+        ancestors = self.filter(descendant=parent.pk).values_list('ancestor', 'ancestor_level', 'depth')
+        self.bulk_create([
+            self.model(
+                ancestor=ancestor, ancestor_level=ancestor_level,
+                descendant=descendant, descendant_level=descendant_level,
+                depth=ancestor_depth + depth + 1,
+            )
+            for ancestor, ancestor_level, ancestor_depth in ancestors
+            for descendant, descendant_level, depth in subtree
+        ], batch_size=1000)
+
+class StorageClosure(models.Model):
+    """
+    Ancestor/descendant pairs for the storage tree, including a depth-0 row
+    for every node, so "everything under X" is a single indexed lookup.
+    """
+    ancestor = models.UUIDField()
+    ancestor_level = models.CharField(max_length=20, choices=StorageLevel.choices)
+    descendant = models.UUIDField()
+    descendant_level = models.CharField(max_length=20, choices=StorageLevel.choices)
+    depth = models.PositiveSmallIntegerField()
+
+    objects = StorageClosureQuerySet.as_manager()
+
+    class Meta:
+        unique_together = ('ancestor', 'descendant')
+        indexes = [
+            models.Index(fields=['ancestor', 'descendant_level'], name='storage_closure_anc_level'),
+            models.Index(fields=['descendant'], name='storage_closure_descendant'),
+        ]
+
+    def __str__(self):
+        return f"{self.ancestor} -> {self.descendant} ({self.depth})"
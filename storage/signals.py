@@ -0,0 +1,61 @@
+"""
+``site_changed`` is sent when a SubLocation, Area or SubArea is saved under a
+different top-level Location than before, with the moved node's id and the
+old and new site ids. Everything stocked below the node moved with it, so
+per-site totals must be adjusted. Receivers run inside the save's transaction.
+"""
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import Signal, receiver
+
+from config.cache import reference_cache, STORAGE
+from .models import Location, SubLocation, Area, SubArea, StorageClosure, StorageLevel
+
+site_changed = Signal()
+
+
+def site_id_of(node):
+    """The id of the top-level Location ``node`` hangs under, following its current parents."""
+    parent = node.get_parent()
+    return node.pk if parent is None else site_id_of(parent)
+
+
+@receiver(pre_save, sender=SubLocation)
+@receiver(pre_save, sender=Area)
+@receiver(pre_save, sender=SubArea)
+def remember_previous_site(sender, instance, raw=False, **kwargs):
+    # The closure rows are only rewritten after the save, so they still hold the old site here.
+    instance._previous_site_id = None
+    if not raw and not instance._state.adding:
+        instance._previous_site_id = StorageClosure.objects.filter(
+            descendant=instance.pk, ancestor_level=StorageLevel.LOCATION,
+        ).values_list('ancestor', flat=True).first()
+
+
+@receiver(post_save, sender=SubLocation)
+@receiver(post_save, sender=Area)
+@receiver(post_save, sender=SubArea)
+def node_saved(sender, instance, raw=False, **kwargs):
+    previous = getattr(instance, '_previous_site_id', None)
+    if raw or previous is None:
+        return
+    current = site_id_of(instance)
+    if current != previous:
+        site_changed.send(sender=sender, node_id=instance.pk, old_site_id=previous, new_site_id=current)
+
+
+@receiver(post_delete, sender=Location)
+@receiver(post_delete, sender=SubLocation)
+@receiver(post_delete, sender=Area)
+@receiver(post_delete, sender=SubArea)
+def drop_closure_rows(sender, instance, **kwargs):
+    StorageClosure.objects.filter(descendant=instance.pk).delete()
+
+
+@receiver([post_save, post_delete], sender=Location)
+@receiver([post_save, post_delete], sender=SubLocation)
+@receiver([post_save, post_delete], sender=Area)
+@receiver([post_save, post_delete], sender=SubArea)
+def invalidate_storage_cache(sender, **kwargs):
+    # A rename rewrites descendant paths too, so the whole tree shares one namespace.
+    transaction.on_commit(lambda: reference_cache.invalidate(STORAGE))
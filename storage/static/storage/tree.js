@@ -0,0 +1,90 @@
+'use strict';
+{
+    // Lazy storage tree for StorageTreeWidget: each expand fetches one level
+    // from the storage tree endpoint; only sub-areas can be selected.
+    async function fetchChildren(url, parent, cursor) {
+        const params = new URLSearchParams();
+        if (parent) params.set('parent', parent);
+        if (cursor) params.set('cursor', cursor);
+        const response = await fetch(`${url}?${params}`, {credentials: 'same-origin'});
+        if (!response.ok) throw new Error(`Storage tree request failed: ${response.status}`);
+        return response.json();
+    }
+
+    function renderNode(tree, node) {
+        const item = document.createElement('li');
+        const canExpand = node.child_count > 0;
+
+        const toggle = document.createElement('button');
+        toggle.type = 'button';
+        toggle.textContent = canExpand ? '+' : '·';
+        toggle.disabled = !canExpand;
+        item.appendChild(toggle);
+
+        const label = document.createElement(node.level === 'sub_area' ? 'a' : 'span');
+        label.className = 'storage-tree-label';
+        label.textContent = node.name;
+        if (node.level === 'sub_area') {
+            label.href = '#';
+            label.addEventListener('click', (event) => {
+                event.preventDefault();
+                tree.input.value = node.id;
+                tree.selected.textContent = node.full_path;
+                tree.root.querySelectorAll('.is-selected').forEach((el) => el.classList.remove('is-selected'));
+                item.classList.add('is-selected');
+            });
+        }
+        item.appendChild(label);
+
+        const meta = document.createElement('span');
+        meta.className = 'storage-tree-meta';
+        meta.textContent = ` ${node.quantity} in stock` + (canExpand ? `, ${node.child_count} below` : '');
+        item.appendChild(meta);
+
+        if (canExpand) {
+            const children = document.createElement('ul');
+            children.hidden = true;
+            item.appendChild(children);
+            toggle.addEventListener('click', async () => {
+                if (!children.dataset.loaded) {
+                    children.dataset.loaded = '1';
+                    await loadInto(tree, children, node.id);
+                }
+                children.hidden = !children.hidden;
+                toggle.textContent = children.hidden ? '+' : '−';
+            });
+        }
+        return item;
+    }
+
+    async function loadInto(tree, list, parent, cursor) {
+        const page = await fetchChildren(tree.url, parent, cursor);
+        page.children.forEach((node) => list.appendChild(renderNode(tree, node)));
+        if (page.next) {
+            const more = document.createElement('li');
+            const button = document.createElement('button');
+            button.type = 'button';
+            button.textContent = 'Show more…';
+            button.addEventListener('click', () => {
+                more.remove();
+                loadInto(tree, list, parent, page.next);
+            });
+            more.appendChild(button);
+            list.appendChild(more);
+        }
+    }
+
+    function init(root) {
+        if (root.dataset.ready) return;
+        root.dataset.ready = '1';
+        const tree = {
+            root,
+            url: root.dataset.treeUrl,
+            input: root.querySelector('input[type=hidden]'),
+            selected: root.querySelector('.storage-tree-selected'),
+        };
+        loadInto(tree, root.querySelector('.storage-tree-nodes'), null);
+    }
+
+    window.addEventListener('load', () => document.querySelectorAll('.storage-tree').forEach(init));
+}
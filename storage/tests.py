@@ -1,12 +1,20 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.db.utils import IntegrityError
-from django.db import transaction
+from django.db import transaction, connection
+from django.contrib.auth.models import User
+from django.test.utils import CaptureQueriesContext
+from django.contrib.admin import site
+from django.urls import reverse
 from django.core.exceptions import ValidationError
 import uuid
-from storage.models import Location, SubLocation, Area, SubArea
+from storage.models import Location, SubLocation, Area, SubArea, StorageClosure, StorageLevel
+from storage import hierarchy
+from reporting import rollups
 from inventory.models import Inventory
 from items.models import Item, Category
 from suppliers.models import Supplier 
+from config.api import encode_cursor
+from config.query_plans import QueryPlanAssertions
 
 # <--- Location Tests --->
 
@@ -136,4 +144,224 @@ class InventoryModelTest(TestCase):
         """Verify the full breadcrumb path logic (Location > SubLoc > Area > SubArea)."""
         expected_path = "Storehouse > Zone 1 > Bin A > Slot 1"
         actual_path = self.inventory_item.location.get_full_location_display()
-        self.assertEqual(actual_path, expected_path)
\ No newline at end of file
+        self.assertEqual(actual_path, expected_path)
+
+# <--- Full Path & Closure Table Tests --->
+
+class StorageHierarchyTest(TestCase):
+
+    def setUp(self):
+        self.loc = Location.objects.create(name="North Site")
+        self.other_loc = Location.objects.create(name="South Site")
+        self.subloc = SubLocation.objects.create(name="Hall 1", location=self.loc)
+        self.area = Area.objects.create(name="Aisle 4", sub_location=self.subloc)
+        self.subarea = SubArea.objects.create(name="Bin 9", area=self.area)
+
+    def test_full_path_stored_on_create(self):
+        self.assertEqual(self.subloc.full_path, "North Site > Hall 1")
+        self.assertEqual(self.area.full_path, "North Site > Hall 1 > Aisle 4")
+        self.assertEqual(SubArea.objects.get(pk=self.subarea.pk).full_path, "North Site > Hall 1 > Aisle 4 > Bin 9")
+
+    def test_full_location_display_needs_no_queries(self):
+        subarea = SubArea.objects.get(pk=self.subarea.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(subarea.get_full_location_display(), "North Site > Hall 1 > Aisle 4 > Bin 9")
+
+    def test_closure_rows_created(self):
+        ancestors = set(StorageClosure.objects.filter(descendant=self.subarea.pk).values_list('ancestor', 'depth'))
+        self.assertEqual(ancestors, {
+            (self.subarea.pk, 0), (self.area.pk, 1), (self.subloc.pk, 2), (self.loc.pk, 3),
+        })
+
+    def test_rename_rewrites_descendant_paths(self):
+        self.loc.name = "North Campus"
+        self.loc.save()
+        self.assertEqual(Area.objects.get(pk=self.area.pk).full_path, "North Campus > Hall 1 > Aisle 4")
+        self.assertEqual(SubArea.objects.get(pk=self.subarea.pk).full_path, "North Campus > Hall 1 > Aisle 4 > Bin 9")
+
+    def test_move_updates_paths_and_closure(self):
+        self.subloc.location = self.other_loc
+        self.subloc.save()
+
+        self.assertEqual(SubArea.objects.get(pk=self.subarea.pk).full_path, "South Site > Hall 1 > Aisle 4 > Bin 9")
+        under_north = StorageClosure.objects.descendant_ids(self.loc.pk, StorageLevel.SUB_AREA)
+        under_south = StorageClosure.objects.descendant_ids(self.other_loc.pk, StorageLevel.SUB_AREA)
+        self.assertFalse(SubArea.objects.filter(pk__in=under_north).exists())
+        self.assertTrue(SubArea.objects.filter(pk__in=under_south, pk=self.subarea.pk).exists())
+
+    def test_delete_removes_closure_rows(self):
+        self.subarea.delete()
+        self.assertFalse(StorageClosure.objects.filter(descendant=self.subarea.pk).exists())
+
+    def test_rebuild_restores_bulk_written_nodes(self):
+        SubArea.objects.filter(pk=self.subarea.pk).update(full_path='')
+        StorageClosure.objects.all().delete()
+
+        hierarchy.rebuild()
+
+        self.assertEqual(SubArea.objects.get(pk=self.subarea.pk).full_path, "North Site > Hall 1 > Aisle 4 > Bin 9")
+        self.assertEqual(StorageClosure.objects.filter(descendant=self.subarea.pk).count(), 4)
+
+
+# <--- Admin Query Count Tests --->
+
+class StorageAdminQueryCountTest(TestCase):
+    """The storage changelists must not issue a query per row or per filter choice."""
+
+    def setUp(self):
+        admin_user = User.objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(admin_user)
+
+    def add_branches(self, start, count):
+        # Run the on-commit cache invalidations, as a committed write would.
+        with self.captureOnCommitCallbacks(execute=True):
+            for n in range(start, start + count):
+                loc = Location.objects.create(name=f"Site {n}")
+                subloc = SubLocation.objects.create(name="Hall", location=loc)
+                area = Area.objects.create(name="Aisle", sub_location=subloc)
+                SubArea.objects.create(name="Bin", area=area)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_changelists_have_fixed_query_count(self):
+        urls = [
+            reverse(f'admin:storage_{name}_changelist')
+            for name in ('location', 'sublocation', 'area', 'subarea')
+        ]
+        self.add_branches(0, 2)
+        baseline = {url: self.count_queries(url) for url in urls}
+        self.add_branches(2, 15)
+        for url in urls:
+            self.assertEqual(self.count_queries(url), baseline[url], url)
+
+
+# <--- Storage API Tests --->
+
+@override_settings(API_TOKENS=['sync-token'])
+class StorageApiTest(TestCase):
+
+    def setUp(self):
+        self.loc = Location.objects.create(name="Depot")
+        self.subloc = SubLocation.objects.create(name="Hall", location=self.loc)
+        SubLocation.objects.create(name="Annex", location=self.loc)
+
+    def test_children_of_parent_in_path_order(self):
+        response = self.client.get(
+            reverse('storage:node-list', args=['sublocations']),
+            {'parent': self.loc.pk, 'fields': 'name,full_path'},
+            HTTP_AUTHORIZATION='Bearer sync-token'
+        )
+        self.assertEqual(response.json()['results'], [
+            {'name': "Annex", 'full_path': "Depot > Annex"},
+            {'name': "Hall", 'full_path': "Depot > Hall"},
+        ])
+
+    def test_unknown_level(self):
+        response = self.client.get(
+            reverse('storage:node-list', args=['shelves']), HTTP_AUTHORIZATION='Bearer sync-token'
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+# <--- Storage Tree Browser Tests --->
+
+@override_settings(API_TOKENS=['sync-token'])
+class StorageTreeTest(TestCase):
+
+    def setUp(self):
+        cat = Category.objects.create(name="Hardware")
+        sup = Supplier.objects.create(supplier_name="Generic Supplier")
+        self.item = Item.objects.create(
+            item_code="TREE-01", name="Bolt", category=cat, supplier=sup, price=1, internal_value=1
+        )
+        self.loc = Location.objects.create(name="Depot")
+        self.hall = SubLocation.objects.create(name="Hall", location=self.loc)
+        SubLocation.objects.create(name="Annex", location=self.loc)
+        self.aisle = Area.objects.create(name="Aisle", sub_location=self.hall)
+        self.bins = [SubArea.objects.create(name=f"Bin {n}", area=self.aisle) for n in range(3)]
+        for subarea in self.bins[:2]:
+            Inventory.objects.create(item=self.item, location=subarea, quantity=5)
+        rollups.rebuild()
+
+    def children(self, parent=None, **params):
+        if parent is not None:
+            params['parent'] = parent
+        return self.client.get(reverse('storage:tree'), params, HTTP_AUTHORIZATION='Bearer sync-token')
+
+    def test_roots_use_location_rollup(self):
+        rows = self.children().json()['children']
+        self.assertEqual([row for row in rows if row['id'] == str(self.loc.pk)], [{
+            'id': str(self.loc.pk), 'name': "Depot", 'full_path': "Depot",
+            'child_count': 2, 'quantity': 10, 'level': 'location',
+        }])
+
+    def test_children_with_counts_and_stock(self):
+        rows = self.children(self.loc.pk).json()['children']
+        self.assertEqual(
+            [(row['name'], row['child_count'], row['quantity']) for row in rows],
+            [("Annex", 0, 0), ("Hall", 1, 10)],
+        )
+        rows = self.children(self.aisle.pk).json()['children']
+        self.assertEqual([row['quantity'] for row in rows], [5, 5, 0])
+        self.assertEqual({row['level'] for row in rows}, {'sub_area'})
+        self.assertEqual(self.children(self.bins[0].pk).json()['children'], [])
+
+    def test_pages_by_cursor(self):
+        first = self.children(self.aisle.pk, limit=2).json()
+        second = self.children(self.aisle.pk, limit=2, cursor=first['next']).json()
+        self.assertEqual([row['name'] for row in first['children'] + second['children']], ["Bin 0", "Bin 1", "Bin 2"])
+        self.assertIsNone(second['next'])
+
+    def test_tampered_cursor_is_rejected(self):
+        response = self.children(self.aisle.pk, cursor=encode_cursor(["Bin 0", "not-a-uuid"]))
+        self.assertEqual(response.status_code, 400)
+
+    def test_query_count_independent_of_children(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.children(self.aisle.pk)
+        baseline = len(ctx.captured_queries)
+        for n in range(3, 20):
+            SubArea.objects.create(name=f"Bin {n}", area=self.aisle)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(len(self.children(self.aisle.pk).json()['children']), 20)
+        self.assertEqual(len(ctx.captured_queries), baseline)
+
+    def test_unknown_parent(self):
+        self.assertEqual(self.children(uuid.uuid4()).status_code, 404)
+
+    def test_location_autocomplete_searches_full_path(self):
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "password"))
+        url = reverse('admin:autocomplete')
+        params = {'app_label': 'inventory', 'model_name': 'inventory', 'field_name': 'location'}
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, {**params, 'term': 'depot > hall > aisle > bin'})
+        results = response.json()['results']
+        self.assertEqual([row['text'] for row in results], ["Aisle - Bin 0", "Aisle - Bin 1", "Aisle - Bin 2"])
+        # No per-result query for the area behind each label.
+        self.assertLess(len(ctx.captured_queries), 10)
+
+
+# <--- Query Plan Tests --->
+
+class QueryPlanTest(QueryPlanAssertions, TestCase):
+    """Tree pages and SubArea search must use the full_path indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        subloc = SubLocation.objects.create(name="Hall", location=Location.objects.create(name="Plan Site"))
+        area = Area.objects.create(name="Aisle", sub_location=subloc)
+        for n in range(10):
+            SubArea.objects.create(name=f"Bin {n}", area=area)
+
+    def test_storage_tree_page(self):
+        self.assertIndexed(SubArea.objects.filter(full_path__gt="Plan Site").order_by('full_path', 'id')[:100])
+
+    def test_subarea_admin_search(self):
+        admin = site._registry[SubArea]
+        queryset, _ = admin.get_search_results(None, SubArea.objects.all(), "plan site > hall")
+        self.assertIndexed(queryset)
+        self.assertEqual(queryset.count(), 10)
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'storage'
+
+urlpatterns = [
+    path('tree/', views.tree_children, name='tree'),
+    path('<slug:level>/', views.node_list, name='node-list'),
+]
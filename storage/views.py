@@ -1,3 +1,92 @@
-from django.shortcuts import render
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+from django.http import JsonResponse
 
-# Create your views here.
+from config.api import ApiError, api_view, after, decode_cursor, encode_cursor, keyset_page, page_size, parse_uuid
+from inventory.models import Inventory
+from .models import STORAGE_MODELS, StorageClosure, StorageLevel, Location, SubLocation, Area, SubArea
+
+# URL segment -> model, for /api/storage/<level>/
+LEVEL_MODELS = {
+    'locations': STORAGE_MODELS[0],
+    'sublocations': STORAGE_MODELS[1],
+    'areas': STORAGE_MODELS[2],
+    'subareas': STORAGE_MODELS[3],
+}
+
+@api_view
+def node_list(request, level):
+    """One level of the storage tree in path order, optionally ``?parent=<id>``."""
+    model = LEVEL_MODELS.get(level)
+    if model is None:
+        raise ApiError(f"Unknown storage level {level!r}.", status=404)
+
+    fields = {'id': 'id', 'name': 'name', 'full_path': 'full_path'}
+    nodes = model.objects.all()
+    if model.parent_field:
+        fields['parent_id'] = f'{model.parent_field}_id'
+        if request.GET.get('parent'):
+            nodes = nodes.filter(**{fields['parent_id']: parse_uuid(request.GET['parent'], 'parent')})
+    return keyset_page(request, nodes, ('full_path', 'id'), fields)
+
+# Tree browser: parent level -> (child model, reverse name of the child's own
+# children for counting, path from Inventory to a child of that model).
+# Top-level totals come from the LocationStock rollup instead.
+TREE_CHILDREN = {
+    None: (Location, 'sublocation', None),
+    StorageLevel.LOCATION: (SubLocation, 'area', 'location__area__sub_location'),
+    StorageLevel.SUB_LOCATION: (Area, 'subarea', 'location__area'),
+    StorageLevel.AREA: (SubArea, None, 'location'),
+}
+
+@api_view
+def tree_children(request):
+    """
+    The children of ``?parent=<node id>`` (or the top-level Locations), each
+    with its own child count and the stock quantity held anywhere beneath it.
+    At most three queries per call, whatever the size of the subtree.
+    """
+    parent_level = None
+    if request.GET.get('parent'):
+        parent = parse_uuid(request.GET['parent'], 'parent')
+        parent_level = StorageClosure.objects.filter(descendant=parent, depth=0).values_list(
+            'descendant_level', flat=True
+        ).first()
+        if parent_level is None:
+            raise ApiError("Unknown storage node.", status=404)
+        if parent_level == StorageLevel.SUB_AREA:
+            return JsonResponse({'children': [], 'next': None})
+
+    model, grandchildren, stock_path = TREE_CHILDREN[parent_level]
+    nodes = model.objects.order_by('name', 'id')
+    if parent_level is not None:
+        nodes = nodes.filter(**{model.parent_field: parent})
+    if grandchildren:
+        nodes = nodes.annotate(child_count=Count(grandchildren))
+    if stock_path is None:
+        nodes = nodes.annotate(quantity=Coalesce('stock_rollup__quantity', 0))
+    cursor = request.GET.get('cursor')
+    if cursor:
+        nodes = nodes.filter(after(('name', 'id'), decode_cursor(cursor, model, ('name', 'id'))))
+
+    limit = page_size(request)
+    fields = ['id', 'name', 'full_path']
+    fields += ['child_count'] if grandchildren else []
+    fields += ['quantity'] if stock_path is None else []
+    rows = list(nodes.values(*fields)[:limit + 1])
+    next_cursor = encode_cursor([rows[limit - 1]['name'], rows[limit - 1]['id']]) if len(rows) > limit else None
+    rows = rows[:limit]
+
+    if stock_path is not None and rows:
+        stock = dict(
+            Inventory.objects.filter(**{f'{stock_path}__in': [row['id'] for row in rows]})
+            .values(stock_path).annotate(total=Sum('quantity')).values_list(stock_path, 'total')
+        )
+        for row in rows:
+            row['quantity'] = stock.get(row['id'], 0)
+    return JsonResponse({
+        'children': [
+            {**row, 'level': model.level, 'child_count': row.get('child_count', 0)} for row in rows
+        ],
+        'next': next_cursor,
+    })
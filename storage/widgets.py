@@ -0,0 +1,25 @@
+from django import forms
+from django.urls import reverse
+
+from .models import SubArea
+
+class StorageTreeWidget(forms.Widget):
+    """
+    Picks a SubArea by browsing the storage tree, loading one level at a time
+    from ``storage:tree`` as nodes are expanded. Unlike a Select it never
+    enumerates every SubArea, so it stays fast with tens of thousands of them.
+    """
+    template_name = 'storage/widgets/storage_tree.html'
+
+    class Media:
+        css = {'all': ('storage/tree.css',)}
+        js = ('storage/tree.js',)
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['tree_url'] = reverse('storage:tree')
+        selected = None
+        if value:
+            selected = SubArea.objects.filter(pk=value).values_list('full_path', flat=True).first()
+        context['widget']['selected_path'] = selected
+        return context
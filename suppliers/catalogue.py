@@ -0,0 +1,220 @@
+"""
+Supplier catalogue sync.
+
+A supplier's price file is streamed (CSV or JSON lines, read with the same
+``read_rows`` as stock imports) and diffed against a snapshot of that
+supplier's Items taken once up front. The snapshot holds a short hash of each
+Item's synced fields instead of the fields themselves, so a 200k-line
+catalogue costs a few megabytes. Each batch writes its changed rows with one
+upsert and its new rows with one ``bulk_create``; unchanged rows are never
+touched.
+
+Each row needs ``item_code``, ``name``, ``price`` and ``internal_value``. New
+items also need ``category`` (a Category name) and may carry ``description``.
+"""
+import hashlib
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from inventory.importers import text
+from items.models import Item, Category
+from items.signals import ItemValueChange, item_values_changed, items_written
+
+MAX_REJECT_SAMPLES = 100
+SYNCED_FIELDS = ['name', 'price', 'internal_value']
+CENTS = Decimal('0.01')
+MAX_AMOUNT = Decimal('99999999.99')
+
+
+@dataclass
+class SyncResult:
+    rows_read: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    rejected: int = 0
+    # Items of the supplier that the file did not mention; left as they are.
+    missing: int = 0
+    reject_samples: list = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows_read / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        return (
+            f"Read {self.rows_read} lines: {self.created} created, {self.updated} updated, "
+            f"{self.unchanged} unchanged, {self.rejected} rejected, {self.missing} not in file "
+            f"in {self.elapsed:.2f}s ({self.rows_per_second:.0f} rows/s)."
+        )
+
+
+def fingerprint(name, price, internal_value):
+    """Eight-byte digest of the synced fields; amounts must already be quantized."""
+    raw = f"{name}\x1f{price}\x1f{internal_value}".encode()
+    return hashlib.blake2b(raw, digest_size=8).digest()
+
+
+def parse_amount(row, name):
+    try:
+        amount = Decimal(str(row.get(name)).strip()).quantize(CENTS)
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"Invalid {name} {row.get(name)!r}")
+    if not Decimal(0) <= amount <= MAX_AMOUNT:
+        raise ValueError(f"{name} {amount} out of range")
+    return amount
+
+
+class CatalogueSync:
+    """Applies a supplier's price file to its Items; later lines for the same code win."""
+
+    def __init__(self, supplier, batch_size=1000, on_reject=None, on_flush=None):
+        self.supplier = supplier
+        self.batch_size = batch_size
+        self.on_reject = on_reject
+        # Called with the running SyncResult after each committed batch.
+        self.on_flush = on_flush
+        self.category_ids = dict(Category.objects.values_list('name', 'id'))
+        # item_code -> (id, fingerprint); updated as batches are applied.
+        self.snapshot = {
+            item_code: (item_id, fingerprint(name, price, internal_value))
+            for item_id, item_code, name, price, internal_value in Item.objects.filter(
+                supplier=supplier
+            ).values_list('id', 'item_code', *SYNCED_FIELDS).iterator(chunk_size=5000)
+        }
+
+    def run(self, rows):
+        result = SyncResult()
+        started = time.monotonic()
+        seen = set()
+        changed, new = {}, {}
+
+        for line_number, row in rows:
+            result.rows_read += 1
+            try:
+                item_code, values = self.resolve(row)
+            except ValueError as exc:
+                self.reject(result, line_number, str(exc))
+                continue
+
+            seen.add(item_code)
+            current = self.snapshot.get(item_code)
+            if current is None:
+                if 'category_id' not in values:
+                    self.reject(result, line_number, f"Unknown category {row.get('category')!r} for new item")
+                    continue
+                new[item_code] = (line_number, values)
+            elif current[1] == values['fingerprint']:
+                result.unchanged += 1
+            else:
+                changed[item_code] = values
+
+            if len(changed) + len(new) >= self.batch_size:
+                self.flush_batch(result, changed, new)
+                changed, new = {}, {}
+
+        if changed or new:
+            self.flush_batch(result, changed, new)
+
+        result.missing = sum(1 for item_code in self.snapshot if item_code not in seen)
+        result.elapsed = time.monotonic() - started
+        return result
+
+    def resolve(self, row):
+        if row is None:
+            raise ValueError("Unreadable line")
+
+        item_code = text(row, 'item_code')
+        if not item_code or len(item_code) > Item._meta.get_field('item_code').max_length:
+            raise ValueError(f"Invalid item_code {item_code!r}")
+        name = text(row, 'name')
+        if not name:
+            raise ValueError("Missing name")
+
+        values = {
+            'name': name[:Item._meta.get_field('name').max_length],
+            'price': parse_amount(row, 'price'),
+            'internal_value': parse_amount(row, 'internal_value'),
+        }
+        values['fingerprint'] = fingerprint(values['name'], values['price'], values['internal_value'])
+        category_id = self.category_ids.get(text(row, 'category'))
+        if category_id is not None:
+            values['category_id'] = category_id
+        values['description'] = text(row, 'description')
+        return item_code, values
+
+    def reject(self, result, line_number, reason):
+        result.rejected += 1
+        if len(result.reject_samples) < MAX_REJECT_SAMPLES:
+            result.reject_samples.append((line_number, reason))
+        if self.on_reject:
+            self.on_reject(line_number, reason)
+
+    def flush_batch(self, result, changed, new):
+        with transaction.atomic():
+            result.updated += self.apply_changes(changed)
+            result.created += self.create_items(result, new)
+        if self.on_flush:
+            self.on_flush(result)
+
+    def apply_changes(self, changed):
+        if not changed:
+            return 0
+        ids = {self.snapshot[item_code][0]: item_code for item_code in changed}
+        # Locked so the value changes reported to the rollups are exact.
+        previous = {
+            item_id: (category_id, internal_value)
+            for item_id, category_id, internal_value in Item.objects.select_for_update().filter(
+                pk__in=ids
+            ).values_list('id', 'category_id', 'internal_value')
+        }
+        items, value_changes = [], []
+        for item_id, item_code in ids.items():
+            if item_id not in previous:
+                continue  # Deleted since the snapshot was taken.
+            values = changed[item_code]
+            category_id, old_value = previous[item_id]
+            items.append(Item(
+                pk=item_id, item_code=item_code, supplier=self.supplier, category_id=category_id,
+                **{name: values[name] for name in SYNCED_FIELDS},
+            ))
+            if old_value != values['internal_value']:
+                value_changes.append(ItemValueChange(
+                    item_id, category_id, old_value, category_id, values['internal_value'],
+                ))
+            self.snapshot[item_code] = (item_id, values['fingerprint'])
+
+        # An upsert on item_code writes the same columns as bulk_update would,
+        # without the per-row CASE expressions that make bulk_update slow.
+        Item.objects.bulk_create(
+            items, update_conflicts=True, unique_fields=['item_code'], update_fields=SYNCED_FIELDS, batch_size=500,
+        )
+        # The upsert bypasses save(), so listeners are told here.
+        if value_changes:
+            item_values_changed.send(sender=Item, changes=value_changes)
+        items_written.send(sender=Item, items=items)
+        return len(items)
+
+    def create_items(self, result, new):
+        if not new:
+            return 0
+        # Codes are unique across suppliers; another supplier's item is not ours to update.
+        taken = set(Item.objects.filter(item_code__in=new).values_list('item_code', flat=True))
+        items = []
+        for item_code, (line_number, values) in new.items():
+            if item_code in taken:
+                self.reject(result, line_number, f"item_code {item_code!r} belongs to another supplier")
+                continue
+            item = Item(
+                item_code=item_code, supplier=self.supplier, category_id=values['category_id'],
+                description=values['description'], **{name: values[name] for name in SYNCED_FIELDS},
+            )
+            items.append(item)
+            self.snapshot[item_code] = (item.pk, values['fingerprint'])
+        Item.objects.bulk_create(items, batch_size=500)
+        items_written.send(sender=Item, items=items)
+        return len(items)
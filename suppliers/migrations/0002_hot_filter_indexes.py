@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-17 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suppliers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='supplier',
+            index=models.Index(condition=models.Q(('supplier_status', True)), fields=['payment_method', 'supplier_name'], name='supplier_active_payment'),
+        ),
+        migrations.AddIndex(
+            model_name='supplier',
+            index=models.Index(condition=models.Q(('supplier_status', True)), fields=['supplier_name'], name='supplier_active_name'),
+        ),
+    ]
@@ -17,3 +17,18 @@ class Supplier(models.Model):
     supplier_status = models.BooleanField(default=True)
     main_contact = models.CharField(max_length=250, blank=True, null=True)
     payment_method = models.CharField(max_length=15, choices=PaymentMethod.choices, default=PaymentMethod.BANK_TRANSFER)
+
+    class Meta:
+        indexes = [
+            # Only active suppliers are filtered/ordered in day-to-day use.
+            models.Index(
+                fields=['payment_method', 'supplier_name'],
+                condition=models.Q(supplier_status=True),
+                name='supplier_active_payment',
+            ),
+            models.Index(
+                fields=['supplier_name'],
+                condition=models.Q(supplier_status=True),
+                name='supplier_active_name',
+            ),
+        ]
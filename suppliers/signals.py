@@ -0,0 +1,11 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from config.cache import reference_cache, SUPPLIERS
+from .models import Supplier
+
+
+@receiver([post_save, post_delete], sender=Supplier)
+def invalidate_supplier_cache(sender, **kwargs):
+    transaction.on_commit(lambda: reference_cache.invalidate(SUPPLIERS))
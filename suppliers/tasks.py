@@ -0,0 +1,31 @@
+import io
+import os
+
+from inventory.importers import read_rows
+from jobs.registry import task
+from .catalogue import CatalogueSync
+from .models import Supplier
+
+
+@task('suppliers.sync_catalogue', max_attempts=1)
+def sync_catalogue(job, supplier_id, path, format, batch_size=1000):
+    """Apply a price file already saved on shared storage; progress is by bytes read."""
+    supplier = Supplier.objects.get(pk=supplier_id)
+    size = os.path.getsize(path) or 1
+    with open(path, 'rb') as raw:
+        stream = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+
+        def on_flush(result):
+            job.report_progress(100 * raw.tell() / size, f"{result.rows_read} lines read")
+
+        result = CatalogueSync(supplier, batch_size=batch_size, on_flush=on_flush).run(read_rows(stream, format))
+    return {
+        'rows_read': result.rows_read,
+        'created': result.created,
+        'updated': result.updated,
+        'unchanged': result.unchanged,
+        'rejected': result.rejected,
+        'missing': result.missing,
+        'reject_samples': result.reject_samples[:20],
+        'elapsed': round(result.elapsed, 3),
+    }
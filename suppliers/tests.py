@@ -3,8 +3,20 @@ from django.db import models
 from django.core.exceptions import ValidationError
 from django.db.utils import IntegrityError
 from suppliers.models import Supplier, PaymentMethod
-from django.db import transaction
+from django.db import transaction, connection
+from django.core.management import call_command
+from django.test.utils import CaptureQueriesContext
+from decimal import Decimal
+import io
+import json
+import os
+import tempfile
 import uuid
+from inventory.importers import read_rows
+from items.models import Item, Category
+from items.signals import item_values_changed
+from suppliers.catalogue import CatalogueSync
+from config.query_plans import QueryPlanAssertions
 
 # <--- Model tests, record creations and validation checks -->
 
@@ -98,4 +110,110 @@ class SupplierModelTest(TestCase):
         with self.assertRaises(ValidationError) as cm:
             invalid_supplier_2.full_clean()
             
-        self.assertIn('contact_number', cm.exception.message_dict)
\ No newline at end of file
+        self.assertIn('contact_number', cm.exception.message_dict)
+
+# <--- Catalogue sync tests -->
+
+class CatalogueSyncTest(TestCase):
+
+    def setUp(self):
+        self.supplier = Supplier.objects.create(supplier_name="Acme Inc.")
+        self.other = Supplier.objects.create(supplier_name="Other Ltd.")
+        self.category = Category.objects.create(name="Fixings")
+        for n, value in enumerate(('1.00', '2.00', '3.00')):
+            Item.objects.create(
+                item_code=f"CAT-{n}", name=f"Part {n}", category=self.category,
+                supplier=self.supplier, price=value, internal_value=value,
+            )
+        Item.objects.create(
+            item_code="OTH-1", name="Theirs", category=self.category,
+            supplier=self.other, price=1, internal_value=1,
+        )
+
+    def sync(self, text, **kwargs):
+        return CatalogueSync(self.supplier, **kwargs).run(read_rows(io.StringIO(text), 'csv'))
+
+    def test_applies_only_changed_and_new_rows(self):
+        sent = []
+
+        def receiver(sender, changes, **kwargs):
+            sent.extend(changes)
+        item_values_changed.connect(receiver)
+        self.addCleanup(item_values_changed.disconnect, receiver)
+
+        result = self.sync(
+            "item_code,name,price,internal_value,category\n"
+            "CAT-0,Part 0,1.00,1.00,\n"          # unchanged
+            "CAT-1,Part 1,2.50,2.00,\n"          # price only
+            "CAT-2,Part 2,3.00,3.25,\n"          # internal value
+            "CAT-9,Part 9,9.00,8.00,Fixings\n"   # new
+            "CAT-8,Part 8,9.00,8.00,Nope\n"      # new, unknown category
+            "OTH-1,Theirs,5.00,5.00,Fixings\n"   # another supplier's code
+            "CAT-7,Part 7,-1,1,Fixings\n"        # negative price
+        )
+
+        self.assertEqual(
+            (result.created, result.updated, result.unchanged, result.rejected, result.missing),
+            (1, 2, 1, 3, 0),
+        )
+        prices = dict(Item.objects.values_list('item_code', 'price'))
+        self.assertEqual(prices['CAT-1'], Decimal('2.50'))
+        self.assertEqual(prices['CAT-9'], Decimal('9.00'))
+        self.assertEqual(prices['OTH-1'], Decimal('1.00'))
+        self.assertEqual(Item.objects.get(item_code='CAT-9').supplier, self.supplier)
+        self.assertEqual(
+            [(change.old_value, change.new_value) for change in sent], [(Decimal('3.00'), Decimal('3.25'))]
+        )
+
+    def test_numeric_json_values_are_read_as_text(self):
+        lines = [
+            {"item_code": 4711, "name": 4711, "price": 1.5, "internal_value": 1, "category": "Fixings"},
+            {"item_code": "CAT-0", "name": "Part 0", "price": "1.00", "internal_value": "1.00", "description": 12},
+        ]
+        stream = io.StringIO("".join(json.dumps(line) + "\n" for line in lines))
+        result = CatalogueSync(self.supplier).run(read_rows(stream, 'jsonl'))
+
+        self.assertEqual((result.created, result.rejected), (1, 0))
+        self.assertEqual(Item.objects.get(item_code="4711").name, "4711")
+
+    def test_query_count_independent_of_rows(self):
+        def catalogue(start, count):
+            return "item_code,name,price,internal_value,category\n" + "".join(
+                f"NEW-{n},New {n},1.00,1.00,Fixings\nCAT-{n % 3},Part {n % 3},{n}.00,1.00,\n"
+                for n in range(start, start + count)
+            )
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.sync(catalogue(0, 2))
+        baseline = len(ctx.captured_queries)
+        with CaptureQueriesContext(connection) as ctx:
+            result = self.sync(catalogue(10, 40))
+        self.assertEqual(result.created, 40)
+        self.assertEqual(len(ctx.captured_queries), baseline)
+
+    def test_command_reports_summary_and_missing_items(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write("item_code,name,price,internal_value\nCAT-0,Part zero,1.00,1.00\n")
+        self.addCleanup(os.remove, handle.name)
+
+        out = io.StringIO()
+        call_command('sync_catalogue', "Acme Inc.", handle.name, stdout=out)
+
+        self.assertIn("0 created, 1 updated, 0 unchanged, 0 rejected, 2 not in file", out.getvalue())
+        self.assertEqual(Item.objects.get(item_code='CAT-0').name, "Part zero")
+
+
+# <--- Query plan tests -->
+
+class QueryPlanTest(QueryPlanAssertions, TestCase):
+    """Active-supplier listings must use the partial indexes in suppliers migration 0002."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Supplier.objects.bulk_create([
+            Supplier(supplier_name=f"Supplier {n}", supplier_status=n % 3 != 0, payment_method=PaymentMethod.BACS)
+            for n in range(10)
+        ])
+
+    def test_active_suppliers_by_payment_method(self):
+        self.assertIndexed(Supplier.objects.filter(supplier_status=True, payment_method=PaymentMethod.BACS))